@@ -1,28 +1,47 @@
 import os
 import requests
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Request, Response, current_app, request, jsonify, send_file
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
-from core.crypto import encrypt_data, decrypt_data
-from core.stega import hide_message_in_image, reveal_message_from_image
+from core.crypto import encrypt_data, decrypt_data, encrypt_bytes, decrypt_bytes, encrypt_batch, decrypt_batch, iter_encrypt_stream, iter_decrypt_stream, is_stream_container, HEADER_SIZE
+from core.crypto import encrypt_throughput, decrypt_throughput
+from core.kdf_pool import kdf_pool, KDFPoolSaturated
+from core import kdf
+from core.stega import hide_message_in_image, reveal_message_from_image, image_capacity, StegaCapacityExceeded
+from core.stega import hide_message_across_images, reveal_message_from_images, carriers_capacity
 from core.ai_module import analyze_password, generate_decoy
 import uuid
 import tempfile
 import shutil
 import base64
-import json
+import io
 import uuid
+import zipfile
+import hmac
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
-from core.secure_links import link_manager
+from core.secure_links import link_manager, link_reaper
 from core.contact_manager import contact_manager
+from core.db import db
 from core.shredder import shred_file
 
+# Endpoints that process uploads chunk by chunk and are therefore exempt from the upload cap
+STREAMING_ENDPOINTS = {'encrypt_file', 'decrypt_file'}
+
+class CryptarisRequest(Request):
+    @property
+    def max_content_length(self):
+        if self.endpoint in STREAMING_ENDPOINTS:
+            return None
+        return current_app.config['MAX_CONTENT_LENGTH']
+
 app = Flask(__name__)
+app.request_class = CryptarisRequest
 # Load config from environment
 app.config['SECRET_KEY'] = os.getenv('FLASK_SECRET_KEY', os.urandom(24))
 
-# Security: Limit maximum upload size to 16MB to prevent memory exhaustion DoS attacks
+# Security: Limit maximum upload size to 16MB to prevent memory exhaustion DoS attacks.
+# Streaming file endpoints are only bounded by disk space (see CryptarisRequest).
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
 
 # CORS Configuration
@@ -47,6 +66,14 @@ limiter = Limiter(
 UPLOAD_FOLDER = tempfile.gettempdir()
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
+# Expired secure links are removed in the background, never on the request path
+link_reaper.start()
+
+
+def _kdf_busy_response(error: Exception):
+    """Fast rejection while the KDF pool is saturated, so clients back off instead of piling up."""
+    return jsonify({'error': str(error)}), 503, {'Retry-After': '1'}
+
 
 @app.route('/api/chat', methods=['POST'])
 def chat():
@@ -100,182 +127,332 @@ def chat():
 
 
 
+# Binary mode: clients may send raw bytes (Content-Type: application/octet-stream) with the
+# password in this header, and ask for raw bytes back with Accept: application/octet-stream.
+# Binary ciphertexts use the [SALT(16)][CONTAINER] layout, so no base64 step is involved.
+PASSWORD_HEADER = 'X-Cryptaris-Password'
+FILENAME_HEADER = 'X-Cryptaris-Filename'
+
+def _is_binary_request() -> bool:
+    return request.mimetype == 'application/octet-stream'
+
+def _wants_binary_response() -> bool:
+    best = request.accept_mimetypes.best_match(['application/json', 'application/octet-stream'])
+    return best == 'application/octet-stream'
+
+def _binary_response(data: bytes) -> Response:
+    return Response(data, mimetype='application/octet-stream')
+
 @app.route('/api/encrypt/text', methods=['POST'])
 def encrypt_text():
     try:
-        data = request.json
-        if not data or 'text' not in data:
-            return jsonify({'error': 'Text is required'}), 400
-        
-        text = data['text']
-        password = data.get('password', 'default-key') # In a real app, force password or generate one
+        if _is_binary_request():
+            plaintext = request.get_data()
+            password = request.headers.get(PASSWORD_HEADER, 'default-key')
+        else:
+            data = request.json
+            if not data or 'text' not in data:
+                return jsonify({'error': 'Text is required'}), 400
+            
+            plaintext = data['text'].encode('utf-8')
+            password = data.get('password', 'default-key') # In a real app, force password or generate one
         
         # Encrypt
-        encrypted = encrypt_data(text.encode('utf-8'), password)
+        if _wants_binary_response():
+            return _binary_response(encrypt_bytes(plaintext, password))
+        encrypted = encrypt_data(plaintext, password)
         return jsonify(encrypted)
+    except KDFPoolSaturated as e:
+        return _kdf_busy_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/decrypt/text', methods=['POST'])
 def decrypt_text():
     try:
-        data = request.json
-        required = ['ciphertext', 'salt', 'nonce']
-        if not all(k in data for k in required):
-            return jsonify({'error': 'Missing decryption parameters'}), 400
+        if _is_binary_request():
+            password = request.headers.get(PASSWORD_HEADER, 'default-key')
+            decrypted_bytes = decrypt_bytes(request.get_data(), password)
+        else:
+            data = request.json
+            required = ['ciphertext', 'salt', 'nonce']
+            if not all(k in data for k in required):
+                return jsonify({'error': 'Missing decryption parameters'}), 400
+                
+            password = data.get('password', 'default-key')
             
-        password = data.get('password', 'default-key')
+            # Decrypt
+            decrypted_bytes = decrypt_data(data['ciphertext'], password, data['salt'], data['nonce'])
         
-        # Decrypt
-        decrypted_bytes = decrypt_data(data['ciphertext'], password, data['salt'], data['nonce'])
+        if _wants_binary_response():
+            return _binary_response(decrypted_bytes)
         return jsonify({'text': decrypted_bytes.decode('utf-8')})
+    except KDFPoolSaturated as e:
+        return _kdf_busy_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
-@app.route('/api/encrypt/file', methods=['POST'])
-def encrypt_file():
+@app.route('/api/encrypt/batch', methods=['POST'])
+def encrypt_text_batch():
     try:
-        if 'file' not in request.files:
-            return jsonify({'error': 'No file part'}), 400
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({'error': 'No selected file'}), 400
-            
-        password = request.form.get('password', 'default-key')
-        
-        # Save temp with UUID
-        unique_prefix = uuid.uuid4().hex
-        filename = secure_filename(file.filename)
-        temp_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{unique_prefix}_{filename}")
-        file.save(temp_path)
-        
-        with open(temp_path, 'rb') as f:
-            file_data = f.read()
-            
-        # Encrypt
-        encrypted = encrypt_data(file_data, password)
+        data = request.json
+        if not data or not isinstance(data.get('items'), list):
+            return jsonify({'error': 'Items array is required'}), 400
         
-        # Create output file
-        # Format: SALT(16) + LAYER2_BLOB
-        salt = base64.b64decode(encrypted['salt'])
-        layer2_blob = base64.b64decode(encrypted['ciphertext'])
-        final_data = salt + layer2_blob
+        password = data.get('password', 'default-key')
         
-        output_filename = f"{unique_prefix}_{filename}.enc"
-        output_path = os.path.join(app.config['UPLOAD_FOLDER'], output_filename)
+        # One KDF run for the whole batch; per-item failures are reported inline
+        return jsonify(encrypt_batch(data['items'], password))
+    except KDFPoolSaturated as e:
+        return _kdf_busy_response(e)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/decrypt/batch', methods=['POST'])
+def decrypt_text_batch():
+    try:
+        data = request.json
+        if not data or not isinstance(data.get('items'), list):
+            return jsonify({'error': 'Items array is required'}), 400
         
-        with open(output_path, 'wb') as f:
-            f.write(final_data)
-            
-        # Cleanup input
-        os.remove(temp_path)
+        password = data.get('password', 'default-key')
         
-        return send_file(output_path, as_attachment=True, download_name=output_filename)
+        results = decrypt_batch(data['items'], password, data.get('salt'), data.get('key'))
+        return jsonify({'items': results})
+    except KDFPoolSaturated as e:
+        return _kdf_busy_response(e)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+def _take_upload_stream(file):
+    """
+    Takes ownership of an upload's spooled stream.
+    Flask closes request files as soon as the view returns, which is before a
+    streamed response body is produced, so the caller becomes responsible for closing it.
+    """
+    stream = file.stream
+    file.stream = io.BytesIO()
+    return stream
+
+def _read_into_buffer(source) -> bytearray:
+    """
+    Reads a seekable upload into a single preallocated buffer.
+    Avoids the intermediate copies of read() + slicing; decrypt_bytes takes the buffer as is.
+    """
+    size = source.seek(0, io.SEEK_END)
+    source.seek(0)
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    filled = 0
+    while filled < size:
+        n = source.readinto(view[filled:])
+        if not n:
+            break
+        filled += n
+    view.release()
+    del buffer[filled:]
+    return buffer
+
+def _attachment_response(chunks, download_name: str, source=None) -> Response:
+    """Streams an iterable of byte chunks back to the client as a file download."""
+    def generate():
+        try:
+            yield from chunks
+        finally:
+            if source is not None:
+                source.close()
+
+    return Response(
+        generate(),
+        mimetype='application/octet-stream',
+        headers={'Content-Disposition': f'attachment; filename="{download_name}"'}
+    )
+
+def _file_upload():
+    """
+    Returns (stream, filename, password) for a file endpoint.
+    Accepts a multipart 'file' field or, in binary mode, the raw request body.
+    The returned stream is owned by the caller and must be closed by it.
+    """
+    if _is_binary_request():
+        filename = secure_filename(request.headers.get(FILENAME_HEADER, '')) or 'upload'
+        password = request.headers.get(PASSWORD_HEADER, 'default-key')
+        return io.BufferedReader(request.stream), filename, password
+    
+    if 'file' not in request.files:
+        raise FileNotFoundError('No file part')
+    file = request.files['file']
+    if file.filename == '':
+        raise FileNotFoundError('No selected file')
+    
+    password = request.form.get('password', 'default-key')
+    return _take_upload_stream(file), secure_filename(file.filename), password
+
+@app.route('/api/encrypt/file', methods=['POST'])
+def encrypt_file():
+    try:
+        try:
+            source, filename, password = _file_upload()
+        except FileNotFoundError as e:
+            return jsonify({'error': str(e)}), 400
+        output_filename = f"{filename}.enc"
+        
+        # Encrypt chunk by chunk straight from the upload stream into the response.
+        # Format: [HEADER][SEGMENT_0]...[SEGMENT_N] (see core.crypto.iter_encrypt_stream)
+        return _attachment_response(iter_encrypt_stream(source, password), output_filename, source)
 
+    except KDFPoolSaturated as e:
+        return _kdf_busy_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/decrypt/file', methods=['POST'])
 def decrypt_file():
     try:
-        if 'file' not in request.files:
-            return jsonify({'error': 'No file part'}), 400
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({'error': 'No selected file'}), 400
-            
-        password = request.form.get('password', 'default-key')
-        
-        # Save temp with UUID to prevent race conditions
-        unique_prefix = uuid.uuid4().hex
-        filename = secure_filename(file.filename)
-        temp_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{unique_prefix}_{filename}")
-        file.save(temp_path)
-        
-        with open(temp_path, 'rb') as f:
-            file_data = f.read()
-            
-        # Parse Format: SALT(16) + LAYER2_BLOB
-        if len(file_data) < 28:
-            return jsonify({'error': 'Invalid file format'}), 400
-            
-        salt = file_data[:16]
-        layer2_blob = file_data[16:]
-        
-        salt_b64 = base64.b64encode(salt).decode('utf-8')
-        ciphertext_b64 = base64.b64encode(layer2_blob).decode('utf-8')
-        
-        decrypted_bytes = decrypt_data(ciphertext_b64, password, salt_b64, "")
+        try:
+            source, filename, password = _file_upload()
+        except FileNotFoundError as e:
+            return jsonify({'error': str(e)}), 400
         
         original_filename = filename.replace('.enc', '')
         if original_filename == filename:
              original_filename = f"decrypted_{filename}"
-             
-        output_filename = f"{unique_prefix}_{original_filename}"
-        output_path = os.path.join(app.config['UPLOAD_FOLDER'], output_filename)
         
-        with open(output_path, 'wb') as f:
-            f.write(decrypted_bytes)
+        head = source.peek(HEADER_SIZE)[:HEADER_SIZE] if hasattr(source, 'peek') else source.read(HEADER_SIZE)
+        if source.seekable():
+            source.seek(0)
+        
+        if is_stream_container(head):
+            try:
+                # Unwrap the key and authenticate the first segment before committing to a 200 response
+                chunks = iter_decrypt_stream(source, password)
+                first_chunk = next(chunks)
+            except ValueError as e:
+                source.close()
+                return jsonify({'error': str(e)}), 400
+            
+            def stream_plaintext():
+                yield first_chunk
+                yield from chunks
             
-        # Cleanup input
-        os.remove(temp_path)
+            return _attachment_response(stream_plaintext(), original_filename, source)
+        
+        # Legacy Format: SALT(16) + LAYER2_BLOB
+        # These are decrypted in memory, so unlike stream containers they keep the upload cap
+        max_size = app.config['MAX_CONTENT_LENGTH']
+        with source:
+            if source.seekable():
+                too_large = source.seek(0, io.SEEK_END) > max_size
+                source.seek(0)
+                file_data = None if too_large else _read_into_buffer(source)
+            else:
+                file_data = source.read(max_size + 1)
+                too_large = len(file_data) > max_size
+        if too_large:
+            return jsonify({'error': f'File too large: non-streaming containers are limited to {max_size // (1024 * 1024)} MB.'}), 413
+        if len(file_data) < 28:
+            return jsonify({'error': 'Invalid file format'}), 400
         
-        return send_file(output_path, as_attachment=True, download_name=original_filename)
+        decrypted_bytes = decrypt_bytes(file_data, password)
+        del file_data
+        
+        return _attachment_response(iter([decrypted_bytes]), original_filename)
 
+    except KDFPoolSaturated as e:
+        return _kdf_busy_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _stega_options() -> dict:
+    """Embedding options of a steganography request; unset ones use the server defaults."""
+    return {'bits_per_channel': request.form.get('bits_per_channel', type=int),
+            'channels': request.form.get('channels') or None,
+            'mode': request.form.get('mode') or None,
+            'ecc': request.form.get('ecc', type=int)}
+
+def _stego_output_name(unique_prefix: str, filename: str) -> str:
+    return f"stego_{unique_prefix}_{secure_filename(filename).split('.')[0]}.png"
+
 @app.route('/api/steganography/hide', methods=['POST'])
 def hide_message():
     try:
-        if 'image' not in request.files:
+        images = request.files.getlist('images')
+        if 'image' not in request.files and not images:
             return jsonify({'error': 'Image is required'}), 400
-        image = request.files['image']
         message = request.form.get('message', '')
         password = request.form.get('password', '')
         
         if not message:
              return jsonify({'error': 'Message is required'}), 400
 
-        if password:
-             encrypted = encrypt_data(message.encode('utf-8'), password)
-             message_content = json.dumps(encrypted)
-             message_to_hide = "ENC::" + message_content
-        else:
-             message_to_hide = message
-             
         unique_prefix = uuid.uuid4().hex
-        filename = secure_filename(image.filename)
-        temp_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{unique_prefix}_{filename}")
-        image.save(temp_path)
-        
-        output_filename = f"stego_{unique_prefix}_{filename.split('.')[0]}.png"
-        output_path = os.path.join(app.config['UPLOAD_FOLDER'], output_filename)
-        
-        hide_message_in_image(temp_path, message_to_hide, output_path)
-        
-        os.remove(temp_path)
-        return send_file(output_path, as_attachment=True, download_name=output_filename)
-        
+        # Optional engine: mode lsb (with bits_per_channel 1-4 and channels, e.g. RGB or B)
+        # or dct, which survives JPEG recompression (with ecc, an odd repetition factor)
+        options = _stega_options()
+
+        if images:
+            # Multi-carrier: the message is split across every 'images' upload and the
+            # carriers come back as a zip (PNGs are already compressed, so stored as is)
+            outputs = hide_message_across_images([image.stream for image in images], message,
+                                                 password=password or None, **options)
+            archive = io.BytesIO()
+            with zipfile.ZipFile(archive, 'w', zipfile.ZIP_STORED) as zf:
+                for number, (image, output) in enumerate(zip(images, outputs), 1):
+                    zf.writestr(f"{number:02d}_{_stego_output_name(unique_prefix, image.filename)}", output.getvalue())
+            archive.seek(0)
+            return send_file(archive, mimetype='application/zip', as_attachment=True,
+                             download_name=f"stego_{unique_prefix}.zip")
+
+        image = request.files['image']
+        output_filename = _stego_output_name(unique_prefix, image.filename)
+
+        # Decoded from the upload stream and encoded into memory; nothing touches UPLOAD_FOLDER
+        # With a password the message is compressed, encrypted and embedded as raw bytes
+        output = hide_message_in_image(image.stream, message, password=password or None, **options)
+        return send_file(output, mimetype='image/png', as_attachment=True, download_name=output_filename)
+        
+    except StegaCapacityExceeded as e:
+        return jsonify({'error': str(e)}), 413
+    except KDFPoolSaturated as e:
+        return _kdf_busy_response(e)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/steganography/capacity', methods=['POST'])
+def steganography_capacity():
+    """Message capacity of a carrier image (or of several 'images' together), read from the image headers."""
+    try:
+        images = request.files.getlist('images')
+        if 'image' not in request.files and not images:
+            return jsonify({'error': 'Image is required'}), 400
+        options = _stega_options()
+        if images:
+            return jsonify(carriers_capacity([image.stream for image in images], **options))
+        return jsonify(image_capacity(request.files['image'].stream, **options))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/steganography/reveal', methods=['POST'])
 def reveal_message():
     try:
-        if 'image' not in request.files:
+        images = request.files.getlist('images')
+        if 'image' not in request.files and not images:
             return jsonify({'error': 'Image is required'}), 400
-        image = request.files['image']
-        unique_prefix = uuid.uuid4().hex
-        filename = secure_filename(image.filename)
-        temp_path = os.path.join(app.config['UPLOAD_FOLDER'], f"reveal_{unique_prefix}_{filename}")
-        image.save(temp_path)
-        
-        revealed_text = reveal_message_from_image(temp_path)
-        os.remove(temp_path)
-        
+        password = request.form.get('password', '')
+        if images:
+            # Carriers of a split message, in any order
+            revealed_text = reveal_message_from_images([image.stream for image in images], password or None)
+        else:
+            revealed_text = reveal_message_from_image(request.files['image'].stream, password or None)
         return jsonify({'message': revealed_text})
         
+    except KDFPoolSaturated as e:
+        return _kdf_busy_response(e)
+    except ValueError as e:
+        # No message, a missing or wrong password, or a damaged carrier
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
         
@@ -286,15 +463,20 @@ def create_link():
         if request.content_type and 'multipart/form-data' in request.content_type:
             data = request.form
             file = request.files.get('file')
-            file_data = file.read() if file else None
+            file_stream = file.stream if file and file.filename else None
             file_name = secure_filename(file.filename) if file and file.filename else None
         else:
             data = request.json or {}
-            file_data = None
+            file_stream = None
             file_name = None
 
+        if file_stream is not None and not file_stream.read(1):
+            file_stream = None  # empty upload
+        elif file_stream is not None:
+            file_stream.seek(0)
+
         url = data.get('url', '')
-        if not url and not file_data:
+        if not url and file_stream is None:
             return jsonify({'error': 'URL or File is required'}), 400
             
         expires_seconds = int(data.get('expires', 3600))
@@ -303,35 +485,69 @@ def create_link():
             url=url,
             password=data.get('password'),
             expires_seconds=expires_seconds,
-            file_data=file_data,
-            file_name=file_name
+            file_name=file_name,
+            file_stream=file_stream
         )
         return jsonify(result)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/links/access/<link_id>', methods=['POST'])
-@limiter.limit("5 per minute", error_message="Too many access attempts. Please wait a minute.")
+def _link_file_response(result: dict) -> Response:
+    """
+    Streams a secure-link file, decrypting only the segments a single-range Range
+    request covers (206, or 416 if unsatisfiable). The content hash of the stored blob
+    is a strong ETag, so resumed downloads can use If-Range.
+    """
+    size = result['file_size']
+    etag = result['file_ref']
+    file_name = result.get('file_name') or 'secure_file.dat'
+    start, end, status = 0, size, 200
+
+    byte_range = request.range
+    if byte_range is not None and (request.if_range.etag is None and request.if_range.date is None
+                                   or request.if_range.etag == etag):
+        bounds = byte_range.range_for_length(size)
+        if bounds is not None:
+            start, end = bounds
+            status = 206
+        elif byte_range.units == 'bytes' and len(byte_range.ranges) == 1:
+            return jsonify({'error': 'Requested range not satisfiable'}), 416, {'Content-Range': f'bytes */{size}'}
+        # Multiple ranges are not supported; the whole file is sent instead
+
+    response = _attachment_response(result['open_file'](start, end), file_name)
+    response.status_code = status
+    response.content_length = end - start
+    response.accept_ranges = 'bytes'
+    response.set_etag(etag)
+    if status == 206:
+        response.headers['Content-Range'] = f'bytes {start}-{end - 1}/{size}'
+    return response
+
+def _is_link_resume() -> bool:
+    """
+    True for a Range GET whose If-Range names the link's blob hash. That ETag is only
+    sent after a successful password check, so a resumed download does not use up the
+    access limit. The password is still verified on every request.
+    """
+    if request.method != 'GET' or request.range is None or request.if_range.etag is None:
+        return False
+    blob_ref = link_manager.blob_ref(request.view_args.get('link_id', ''))
+    return blob_ref is not None and hmac.compare_digest(blob_ref, request.if_range.etag)
+
+@app.route('/api/links/access/<link_id>', methods=['GET', 'POST'])
+@limiter.limit("5 per minute", error_message="Too many access attempts. Please wait a minute.",
+               exempt_when=_is_link_resume)
 def access_link(link_id):
     try:
-        data = request.json
-        password = data.get('password') if data else None
+        # GET (e.g. a resumed download) sends the password in the X-Cryptaris-Password header
+        data = request.get_json(silent=True)
+        password = data.get('password') if data else request.headers.get(PASSWORD_HEADER)
         
         result = link_manager.access_link(link_id, password)
         
-        if result.get('file_data'):
-            # It's a file
-            file_name = result.get('file_name') or 'secure_file.dat'
-            temp_path = os.path.join(app.config['UPLOAD_FOLDER'], file_name)
-            
-            with open(temp_path, 'wb') as f:
-                f.write(result['file_data'])
-                
-            response = send_file(temp_path, as_attachment=True, download_name=file_name)
-            
-            # Note: We can't easily clean up the temp_path synchronously here after send_file,
-            # but since it's in the OS temp directory it will be cleaned up eventually.
-            return response
+        if result.get('open_file') is not None:
+            # It's a file: decrypt blob segments straight into the response
+            return _link_file_response(result)
             
         else:
             # It's just a URL
@@ -418,6 +634,35 @@ def contact_form():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Metrics expose pool saturation and storage internals. With METRICS_TOKEN set, callers
+# must send it in the X-Cryptaris-Metrics-Token header; without it only local requests
+# are answered.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+METRICS_TOKEN_HEADER = 'X-Cryptaris-Metrics-Token'
+LOCAL_ADDRESSES = {'127.0.0.1', '::1'}
+
+def _metrics_allowed() -> bool:
+    if METRICS_TOKEN:
+        return hmac.compare_digest(request.headers.get(METRICS_TOKEN_HEADER, '').encode(), METRICS_TOKEN.encode())
+    return request.remote_addr in LOCAL_ADDRESSES
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    if not _metrics_allowed():
+        return jsonify({'error': 'Forbidden'}), 403
+    return jsonify({
+        'kdf_pool': kdf_pool.metrics(),
+        'kdf': kdf.describe(kdf.ACTIVE_PARAMS),
+        'database': db.metrics(),
+        'link_store': link_manager.store.metrics(),
+        'link_reaper': link_reaper.metrics(),
+        'link_filter': link_manager.id_filter.metrics(),
+        'file_stream': {
+            'encrypt': encrypt_throughput.snapshot(),
+            'decrypt': decrypt_throughput.snapshot()
+        }
+    })
+
 if __name__ == '__main__':
     port = int(os.environ.get("PORT", 5000))
     debug_mode = os.environ.get("FLASK_DEBUG", "False").lower() == "true"
@@ -0,0 +1,195 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+# Allow running from the backend directory or the repository root
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core import kdf
+from core.crypto import derive_key, derive_system_subkey, _encrypt_layer, _decrypt_layer, encrypt_data, decrypt_data
+
+MIB = 1024 * 1024
+DEFAULT_SIZES = ['64B', '1KB', '64KB', '1MB', '16MB', '256MB']
+QUICK_SIZES = ['64B', '1KB', '64KB', '1MB']
+PASSWORD = "benchmark-password"
+# Peak memory changes smaller than this are allocator noise, whatever the percentage
+MEMORY_NOISE_BYTES = 64 * 1024
+# Likewise for p50 latency: a few microseconds is timer and cache jitter on tiny payloads
+LATENCY_NOISE_MS = 0.01
+
+
+def parse_size(text: str) -> int:
+    units = {'GB': 1024 ** 3, 'MB': MIB, 'KB': 1024, 'B': 1}
+    text = text.strip().upper()
+    for suffix, factor in units.items():
+        if text.endswith(suffix):
+            return int(float(text[:-len(suffix)]) * factor)
+    return int(text)
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(fn, payload_bytes: int = 0, min_time: float = 1.0, min_iterations: int = 5,
+            max_iterations: int = 1000) -> dict:
+    """
+    Times fn() until min_time has elapsed (bounded by the iteration limits), then runs it
+    once more under tracemalloc for the peak allocation. Latencies are in milliseconds.
+    """
+    fn()  # warm up
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < max_iterations and (len(samples) < min_iterations or time.perf_counter() - started < min_time):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    total = sum(samples)
+
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    ops = len(samples) / total if total else 0.0
+    return {
+        "iterations": len(samples),
+        "payload_bytes": payload_bytes,
+        "ops_per_sec": round(ops, 3),
+        "mb_per_sec": round(ops * payload_bytes / MIB, 3),
+        "p50_ms": round(percentile(samples, 50) * 1000, 4),
+        "p99_ms": round(percentile(samples, 99) * 1000, 4),
+        "peak_memory_bytes": peak,
+    }
+
+
+def run_suite(sizes: list, min_time: float) -> dict:
+    results = {}
+
+    def record(name, fn, payload_bytes=0):
+        results[name] = measure(fn, payload_bytes, min_time)
+        r = results[name]
+        print(f"{name:<28} {r['ops_per_sec']:>12.1f} ops/s {r['mb_per_sec']:>10.1f} MB/s "
+              f"p50 {r['p50_ms']:>10.3f} ms  p99 {r['p99_ms']:>10.3f} ms  peak {r['peak_memory_bytes'] / MIB:>8.1f} MB")
+
+    salt = os.urandom(16)
+    record(f"derive_key/{kdf.ALGORITHM_NAMES[kdf.ACTIVE_PARAMS.algorithm]}",
+           lambda: derive_key(PASSWORD, salt, kdf.ACTIVE_PARAMS))
+    record("derive_key/legacy_pbkdf2", lambda: derive_key(PASSWORD, salt))
+
+    layer_key = derive_system_subkey(salt)
+    for label in sizes:
+        size = parse_size(label)
+        payload = os.urandom(size)
+        layer = _encrypt_layer(payload, layer_key)
+        record(f"encrypt_layer/{label}", lambda: _encrypt_layer(payload, layer_key), size)
+        record(f"decrypt_layer/{label}", lambda: _decrypt_layer(layer, layer_key), size)
+
+        encrypted = encrypt_data(payload, PASSWORD)
+        record(f"encrypt_data/{label}", lambda: encrypt_data(payload, PASSWORD), size)
+        record(f"decrypt_data/{label}",
+               lambda: decrypt_data(encrypted['ciphertext'], PASSWORD, encrypted['salt'], encrypted['nonce']), size)
+        del payload, layer, encrypted
+    return results
+
+
+def best_of(rounds: list) -> dict:
+    """
+    Merges repeated suite runs, keeping each case's round with the lowest p50. Rounds run
+    the whole suite in turn, so a slow spell on the machine hits one round of every case
+    instead of every sample of one case.
+    """
+    return {name: min((r[name] for r in rounds), key=lambda r: r['p50_ms']) for name in rounds[0]}
+
+
+def environment() -> dict:
+    try:
+        from cryptography import __version__ as cryptography_version
+    except ImportError:
+        cryptography_version = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "cryptography": cryptography_version,
+        "kdf": kdf.describe(kdf.ACTIVE_PARAMS),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def compare_results(baseline: dict, current: dict, threshold: float) -> list:
+    """
+    Returns the cases that regressed by more than threshold percent: a higher p50 latency
+    or higher peak memory than the baseline. The median of the repeated samples is
+    compared rather than mean ops/sec, which a few scheduler stalls can move by more than
+    the threshold. Cases missing from either side are skipped.
+    """
+    regressions = []
+    print(f"\n{'case':<28} {'baseline p50 ms':>15} {'current p50 ms':>15} {'delta':>9} {'peak mem delta':>15}")
+    for name, now in current.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        # Positive when slower, so it compares with the threshold like the memory delta
+        speed = (now['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100 if before['p50_ms'] else 0.0
+        memory = (now['peak_memory_bytes'] - before['peak_memory_bytes']) / before['peak_memory_bytes'] * 100 \
+            if before['peak_memory_bytes'] else 0.0
+        flags = []
+        if speed > threshold and now['p50_ms'] - before['p50_ms'] > LATENCY_NOISE_MS:
+            flags.append('SLOWER')
+        if memory > threshold and now['peak_memory_bytes'] - before['peak_memory_bytes'] > MEMORY_NOISE_BYTES:
+            flags.append('MORE MEMORY')
+        print(f"{name:<28} {before['p50_ms']:>15.4f} {now['p50_ms']:>15.4f} {speed:>+8.1f}% "
+              f"{memory:>+14.1f}%  {' '.join(flags)}")
+        if flags:
+            regressions.append({"case": name, "p50_delta_pct": round(speed, 2),
+                                "memory_delta_pct": round(memory, 2), "flags": flags})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the core.crypto hot path.")
+    parser.add_argument('--sizes', nargs='+', default=None,
+                        help=f"Payload sizes (default: {' '.join(DEFAULT_SIZES)})")
+    parser.add_argument('--quick', action='store_true', help=f"Only run {' '.join(QUICK_SIZES)}")
+    parser.add_argument('--min-time', type=float, default=1.0, help="Seconds to sample each case (default: 1.0)")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="Runs of the whole suite; each case reports its best p50 (default: 3)")
+    parser.add_argument('--output', default='bench_crypto_results.json', help="Where to write this run's JSON")
+    parser.add_argument('--compare', metavar='BASELINE', help="Baseline JSON to compare this run against")
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help="Percent change counted as a regression in compare mode (default: 10)")
+    args = parser.parse_args()
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else DEFAULT_SIZES)
+    rounds = []
+    for number in range(1, max(1, args.repeat) + 1):
+        print(f"\nRound {number}/{max(1, args.repeat)}")
+        rounds.append(run_suite(sizes, args.min_time))
+    report = {"environment": environment(), "repeat": len(rounds), "results": best_of(rounds)}
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline['results'], report['results'], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0f}% against {args.compare}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0f}% against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+# Allow running from the backend directory or the repository root
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_crypto import environment, percentile
+from core.db import Database, DB_POOL_SIZE, DB_BUSY_TIMEOUT_MS, DB_STATEMENT_CACHE
+from core.link_store import SQLiteLinkStore, MemoryLinkStore, AppendLogLinkStore
+
+BACKENDS = ['sqlite', 'memory', 'log']
+DEFAULT_SIZES = ['10k', '1M', '10M']
+PRELOAD_BATCH = 50000
+# Share of preloaded links that are already expired when the reap phase starts
+EXPIRED_FRACTION = 0.1
+REAP_BATCH = 500
+
+
+def parse_count(text: str) -> int:
+    units = {'K': 10 ** 3, 'M': 10 ** 6, 'B': 10 ** 9}
+    text = text.strip().upper()
+    if text[-1:] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def make_record(i: int, now: float, expired: bool) -> dict:
+    """A link record shaped like the ones SecureLinkManager writes (base64 fields, no file)."""
+    return {
+        "id": f"{i:012x}",
+        "ciphertext": "q8YlCFu0CQ1HxUQ3xk0V2J8nJ0bCq3X2m7gE5mJmTtq1fZ8g7oM0wJ3hQ9p1vA==",
+        "nonce": "3m1Kx0cWq2Fh8b1T",
+        "password_hash": None,
+        "expiry": now - 60 if expired else now + 86400,
+        "created_at": now,
+        "file_ref": None,
+        "file_size": None,
+        "file_name": None,
+    }
+
+
+def open_store(backend: str, workdir: str):
+    """Returns (store, close) for a fresh store under workdir."""
+    if backend == 'sqlite':
+        database = Database(os.path.join(workdir, 'links.db'), DB_POOL_SIZE, DB_BUSY_TIMEOUT_MS, DB_STATEMENT_CACHE)
+        store = SQLiteLinkStore(database)
+
+        def close():
+            store.close()
+            database.close()
+        return store, close
+    if backend == 'memory':
+        store = MemoryLinkStore()
+        return store, store.close
+    store = AppendLogLinkStore(os.path.join(workdir, 'links.log'))
+    return store, store.close
+
+
+def preload(store, count: int, now: float) -> float:
+    """Bulk-loads count links, EXPIRED_FRACTION of them expired. Returns links/sec."""
+    expired_every = max(1, round(1 / EXPIRED_FRACTION))
+    started = time.perf_counter()
+    for base in range(0, count, PRELOAD_BATCH):
+        store.create_many([make_record(i, now, i % expired_every == 0)
+                           for i in range(base, min(count, base + PRELOAD_BATCH))])
+    elapsed = time.perf_counter() - started
+    return count / elapsed if elapsed else 0.0
+
+
+def timed_ops(op, args: list, threads: int) -> dict:
+    """Runs op(arg) for every arg across threads; reports throughput and latency."""
+    samples = [[] for _ in range(threads)]
+
+    def worker(n):
+        own = samples[n]
+        for arg in args[n::threads]:
+            t0 = time.perf_counter()
+            op(arg)
+            own.append(time.perf_counter() - t0)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - started
+    latencies = [s for own in samples for s in own]
+    return {
+        "operations": len(latencies),
+        "threads": threads,
+        "ops_per_sec": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 4),
+    }
+
+
+def bench_store(backend: str, count: int, operations: int, threads: int, workdir: str) -> dict:
+    os.makedirs(workdir, exist_ok=True)
+    store, close = open_store(backend, workdir)
+    try:
+        now = time.time()
+        result = {"preload_per_sec": round(preload(store, count, now), 1)}
+        rng = random.Random(count)
+
+        new_ids = range(count, count + operations)
+        result["create"] = timed_ops(lambda i: store.create(make_record(i, now, False)), list(new_ids), threads)
+
+        hits = [f"{rng.randrange(count):012x}" for _ in range(operations)]
+        result["get_hit"] = timed_ops(store.get, hits, threads)
+        misses = [f"{rng.randrange(count + operations, 2 ** 47):012x}" for _ in range(operations)]
+        result["get_miss"] = timed_ops(store.get, misses, threads)
+
+        t0 = time.perf_counter()
+        total = store.count()
+        result["count"] = {"links": total, "ms": round((time.perf_counter() - t0) * 1000, 3)}
+
+        # Reap everything that expired, one bounded batch at a time like LinkReaper
+        batches = []
+        reaped = 0
+        started = time.perf_counter()
+        while True:
+            t0 = time.perf_counter()
+            rows = store.delete_expired(now, REAP_BATCH)
+            batches.append(time.perf_counter() - t0)
+            reaped += len(rows)
+            if len(rows) < REAP_BATCH:
+                break
+        elapsed = time.perf_counter() - started
+        result["delete_expired"] = {
+            "rows": reaped,
+            "batch_size": REAP_BATCH,
+            "rows_per_sec": round(reaped / elapsed, 1) if elapsed else 0.0,
+            "batch_p50_ms": round(percentile(batches, 50) * 1000, 4),
+            "batch_p99_ms": round(percentile(batches, 99) * 1000, 4),
+        }
+        result["disk_bytes"] = sum(os.path.getsize(os.path.join(workdir, f)) for f in os.listdir(workdir))
+        return result
+    finally:
+        close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare secure link storage backends.")
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=BACKENDS)
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES,
+                        help=f"Preloaded link counts (default: {' '.join(DEFAULT_SIZES)})")
+    parser.add_argument('--operations', type=int, default=20000, help="Operations timed per phase (default: 20000)")
+    parser.add_argument('--threads', type=int, default=8, help="Concurrent callers per phase (default: 8)")
+    parser.add_argument('--workdir', default=None, help="Directory for the store files (default: a temp dir)")
+    parser.add_argument('--output', default='bench_link_store_results.json', help="Where to write this run's JSON")
+    args = parser.parse_args()
+
+    root = args.workdir or tempfile.mkdtemp(prefix='cryptaris-bench-')
+    results = {}
+    try:
+        for label in args.sizes:
+            count = parse_count(label)
+            for backend in args.backends:
+                name = f"{backend}/{label}"
+                workdir = os.path.join(root, name.replace('/', '-'))
+                r = results[name] = bench_store(backend, count, args.operations, args.threads, workdir)
+                shutil.rmtree(workdir, ignore_errors=True)
+                print(f"{name:<16} preload {r['preload_per_sec']:>11.0f}/s  "
+                      f"create {r['create']['ops_per_sec']:>9.0f}/s p99 {r['create']['p99_ms']:>8.3f} ms  "
+                      f"get p50 {r['get_hit']['p50_ms']:>7.3f} p99 {r['get_hit']['p99_ms']:>7.3f} ms  "
+                      f"miss p99 {r['get_miss']['p99_ms']:>7.3f} ms  "
+                      f"reap {r['delete_expired']['rows_per_sec']:>9.0f}/s  count {r['count']['ms']:>8.1f} ms")
+    finally:
+        if not args.workdir:
+            shutil.rmtree(root, ignore_errors=True)
+
+    report = {"environment": environment(), "results": results}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+# Allow running from the backend directory or the repository root
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Importing core.secure_links builds the global manager; keep it off backend/cryptaris.db
+os.environ.setdefault('LINK_STORE', 'memory')
+
+from bench_crypto import environment, parse_size, percentile
+from bench_link_store import BACKENDS, PRELOAD_BATCH, parse_count, open_store
+from core.secure_links import SecureLinkManager
+
+DEFAULT_SIZES = ['10k', '100k', '1M']
+DEFAULT_MIX = 'create=10,access=70,expired=10,unknown=10'
+OPERATIONS = ('create', 'access', 'expired', 'unknown')
+URL = "https://example.com/some/fairly/typical/path?with=query&and=more"
+PASSWORD = "bench-password"
+# Preloaded link population: expired share, password-protected share and, in "files"
+# mode, the share carrying a file payload
+EXPIRED_FRACTION = 0.2
+PASSWORD_FRACTION = 0.5
+FILE_FRACTION = 0.1
+
+
+def make_link_record(manager: SecureLinkManager, expiry: float, password: bool, file_ref=None, file_size=None) -> dict:
+    """Builds a record the way create_link() does, without writing it."""
+    nonce = os.urandom(12)
+    return {
+        "id": uuid.uuid4().hex[:12],
+        "ciphertext": base64.b64encode(manager._cipher.encrypt(nonce, URL.encode(), None)).decode('utf-8'),
+        "nonce": base64.b64encode(nonce).decode('utf-8'),
+        "password_hash": hashlib.sha256(PASSWORD.encode()).hexdigest() if password else None,
+        "expiry": expiry,
+        "created_at": time.time(),
+        "file_ref": file_ref,
+        "file_size": file_size,
+        "file_name": "payload.bin" if file_ref else None,
+    }
+
+
+def storage_bytes(workdir: str) -> dict:
+    """Sizes of the store files (database, WAL, log) and of the blob directory."""
+    sizes = {"store_bytes": 0, "blob_bytes": 0}
+    for root, _, files in os.walk(workdir):
+        key = "blob_bytes" if os.path.relpath(root, workdir).split(os.sep)[0] == 'blobs' else "store_bytes"
+        sizes[key] += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return sizes
+
+
+def preload(manager: SecureLinkManager, count: int, file_payload: bytes, max_files: int) -> dict:
+    """
+    Fills the store with count links: EXPIRED_FRACTION already expired, the rest live for a day.
+    Returns the live and expired (id, has_password) lists plus the load rate.
+    """
+    rng = random.Random(count)
+    now = time.time()
+    live, expired = [], []
+    files = 0
+    started = time.perf_counter()
+    for base in range(0, count, PRELOAD_BATCH):
+        batch = []
+        for _ in range(min(PRELOAD_BATCH, count - base)):
+            is_expired = rng.random() < EXPIRED_FRACTION
+            has_password = rng.random() < PASSWORD_FRACTION
+            file_ref = file_size = None
+            if file_payload and files < max_files and rng.random() < FILE_FRACTION:
+                file_ref, file_size = manager._blobs.put_bytes(file_payload)
+                files += 1
+            record = make_link_record(manager, now - 60 if is_expired else now + 86400, has_password, file_ref, file_size)
+            batch.append(record)
+            (expired if is_expired else live).append((record['id'], has_password))
+        manager.store.create_many(batch)
+    # Bulk loads bypass create_link(), so the ID filter is rebuilt from the store
+    manager.id_filter.rebuild()
+    elapsed = time.perf_counter() - started
+    return {
+        "live": live,
+        "expired": expired,
+        "stats": {"links": count, "with_files": files, "seconds": round(elapsed, 3),
+                  "links_per_sec": round(count / elapsed, 1) if elapsed else 0.0},
+    }
+
+
+def parse_mix(text: str) -> list:
+    """'create=10,access=70' -> cumulative [(op, upper_bound)] for weighted picks."""
+    weights = {}
+    for part in text.split(','):
+        op, _, weight = part.partition('=')
+        if op.strip() not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{op}'. Expected one of: {', '.join(OPERATIONS)}")
+        weights[op.strip()] = float(weight)
+    total = sum(weights.values())
+    cumulative, bound = [], 0.0
+    for op, weight in weights.items():
+        bound += weight / total
+        cumulative.append((op, bound))
+    return cumulative
+
+
+def run_workload(manager: SecureLinkManager, live: list, expired: list, mix: list, threads: int, duration: float,
+                 file_payload: bytes) -> dict:
+    """
+    Runs the weighted mix from many threads for duration seconds. Accesses drain the file
+    stream like a download would. Expected refusals (expired or unknown IDs) are successes;
+    anything else raised counts as an error.
+    """
+    samples = {op: [] for op in OPERATIONS}
+    errors = {op: 0 for op in OPERATIONS}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def access(link_id, has_password):
+        result = manager.access_link(link_id, PASSWORD if has_password else None)
+        if result['open_file']:
+            for _ in result['open_file']():
+                pass
+
+    def worker(n):
+        rng = random.Random(n)
+        own = {op: [] for op in OPERATIONS}
+        own_errors = {op: 0 for op in OPERATIONS}
+        created = []
+        while time.perf_counter() < deadline:
+            pick = rng.random()
+            op = next((name for name, bound in mix if pick < bound), mix[-1][0])
+            t0 = time.perf_counter()
+            try:
+                if op == 'create':
+                    has_password = rng.random() < PASSWORD_FRACTION
+                    with_file = file_payload if rng.random() < FILE_FRACTION else None
+                    result = manager.create_link(URL, PASSWORD if has_password else None, 86400,
+                                                 file_data=with_file, file_name="payload.bin" if with_file else None)
+                    created.append((result['link_id'], has_password))
+                elif op == 'access':
+                    source = created if created and rng.random() < 0.1 else live
+                    access(*source[rng.randrange(len(source))])
+                else:
+                    link_id = expired[rng.randrange(len(expired))][0] if op == 'expired' and expired \
+                        else uuid.uuid4().hex[:12]
+                    try:
+                        manager.access_link(link_id)
+                        own_errors[op] += 1  # an expired or unknown link must not resolve
+                    except ValueError:
+                        pass
+            except Exception:
+                own_errors[op] += 1
+            own[op].append(time.perf_counter() - t0)
+        with lock:
+            for op in OPERATIONS:
+                samples[op].extend(own[op])
+                errors[op] += own_errors[op]
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - started
+
+    report = {"threads": threads, "seconds": round(elapsed, 3),
+              "ops_per_sec": round(sum(len(s) for s in samples.values()) / elapsed, 1)}
+    for op in OPERATIONS:
+        if samples[op]:
+            report[op] = {
+                "operations": len(samples[op]),
+                "ops_per_sec": round(len(samples[op]) / elapsed, 1),
+                "p50_ms": round(percentile(samples[op], 50) * 1000, 4),
+                "p99_ms": round(percentile(samples[op], 99) * 1000, 4),
+                "errors": errors[op],
+            }
+    return report
+
+
+def bench_scenario(backend: str, count: int, file_payload: bytes, args, workdir: str) -> dict:
+    os.makedirs(workdir, exist_ok=True)
+    store, close = open_store(backend, workdir)
+    try:
+        manager = SecureLinkManager(store, blob_root=os.path.join(workdir, 'blobs'))
+        mix = parse_mix(args.mix)
+        loaded = preload(manager, count, file_payload, args.max_preload_files)
+        result = {"preload": loaded["stats"], "storage_before": storage_bytes(workdir)}
+        result["workload"] = run_workload(manager, loaded["live"], loaded["expired"], mix, args.threads,
+                                          args.duration, file_payload)
+
+        links_before = store.count()
+        t0 = time.perf_counter()
+        manager.cleanup()
+        elapsed = time.perf_counter() - t0
+        links_after = store.count()
+        result["cleanup"] = {
+            "seconds": round(elapsed, 3),
+            "links_removed": links_before - links_after,
+            "links_remaining": links_after,
+            "rows_per_sec": round((links_before - links_after) / elapsed, 1) if elapsed else 0.0,
+            # SQLite keeps freed pages for reuse, so the file only shrinks after VACUUM
+            "storage_after": storage_bytes(workdir),
+        }
+        # Same mix against the cleaned store: expired IDs are now rejected by the ID filter
+        result["workload_after_cleanup"] = run_workload(manager, loaded["live"], loaded["expired"], mix,
+                                                        args.threads, args.duration, file_payload)
+        return result
+    finally:
+        close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for SecureLinkManager at scale.")
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=['sqlite'],
+                        help="Link stores to run against (default: sqlite)")
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES,
+                        help=f"Links preloaded before each run (default: {' '.join(DEFAULT_SIZES)})")
+    parser.add_argument('--payloads', nargs='+', choices=['none', 'files'], default=['none', 'files'],
+                        help="Run without file payloads, with them, or both (default: both)")
+    parser.add_argument('--file-size', default='16KB', help="Size of each file payload (default: 16KB)")
+    parser.add_argument('--max-preload-files', type=int, default=10000,
+                        help="Cap on preloaded links with a file, to bound disk use (default: 10000)")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f"Operation weights (default: {DEFAULT_MIX})")
+    parser.add_argument('--threads', type=int, default=16, help="Concurrent clients (default: 16)")
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds per workload run (default: 10)")
+    parser.add_argument('--workdir', default=None, help="Directory for store files and blobs (default: a temp dir)")
+    parser.add_argument('--output', default='bench_links_results.json', help="Where to write this run's JSON")
+    args = parser.parse_args()
+
+    file_payload = os.urandom(parse_size(args.file_size))
+    root = args.workdir or tempfile.mkdtemp(prefix='cryptaris-links-')
+    results = {}
+    try:
+        for label in args.sizes:
+            count = parse_count(label)
+            for backend in args.backends:
+                for payload in args.payloads:
+                    name = f"{backend}/{label}/{payload}"
+                    workdir = os.path.join(root, name.replace('/', '-'))
+                    r = results[name] = bench_scenario(backend, count, file_payload if payload == 'files' else None,
+                                                       args, workdir)
+                    shutil.rmtree(workdir, ignore_errors=True)
+                    w, after, c = r['workload'], r['workload_after_cleanup'], r['cleanup']
+                    print(f"{name:<22} preload {r['preload']['links_per_sec']:>9.0f}/s  "
+                          f"mixed {w['ops_per_sec']:>8.0f} ops/s -> {after['ops_per_sec']:>8.0f} after cleanup  "
+                          f"access p99 {w.get('access', {}).get('p99_ms', 0):>8.3f} ms  "
+                          f"cleanup {c['links_removed']} links in {c['seconds']:.2f} s  "
+                          f"store {r['storage_before']['store_bytes'] / 1024 / 1024:.1f} MB")
+    finally:
+        if not args.workdir:
+            shutil.rmtree(root, ignore_errors=True)
+
+    report = {
+        "environment": environment(),
+        "config": {"mix": args.mix, "threads": args.threads, "duration": args.duration, "file_size": args.file_size,
+                   "expired_fraction": EXPIRED_FRACTION, "file_fraction": FILE_FRACTION},
+        "results": results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+# Allow running from the backend directory or the repository root
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_crypto import environment, percentile
+from core import stega
+
+DEFAULT_MEGAPIXELS = [1, 4, 12]
+DEFAULT_JPEG_QUALITIES = [90, 75, 50]
+
+
+def make_photo(megapixels: float) -> Image.Image:
+    """Photo-like 4:3 RGB test image: smooth gradients plus sensor-style noise."""
+    height = int((megapixels * 1e6 * 3 / 4) ** 0.5)
+    width = int(height * 4 / 3)
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([(x * 255 // width), (y * 255 // height), ((x + y) * 255 // (width + height))], axis=-1)
+    noise = np.random.default_rng(0).integers(0, 6, base.shape)
+    return Image.fromarray(np.clip(base + noise, 0, 255).astype(np.uint8), 'RGB')
+
+
+def timed(fn, repeat: int) -> dict:
+    fn()  # warm up
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return {"p50_ms": round(percentile(samples, 50) * 1000, 3), "min_ms": round(min(samples) * 1000, 3)}
+
+
+def per_megapixel(result: dict, megapixels: float) -> dict:
+    result["ms_per_megapixel"] = round(result["p50_ms"] / megapixels, 3)
+    result["megapixels_per_sec"] = round(megapixels / (result["p50_ms"] / 1000), 2) if result["p50_ms"] else 0.0
+    return result
+
+
+def psnr(original: Image.Image, stego) -> float:
+    """Peak signal-to-noise ratio of the carrier against the original, in dB."""
+    stego.seek(0)
+    error = np.asarray(original, dtype=np.float64) - np.asarray(Image.open(stego).convert(original.mode), dtype=np.float64)
+    mse = float(np.mean(error ** 2))
+    return round(10 * np.log10(255 ** 2 / mse), 2) if mse else float('inf')
+
+
+def bench_dct(img: Image.Image, carrier: io.BytesIO, fill: float, repeat: int, qualities: list) -> dict:
+    """
+    DCT engine: hide/reveal throughput, and reveal after the carrier is recompressed as
+    JPEG at each quality (the messenger and social-media case).
+    """
+    mp = img.width * img.height / 1e6
+    capacity = stega.image_capacity(carrier, mode='dct')["max_message_bytes"]
+    # Random text barely compresses, so fill measures the embedded share of the capacity
+    message = np.random.default_rng(1).integers(32, 127, max(1, int(capacity * fill)), dtype=np.uint8).tobytes().decode()
+
+    def hide_file():
+        carrier.seek(0)
+        stega.hide_message_in_image(carrier, message, io.BytesIO(), mode='dct')
+
+    stego = io.BytesIO()
+    carrier.seek(0)
+    stega.hide_message_in_image(carrier, message, stego, mode='dct')
+
+    def reveal_file():
+        stego.seek(0)
+        stega.reveal_message_from_image(stego)
+
+    results = {
+        "capacity_bytes": capacity,
+        "message_bytes": len(message),
+        "ecc": stega.STEGA_DCT_ECC,
+        "step": stega.STEGA_DCT_STEP,
+        "psnr_db": psnr(img, stego),
+        "hide": per_megapixel(timed(hide_file, repeat), mp),
+        "reveal": per_megapixel(timed(reveal_file, repeat), mp),
+        "jpeg": {},
+    }
+    for quality in qualities:
+        recompressed = io.BytesIO()
+        stego.seek(0)
+        Image.open(stego).save(recompressed, format="JPEG", quality=quality)
+        try:
+            survived = stega.reveal_message_from_image(recompressed) == message
+        except ValueError:
+            survived = False
+        entry = results["jpeg"][f"q{quality}"] = {"survived": survived}
+        if survived:
+            def reveal_jpeg():
+                recompressed.seek(0)
+                stega.reveal_message_from_image(recompressed)
+            entry["reveal"] = per_megapixel(timed(reveal_jpeg, repeat), mp)
+    return results
+
+
+def bench_image(megapixels: float, fill: float, repeat: int, compare: bool, modes: list, qualities: list) -> dict:
+    img = make_photo(megapixels)
+    mp = img.width * img.height / 1e6
+    message = "m" * max(1, int(img.width * img.height * stega.BITS_PER_PIXEL // 8 * fill) - 16)
+    carrier = io.BytesIO()
+    img.save(carrier, format="PNG", compress_level=1)
+    carrier_png = carrier.getvalue()
+    pixels = np.array(img)
+    header, payload = stega._frame(message.encode(stega.ENCODING))
+    bits = stega._payload_bits(header + payload)
+
+    def hide_file():
+        carrier.seek(0)
+        stega.hide_message_in_image(carrier, message, io.BytesIO())
+
+    stego = io.BytesIO()
+    carrier.seek(0)
+    stega.hide_message_in_image(carrier, message, stego)
+
+    def reveal_file():
+        stego.seek(0)
+        stega.reveal_message_from_image(stego)
+
+    results = {"width": img.width, "height": img.height}
+    if 'dct' in modes:
+        results["dct"] = bench_dct(img, carrier, fill, repeat, qualities)
+    if 'lsb' not in modes:
+        return results
+    results.update({
+        "message_bytes": len(message),
+        "embed": per_megapixel(timed(lambda: stega._embed_bits(pixels.copy(), bits), repeat), mp),
+        "hide": per_megapixel(timed(hide_file, repeat), mp),
+        "reveal": per_megapixel(timed(reveal_file, repeat), mp),
+    })
+
+    if compare:
+        from stegano import lsb
+        # stegano can only read its own layout, so it reveals a carrier it made itself
+        stego_image = lsb.hide(img.copy(), message)
+        results["stegano_embed"] = per_megapixel(timed(lambda: lsb.hide(img.copy(), message), 1), mp)
+        results["stegano_reveal"] = per_megapixel(timed(lambda: lsb.reveal(stego_image, close_file=False), 1), mp)
+
+        def stegano_hide_file():
+            # A fresh buffer each time: stegano closes the image it is given
+            lsb.hide(Image.open(io.BytesIO(carrier_png)), message).save(io.BytesIO(), format="PNG")
+
+        results["stegano_hide"] = per_megapixel(timed(stegano_hide_file, 1), mp)
+        results["embed_speedup"] = round(results["stegano_embed"]["p50_ms"] / results["embed"]["p50_ms"], 1)
+        # End to end both sides decode and re-encode the PNG, which dominates once embedding is fast
+        results["hide_speedup"] = round(results["stegano_hide"]["p50_ms"] / results["hide"]["p50_ms"], 1)
+        # stegano reads pixels from an already decoded image; ours includes the PNG decode
+        results["reveal_speedup"] = round(results["stegano_reveal"]["p50_ms"] / results["reveal"]["p50_ms"], 1)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of the LSB and DCT steganography engines.")
+    parser.add_argument('--megapixels', nargs='+', type=float, default=DEFAULT_MEGAPIXELS,
+                        help=f"Image sizes (default: {' '.join(map(str, DEFAULT_MEGAPIXELS))})")
+    parser.add_argument('--fill', type=float, default=0.25, help="Share of the image capacity used (default: 0.25)")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per case (default: 5)")
+    parser.add_argument('--modes', nargs='+', choices=['lsb', 'dct'], default=['lsb', 'dct'],
+                        help="Embedding engines to run (default: both)")
+    parser.add_argument('--jpeg-quality', nargs='+', type=int, default=DEFAULT_JPEG_QUALITIES,
+                        help=f"JPEG recompression qualities a DCT carrier is revealed after "
+                             f"(default: {' '.join(map(str, DEFAULT_JPEG_QUALITIES))})")
+    parser.add_argument('--compare-stegano', action='store_true',
+                        help="Also time the pure-Python stegano.lsb implementation (slow; needs stegano installed)")
+    parser.add_argument('--output', default='bench_stega_results.json', help="Where to write this run's JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for megapixels in args.megapixels:
+        name = f"{megapixels:g}MP"
+        r = results[name] = bench_image(megapixels, args.fill, args.repeat, args.compare_stegano, args.modes,
+                                        args.jpeg_quality)
+        if 'lsb' in args.modes:
+            line = (f"{name:<8} lsb embed {r['embed']['ms_per_megapixel']:>8.2f} ms/MP  "
+                    f"hide {r['hide']['ms_per_megapixel']:>8.2f} ms/MP  reveal {r['reveal']['ms_per_megapixel']:>8.2f} ms/MP")
+            if args.compare_stegano:
+                line += (f"  vs stegano: embed {r['embed_speedup']}x, hide {r['hide_speedup']}x, "
+                         f"reveal {r['reveal_speedup']}x")
+            print(line)
+        if 'dct' in args.modes:
+            d = r['dct']
+            survived = ' '.join(f"{q}:{'ok' if v['survived'] else 'lost'}" for q, v in d['jpeg'].items())
+            print(f"{name:<8} dct hide {d['hide']['ms_per_megapixel']:>8.2f} ms/MP  "
+                  f"reveal {d['reveal']['ms_per_megapixel']:>8.2f} ms/MP  {d['message_bytes']} B  "
+                  f"PSNR {d['psnr_db']} dB  after JPEG {survived}")
+
+    report = {"environment": environment(),
+              "config": {"fill": args.fill, "repeat": args.repeat, "modes": args.modes,
+                         "jpeg_quality": args.jpeg_quality},
+              "results": results}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
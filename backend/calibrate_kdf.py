@@ -0,0 +1,41 @@
+import argparse
+import os
+import sys
+
+# Allow running from the backend directory or the repository root
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core import kdf
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark this host and pick KDF parameters for a target derive latency."
+    )
+    default_algorithm = 'argon2id' if kdf.argon2_available() else 'scrypt'
+    parser.add_argument('--algorithm', choices=sorted(kdf.ALGORITHM_IDS), default=default_algorithm,
+                        help="KDF to calibrate (default: argon2id, or scrypt without an Argon2 backend)")
+    parser.add_argument('--target-ms', type=float, default=50.0,
+                        help="Target latency of a single derive in milliseconds (default: 50)")
+    parser.add_argument('--max-memory-mb', type=int, default=256,
+                        help="Memory ceiling for scrypt/argon2id in MiB (default: 256)")
+    parser.add_argument('--parallelism', type=int, default=None,
+                        help="Argon2id lanes (default: min(4, CPU count))")
+    args = parser.parse_args()
+
+    algorithm = kdf.ALGORITHM_IDS[args.algorithm]
+    print(f"Calibrating {args.algorithm} for ~{args.target_ms:.0f} ms per derive...")
+    params = kdf.calibrate(algorithm, args.target_ms, args.max_memory_mb * 1024, args.parallelism)
+    measured_ms = kdf.time_derive(params, rounds=5) * 1000
+
+    print(f"Selected: {kdf.describe(params)}")
+    print(f"Measured: {measured_ms:.1f} ms per derive")
+    print("\nAdd to your .env:")
+    print(f"KDF_ALGORITHM={args.algorithm}")
+    print(f"KDF_COST={params.cost}")
+    print(f"KDF_MEMORY={params.memory}")
+    print(f"KDF_PARALLELISM={params.parallelism}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import io
+import os
+import re
+import struct
+import hashlib
+import tempfile
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from cryptography.hazmat.primitives import hashes
+from cryptography.exceptions import InvalidTag
+from core.shredder import shred_file
+
+# Encrypted file payloads live on disk next to the database, sharded by hash prefix
+BLOB_STORE_PATH = os.getenv('BLOB_STORE_PATH', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'blobs'))
+BLOB_CHUNK_SIZE = int(os.getenv('BLOB_CHUNK_SIZE', 256 * 1024))
+
+# Blob layout: [MAGIC(4)][VERSION(1)][SALT(16)][CHUNK_SIZE(4)][NONCE_PREFIX(7)] followed by
+# AES-GCM segments of CHUNK_SIZE plaintext bytes (the last one may be shorter).
+# Each blob gets its own key, HKDF(master key, salt); the segment nonce is
+# NONCE_PREFIX || COUNTER(4) || FINAL_FLAG(1) and the header is the AAD.
+# A blob is named by the SHA-256 of its encrypted bytes. open() does not re-hash the
+# file (that would mean reading all of it for a Range request); integrity comes from the
+# per-segment authentication instead, so damaged or swapped segments fail to decrypt.
+BLOB_MAGIC = b"CRYB"
+BLOB_VERSION = 1
+_BLOB_HEADER = struct.Struct(">4sB16sI7s")
+BLOB_HEADER_SIZE = _BLOB_HEADER.size
+BLOB_TAG_SIZE = 16
+_BLOB_KEY_INFO = b"cryptaris-link-blob-v1"
+_REF_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class BlobStore:
+    """Content-addressed store of chunk-encrypted blobs."""
+
+    def __init__(self, root: str, master_key: bytes, chunk_size: int = BLOB_CHUNK_SIZE):
+        self.root = root
+        self.chunk_size = chunk_size
+        self._master_key = master_key
+        os.makedirs(self.root, exist_ok=True)
+
+    def _blob_key(self, salt: bytes) -> AESGCM:
+        hkdf = HKDF(algorithm=hashes.SHA256(), length=32, salt=salt, info=_BLOB_KEY_INFO)
+        return AESGCM(hkdf.derive(self._master_key))
+
+    def path_for(self, ref: str) -> str:
+        if not _REF_PATTERN.match(ref or ""):
+            raise ValueError("Invalid blob reference.")
+        return os.path.join(self.root, ref[:2], ref)
+
+    def put(self, src) -> tuple:
+        """
+        Encrypts everything readable from src into a new blob.
+        Returns (ref, plaintext_size). Only one chunk is held in memory at a time.
+        """
+        salt = os.urandom(16)
+        nonce_prefix = os.urandom(7)
+        header = _BLOB_HEADER.pack(BLOB_MAGIC, BLOB_VERSION, salt, self.chunk_size, nonce_prefix)
+        aesgcm = self._blob_key(salt)
+        digest = hashlib.sha256()
+        size = 0
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                out.write(header)
+                digest.update(header)
+                counter = 0
+                chunk = src.read(self.chunk_size)
+                while True:
+                    following = src.read(self.chunk_size) if len(chunk) == self.chunk_size else b""
+                    final = not following
+                    segment = aesgcm.encrypt(_segment_nonce(nonce_prefix, counter, final), chunk, header)
+                    out.write(segment)
+                    digest.update(segment)
+                    size += len(chunk)
+                    if final:
+                        break
+                    chunk = following
+                    counter += 1
+
+            ref = digest.hexdigest()
+            path = self.path_for(ref)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return ref, size
+
+    def put_bytes(self, data: bytes) -> tuple:
+        return self.put(io.BytesIO(data))
+
+    def open(self, ref: str, start: int = 0, end: int = None):
+        """
+        Returns a generator of plaintext chunks covering bytes [start, end) of the blob
+        (the whole blob by default). Only the segments overlapping the range are read.
+        The header is checked eagerly so a missing or foreign blob fails before a
+        response is started; every segment is authenticated before it is yielded.
+        """
+        f = open(self.path_for(ref), 'rb')
+        try:
+            header = f.read(BLOB_HEADER_SIZE)
+            if len(header) < BLOB_HEADER_SIZE:
+                raise ValueError("Blob is truncated.")
+            magic, version, salt, chunk_size, nonce_prefix = _BLOB_HEADER.unpack(header)
+            if magic != BLOB_MAGIC or version != BLOB_VERSION or chunk_size <= 0:
+                raise ValueError("Unsupported blob format.")
+            # Segment count follows from the file size: every segment carries one tag
+            body_size = os.fstat(f.fileno()).st_size - BLOB_HEADER_SIZE
+            segment_size = chunk_size + BLOB_TAG_SIZE
+            segments = max(1, -(-body_size // segment_size))
+            plaintext_size = body_size - segments * BLOB_TAG_SIZE
+            if plaintext_size < 0:
+                raise ValueError("Blob is truncated.")
+        except BaseException:
+            f.close()
+            raise
+        end = plaintext_size if end is None else min(end, plaintext_size)
+        return self._iter_segments(f, self._blob_key(salt), header, chunk_size, nonce_prefix,
+                                   segments - 1, start, end)
+
+    def _iter_segments(self, f, aesgcm: AESGCM, header: bytes, chunk_size: int, nonce_prefix: bytes,
+                       last: int, start: int, end: int):
+        segment_size = chunk_size + BLOB_TAG_SIZE
+        with f:
+            first = min(start // chunk_size, last)
+            f.seek(BLOB_HEADER_SIZE + first * segment_size)
+            for counter in range(first, last + 1):
+                segment = f.read(segment_size)
+                # The final flag comes from the file size, so truncation or appended data fails authentication
+                try:
+                    chunk = aesgcm.decrypt(_segment_nonce(nonce_prefix, counter, counter == last), segment, header)
+                except InvalidTag:
+                    raise ValueError("File decryption failed. Data corruption.")
+                offset = counter * chunk_size
+                lo = max(start - offset, 0)
+                hi = min(end - offset, len(chunk))
+                if lo < hi:
+                    yield chunk if (lo, hi) == (0, len(chunk)) else chunk[lo:hi]
+                if offset + len(chunk) >= end:
+                    return
+
+    def delete(self, ref: str, shred: bool = False) -> bool:
+        """Removes a blob; with shred=True it is overwritten on disk first."""
+        path = self.path_for(ref)
+        if shred:
+            return shred_file(path, passes=1)
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+
+def _segment_nonce(prefix: bytes, counter: int, final: bool) -> bytes:
+    return prefix + struct.pack(">I", counter) + (b"\x01" if final else b"\x00")
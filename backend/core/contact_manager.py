@@ -1,24 +1,14 @@
 
-import sqlite3
-import os
 import time
 import uuid
-
-# Database Path (Same as secure links to keep single DB file)
-DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cryptaris.db')
+from core.db import db
 
 class ContactManager:
     def __init__(self):
         self._init_db()
 
-    def _get_db_connection(self):
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        return conn
-
     def _init_db(self):
-        conn = self._get_db_connection()
-        try:
+        with db.transaction() as conn:
             conn.execute('''
                 CREATE TABLE IF NOT EXISTS contacts (
                     id TEXT PRIMARY KEY,
@@ -28,9 +18,6 @@ class ContactManager:
                     created_at REAL
                 )
             ''')
-            conn.commit()
-        finally:
-            conn.close()
 
     def save_message(self, name: str, email: str, message: str) -> dict:
         """
@@ -39,13 +26,9 @@ class ContactManager:
         msg_id = uuid.uuid4().hex
         timestamp = time.time()
         
-        conn = self._get_db_connection()
-        try:
-            conn.execute('INSERT INTO contacts (id, name, email, message, created_at) VALUES (?, ?, ?, ?, ?)',
-                         (msg_id, name, email, message, timestamp))
-            conn.commit()
-        finally:
-            conn.close()
+        # Group-committed with other concurrent writes; returns once durable
+        db.write(lambda conn: conn.execute('INSERT INTO contacts (id, name, email, message, created_at) VALUES (?, ?, ?, ?, ?)',
+                                           (msg_id, name, email, message, timestamp)))
 
         return {"id": msg_id, "status": "saved"}
 
@@ -1,10 +1,17 @@
 import os
 import base64
+import struct
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives import hashes
 from cryptography.exceptions import InvalidTag
 from dotenv import load_dotenv
+from core import kdf
+from core.kdf_pool import kdf_pool, KDFPoolSaturated
 
 load_dotenv()
 
@@ -15,15 +22,79 @@ if not SYSTEM_MASTER_KEY:
     logging.warning("Using a randomly generated volatile key. ANY PREVIOUSLY ENCRYPTED FILES OR DB LINKS WILL NOT BE DECRYPTABLE UNLESS THE ORIGINAL KEY IS RESTORED.")
     SYSTEM_MASTER_KEY = base64.b64encode(os.urandom(32)).decode('utf-8')
 
-def derive_key(password: str, salt: bytes) -> bytes:
-    """Derive a 256-bit key from the password using PBKDF2."""
-    kdf = PBKDF2HMAC(
+# Container format versions.
+# Version 1 (legacy, no header, decrypt only): [NONCE(12)][LAYER2], system key =
+#   PBKDF2(SYSTEM_MASTER_KEY, salt), user key = PBKDF2-SHA256 with 100,000 iterations
+# Version 2: envelope mode, [MAGIC(4)][VERSION(1)][KEY_SLOT][NONCE(12)][CIPHERTEXT]
+# Version 3 (files only): segmented STREAM container keyed by a wrapped data key
+FORMAT_MAGIC = b"CRYX"
+FORMAT_V1_LEGACY = 1
+FORMAT_V2_ENVELOPE = 2
+FORMAT_V3_STREAM = 3
+HEADER_SIZE = len(FORMAT_MAGIC) + 1
+
+# Envelope mode encrypts the payload once under a random data key (DEK). The DEK is
+# wrapped with the user key, and that result is wrapped again with the system subkey:
+# [NONCE(12)][AESGCM_system([NONCE(12)][AESGCM_user(DEK)])]
+# Together with the KDF descriptor in front of it this forms the "key slot". Changing the
+# password, the KDF parameters or the system key only rewrites the key slot.
+DATA_KEY_SIZE = 32
+WRAPPED_KEY_SIZE = 12 + (12 + DATA_KEY_SIZE + 16) + 16
+KEY_SLOT_SIZE = kdf.DESCRIPTOR_SIZE + WRAPPED_KEY_SIZE
+
+# Batch operations share one KDF run per batch and spread the AES-GCM work over a pool
+BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', 10000))
+# Each distinct salt in a decrypt batch costs at least one password KDF run
+BATCH_MAX_SALTS = int(os.getenv('BATCH_MAX_SALTS', 16))
+BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', os.cpu_count() or 2))
+_batch_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix='batch-crypto')
+
+# Fixed salt for the one-off system root derivation. Per-file uniqueness comes from
+# the HKDF step below, so this only has to be stable across restarts.
+_SYSTEM_ROOT_SALT = b"cryptaris-system-root-v2"
+_SYSTEM_SUBKEY_INFO = b"cryptaris-system-layer-v2"
+
+# Streaming container layout:
+# [MAGIC(4)][VERSION(1)][SALT(16)][CHUNK_SIZE(4)][NONCE_PREFIX(7)][KEY_SLOT]
+# followed by AES-GCM segments of CHUNK_SIZE plaintext bytes (the last one may be shorter).
+# Segment nonce = NONCE_PREFIX || COUNTER(4) || FINAL_FLAG(1); the fixed header part is the AAD.
+STREAM_CHUNK_SIZE = int(os.getenv('STREAM_CHUNK_SIZE', 256 * 1024))
+STREAM_MAX_CHUNK_SIZE = 16 * 1024 * 1024
+STREAM_TAG_SIZE = 16
+# AES-GCM releases the GIL, so independent segments are sealed on a shared thread pool.
+# Each stream keeps at most STREAM_WORKERS * 2 segments in flight.
+STREAM_WORKERS = int(os.getenv('STREAM_WORKERS', os.cpu_count() or 2))
+_stream_executor = ThreadPoolExecutor(max_workers=STREAM_WORKERS, thread_name_prefix='stream-crypto')
+_STREAM_HEADER = struct.Struct(">4sB16sI7s")
+STREAM_HEADER_SIZE = _STREAM_HEADER.size
+
+def derive_key(password: str, salt: bytes, params: kdf.KDFParams = kdf.LEGACY_PARAMS) -> bytes:
+    """
+    Derive a 256-bit key from the password (PBKDF2 with 100,000 iterations unless
+    other parameters are given). Runs on the bounded KDF pool; raises
+    KDFPoolSaturated when it is full.
+    """
+    return kdf_pool.run(kdf.derive, password, salt, params)
+
+# Derived once per process: the system secret is stretched a single time at startup
+# instead of on every request.
+SYSTEM_ROOT_KEY = kdf.derive(SYSTEM_MASTER_KEY, _SYSTEM_ROOT_SALT, kdf.LEGACY_PARAMS)
+
+def derive_system_subkey(salt: bytes, root_key: bytes = None) -> bytes:
+    """Derive the per-salt system layer key from the cached root key using HKDF."""
+    hkdf = HKDF(
         algorithm=hashes.SHA256(),
         length=32,
         salt=salt,
-        iterations=100000,
+        info=_SYSTEM_SUBKEY_INFO,
     )
-    return kdf.derive(password.encode())
+    return hkdf.derive(root_key or SYSTEM_ROOT_KEY)
+
+def _format_version(blob: bytes) -> int:
+    """Detects the container version of a system layer blob."""
+    if len(blob) > HEADER_SIZE and blob[:len(FORMAT_MAGIC)] == FORMAT_MAGIC:
+        return blob[len(FORMAT_MAGIC)]
+    return FORMAT_V1_LEGACY
 
 def _encrypt_layer(data: bytes, key: bytes) -> bytes:
     """Helper for AES-GCM encryption."""
@@ -32,64 +103,529 @@ def _encrypt_layer(data: bytes, key: bytes) -> bytes:
     ciphertext = aesgcm.encrypt(nonce, data, None)
     return nonce + ciphertext
 
-def _decrypt_layer(data: bytes, key: bytes) -> bytes:
-    """Helper for AES-GCM decryption."""
-    nonce = data[:12]
-    ciphertext = data[12:]
+def _decrypt_layer(data, key: bytes) -> bytes:
+    """Helper for AES-GCM decryption. Accepts any buffer; slices are views, not copies."""
+    view = memoryview(data)
     aesgcm = AESGCM(key)
-    return aesgcm.decrypt(nonce, ciphertext, None)
+    return aesgcm.decrypt(view[:12], view[12:], None)
+
+def _wrap_data_key(data_key: bytes, user_key: bytes, system_key: bytes, aad: bytes) -> bytes:
+    """Wraps the data key with the user key, then with the system key."""
+    inner_nonce = os.urandom(12)
+    inner = inner_nonce + AESGCM(user_key).encrypt(inner_nonce, data_key, aad)
+    outer_nonce = os.urandom(12)
+    return outer_nonce + AESGCM(system_key).encrypt(outer_nonce, inner, aad)
+
+def _unwrap_system_layer(wrapped_key: bytes, system_key: bytes, aad: bytes) -> bytes:
+    try:
+        return AESGCM(system_key).decrypt(wrapped_key[:12], wrapped_key[12:], aad)
+    except InvalidTag:
+        raise ValueError("System Integrity Check Failed: This file was not encrypted by this Cryptaris instance or has been tampered with.")
+
+def _unwrap_user_layer(inner: bytes, user_key: bytes, aad: bytes) -> bytes:
+    try:
+        return AESGCM(user_key).decrypt(inner[:12], inner[12:], aad)
+    except InvalidTag:
+        raise ValueError("User Authentication Failed: Incorrect password.")
+
+def _seal_key_slot(data_key: bytes, user_key: bytes, system_key: bytes, aad: bytes, params: kdf.KDFParams) -> bytes:
+    """Builds [KDF_DESCRIPTOR][WRAPPED_KEY]; the descriptor is authenticated with the wrap."""
+    descriptor = kdf.encode_params(params)
+    return descriptor + _wrap_data_key(data_key, user_key, system_key, aad + descriptor)
+
+def _split_key_slot(slot: bytes):
+    """Returns (params, descriptor, wrapped_key) for a key slot."""
+    descriptor = bytes(slot[:kdf.DESCRIPTOR_SIZE])
+    return kdf.decode_params(descriptor), descriptor, slot[kdf.DESCRIPTOR_SIZE:]
+
+def _open_key_slot(slot: bytes, aad: bytes, system_key: bytes, get_user_key) -> bytes:
+    """
+    Recovers the data key. get_user_key(params) is only called once the system
+    layer has been verified, so foreign blobs never pay for the password KDF.
+    """
+    params, descriptor, wrapped_key = _split_key_slot(slot)
+    inner = _unwrap_system_layer(wrapped_key, system_key, aad + descriptor)
+    return _unwrap_user_layer(inner, get_user_key(params), aad + descriptor)
+
+def _rewrap_key_slot(slot: bytes, aad: bytes, salt: bytes, password: str,
+                     new_password: str = None, old_system_root_key: bytes = None) -> bytes:
+    """
+    Re-wraps a data key for a new password and/or the current system key, moving it
+    to the active KDF parameters. The payload itself is never touched.
+    """
+    params, descriptor, wrapped_key = _split_key_slot(slot)
+    inner = _unwrap_system_layer(wrapped_key, derive_system_subkey(salt, old_system_root_key), aad + descriptor)
+    data_key = _unwrap_user_layer(inner, derive_key(password, salt, params), aad + descriptor)
+
+    new_password = password if new_password is None else new_password
+    system_key = derive_system_subkey(salt)
+    new_params = kdf.ACTIVE_PARAMS
+    return _seal_key_slot(data_key, derive_key(new_password, salt, new_params), system_key, aad, new_params)
+
+def _seal_envelope(data: bytes, user_key: bytes, system_key: bytes, params: kdf.KDFParams) -> bytes:
+    """Builds a version 2 container body: [MAGIC][VERSION][KEY_SLOT][NONCE][CIPHERTEXT]."""
+    header = FORMAT_MAGIC + bytes([FORMAT_V2_ENVELOPE])
+    data_key = AESGCM.generate_key(bit_length=256)
+    key_slot = _seal_key_slot(data_key, user_key, system_key, header, params)
+    
+    nonce = os.urandom(12)
+    ciphertext = AESGCM(data_key).encrypt(nonce, data, header)
+    return header + key_slot + nonce + ciphertext
+
+def _authenticated_envelope_params(blob: bytes, system_key: bytes) -> kdf.KDFParams:
+    """
+    KDF parameters of an envelope container, returned only after the system layer of
+    its key slot has authenticated them (ValueError otherwise).
+    """
+    params, descriptor, wrapped_key = _split_key_slot(blob[HEADER_SIZE:HEADER_SIZE + KEY_SLOT_SIZE])
+    _unwrap_system_layer(wrapped_key, system_key, bytes(blob[:HEADER_SIZE]) + descriptor)
+    return params
+
+def _open_envelope(blob, system_key: bytes, get_user_key) -> bytes:
+    """
+    Opens an envelope container; see _open_key_slot for get_user_key.
+    blob may be any buffer. The payload is only ever sliced as a memoryview, so the
+    sole large allocation is the plaintext itself.
+    """
+    blob = memoryview(blob)
+    header = bytes(blob[:HEADER_SIZE])
+    slot_end = HEADER_SIZE + KEY_SLOT_SIZE
+    key_slot = bytes(blob[HEADER_SIZE:slot_end])
+    body = blob[slot_end:]
+    if len(body) < 12 + 16:
+        raise ValueError("Invalid ciphertext: container is truncated.")
+    data_key = _open_key_slot(key_slot, header, system_key, get_user_key)
+    try:
+        return AESGCM(data_key).decrypt(body[:12], body[12:], header)
+    except InvalidTag:
+        raise ValueError("System Integrity Check Failed: This file was not encrypted by this Cryptaris instance or has been tampered with.")
 
 def encrypt_data(data: bytes, password: str) -> dict:
     """
-    System-Bound Encryption:
-    1. Layer 1: Encrypt with User Password
-    2. Layer 2: Encrypt with System Master Key
-    3. Format: [SALT(16)][LAYER2_CIPHERTEXT]
+    System-Bound Envelope Encryption:
+    1. Encrypt the payload once with a random data key
+    2. Wrap the data key with the User Password, then with the System Master Key
+    3. Format: [SALT(16)][MAGIC][VERSION][KDF][WRAPPED_KEY][NONCE][CIPHERTEXT]
     """
     salt = os.urandom(16)
-    user_key = derive_key(password, salt)
-    
-    # Layer 1: User Encryption
-    layer1_cipher = _encrypt_layer(data, user_key)
+    params = kdf.ACTIVE_PARAMS
+    user_key = derive_key(password, salt, params)
+    system_key = derive_system_subkey(salt)
     
-    # Layer 2: System Encryption
-    system_key = derive_key(SYSTEM_MASTER_KEY, salt) # Use same salt for simplicity/binding
-    layer2_cipher = _encrypt_layer(layer1_cipher, system_key)
+    container = _seal_envelope(data, user_key, system_key, params)
     
     # Construct final payload
     # We return components for JSON, or raw bytes for files
-    # For JSON compatibility with existing frontend, we encode layer2
+    # For JSON compatibility with existing frontend, we encode the container
     
     return {
-        'ciphertext': base64.b64encode(layer2_cipher).decode('utf-8'),
+        'ciphertext': base64.b64encode(container).decode('utf-8'),
         'salt': base64.b64encode(salt).decode('utf-8'),
         'nonce': "", # Nonce is embedded in ciphertext in this new schema
         'mode': 'SYSTEM_BOUND'
     }
 
+def _decrypt_envelope(blob: bytes, password: str, salt: bytes) -> bytes:
+    return _open_envelope(blob, derive_system_subkey(salt), lambda params: derive_key(password, salt, params))
+
+def _decrypt_legacy(blob, password: str, salt: bytes, derive=derive_key) -> bytes:
+    """Decrypts a version 1 (headerless, two-layer) container."""
+    # Layer 2: System Decryption
+    system_key = derive(SYSTEM_MASTER_KEY, salt)
+    try:
+        layer1_cipher = _decrypt_layer(blob, system_key)
+    except InvalidTag:
+         raise ValueError("System Integrity Check Failed: This file was not encrypted by this Cryptaris instance or has been tampered with.")
+
+    # Layer 1: User Decryption
+    user_key = derive(password, salt)
+    try:
+         return _decrypt_layer(layer1_cipher, user_key)
+    except InvalidTag:
+         raise ValueError("User Authentication Failed: Incorrect password.")
+
+def _decrypt_container(blob, password: str, salt: bytes) -> bytes:
+    """Decrypts a container held in any buffer (bytes, bytearray, memoryview, mmap)."""
+    version = _format_version(blob)
+    if version == FORMAT_V2_ENVELOPE:
+        return _decrypt_envelope(blob, password, salt)
+    if version == FORMAT_V1_LEGACY:
+        return _decrypt_legacy(blob, password, salt)
+    raise ValueError(f"Unsupported container version: {version}")
+
 def decrypt_data(encrypted_data: str, password: str, salt: str, nonce: str) -> bytes:
     """
     System-Bound Decryption.
+    Detects the container mode from the header: envelope, or legacy headerless
+    SYSTEM_BOUND blobs.
     """
     try:
         salt_bytes = base64.b64decode(salt)
         ciphertext_bytes = base64.b64decode(encrypted_data)
-        
-        # Layer 2: System Decryption
-        system_key = derive_key(SYSTEM_MASTER_KEY, salt_bytes)
+        return _decrypt_container(ciphertext_bytes, password, salt_bytes)
+    except KDFPoolSaturated:
+        raise
+    except Exception as e:
+        raise ValueError(str(e))
+
+def encrypt_bytes(data: bytes, password: str) -> bytes:
+    """
+    Binary counterpart of encrypt_data for callers that do not need JSON.
+    Returns [SALT(16)][CONTAINER] with no base64 step.
+    """
+    salt = os.urandom(16)
+    params = kdf.ACTIVE_PARAMS
+    return salt + _seal_envelope(data, derive_key(password, salt, params), derive_system_subkey(salt), params)
+
+def encrypted_size(plaintext_size: int) -> int:
+    """Length of encrypt_bytes output for a plaintext of plaintext_size bytes."""
+    return 16 + HEADER_SIZE + KEY_SLOT_SIZE + 12 + plaintext_size + 16
+
+def decrypt_bytes(data, password: str) -> bytes:
+    """
+    Binary counterpart of decrypt_data for [SALT(16)][CONTAINER] payloads.
+    data may be bytes or any other buffer (e.g. a preallocated bytearray filled with
+    readinto); it is never copied, so peak memory is roughly input + plaintext.
+    """
+    view = memoryview(data)
+    if len(view) < 16 + 28:
+        raise ValueError("Invalid ciphertext: container is truncated.")
+    try:
+        return _decrypt_container(view[16:], password, bytes(view[:16]))
+    except KDFPoolSaturated:
+        raise
+    except Exception as e:
+        raise ValueError(str(e))
+
+def rewrap_data(encrypted_data: str, salt: str, password: str, new_password: str = None,
+                old_system_root_key: bytes = None) -> str:
+    """
+    Changes the password of an envelope ciphertext and/or moves it to the current
+    system key without re-encrypting the payload. Returns the new base64 ciphertext.
+    """
+    salt_bytes = base64.b64decode(salt)
+    blob = base64.b64decode(encrypted_data)
+    if _format_version(blob) != FORMAT_V2_ENVELOPE:
+        raise ValueError("Only envelope ciphertexts can be re-wrapped.")
+    header = blob[:HEADER_SIZE]
+    slot_end = HEADER_SIZE + KEY_SLOT_SIZE
+    new_slot = _rewrap_key_slot(blob[HEADER_SIZE:slot_end], header, salt_bytes,
+                                password, new_password, old_system_root_key)
+    return base64.b64encode(header + new_slot + blob[slot_end:]).decode('utf-8')
+
+def encrypt_batch(items: list, password: str) -> dict:
+    """
+    Encrypts many small items under one password with a single KDF run.
+    One data key is wrapped per batch ('key', an envelope header and key slot) and each
+    item is just [NONCE(12)][CIPHERTEXT+TAG] under it, authenticated together with the
+    batch key. Failed items carry an 'error'.
+    """
+    if len(items) > BATCH_MAX_ITEMS:
+        raise ValueError(f"Batch too large: at most {BATCH_MAX_ITEMS} items are allowed.")
+    salt = os.urandom(16)
+    params = kdf.ACTIVE_PARAMS
+    header = FORMAT_MAGIC + bytes([FORMAT_V2_ENVELOPE])
+    data_key = AESGCM.generate_key(bit_length=256)
+    batch_key = header + _seal_key_slot(data_key, derive_key(password, salt, params), derive_system_subkey(salt),
+                                        header, params)
+    aesgcm = AESGCM(data_key)
+
+    def seal(item):
+        try:
+            if not isinstance(item, str):
+                raise ValueError("Item must be a string.")
+            nonce = os.urandom(12)
+            sealed = nonce + aesgcm.encrypt(nonce, item.encode('utf-8'), batch_key)
+            return {'ciphertext': base64.b64encode(sealed).decode('utf-8')}
+        except Exception as e:
+            return {'error': str(e)}
+
+    return {
+        'salt': base64.b64encode(salt).decode('utf-8'),
+        'key': base64.b64encode(batch_key).decode('utf-8'),
+        'mode': 'SYSTEM_BOUND',
+        'items': list(_batch_executor.map(seal, items))
+    }
+
+def decrypt_batch(items: list, password: str, salt: str = None, key: str = None) -> list:
+    """
+    Decrypts many items under one password. With a batch key (from encrypt_batch),
+    ciphertext strings are batch items under that key and the batch salt; without one
+    they are containers that use the batch salt. {'ciphertext', 'salt'} objects are
+    always standalone containers. Keys are derived once per distinct salt and KDF
+    parameter set; failures are reported per item instead of failing the batch.
+    """
+    if len(items) > BATCH_MAX_ITEMS:
+        raise ValueError(f"Batch too large: at most {BATCH_MAX_ITEMS} items are allowed.")
+    key_blob = None
+    if key is not None:
         try:
-            layer1_cipher = _decrypt_layer(ciphertext_bytes, system_key)
+            key_blob = base64.b64decode(key)
+            batch_salt = base64.b64decode(salt)
+        except (ValueError, TypeError):
+            raise ValueError("A batch key needs its batch salt.")
+        if len(key_blob) != HEADER_SIZE + KEY_SLOT_SIZE or _format_version(key_blob) != FORMAT_V2_ENVELOPE:
+            raise ValueError("Invalid batch key.")
+
+    parsed = []
+    for item in items:
+        own_salt = item.get('salt') if isinstance(item, dict) else None
+        ciphertext = item.get('ciphertext') if isinstance(item, dict) else item
+        item_salt = own_salt or salt
+        batched = key_blob is not None and not own_salt
+        try:
+            parsed.append((ciphertext, item_salt, base64.b64decode(ciphertext), base64.b64decode(item_salt), batched))
+        except (ValueError, TypeError):
+            parsed.append((ciphertext, item_salt, None, None, batched))
+
+    # Derive every key up front, on the calling thread, so the pool workers only do
+    # AES-GCM. Only the first BATCH_MAX_SALTS distinct salts (the batch salt first) are
+    # honoured and all KDF runs share one KDF pool reservation, so a saturated pool fails
+    # the request cleanly. The KDF descriptor is only trusted once the system layer has
+    # authenticated it; forged slots never reach the password KDF and fail later on.
+    system_keys = {}
+    key_requests = set()
+    batch_error = None
+    if key_blob is not None:
+        system_keys[salt] = derive_system_subkey(batch_salt)
+        try:
+            params = _authenticated_envelope_params(key_blob, system_keys[salt])
+            key_requests.add((password, batch_salt, params))
+        except ValueError as e:
+            batch_error = str(e)
+    for _, item_salt, blob, salt_bytes, batched in parsed:
+        if blob is None or batched:
+            continue
+        if item_salt not in system_keys:
+            if len(system_keys) >= BATCH_MAX_SALTS:
+                continue
+            system_keys[item_salt] = derive_system_subkey(salt_bytes)
+        version = _format_version(blob)
+        if version == FORMAT_V2_ENVELOPE:
+            try:
+                params = _authenticated_envelope_params(blob, system_keys[item_salt])
+            except ValueError:
+                continue
+            key_requests.add((password, salt_bytes, params))
+        elif version == FORMAT_V1_LEGACY:
+            key_requests.add((SYSTEM_MASTER_KEY, salt_bytes, kdf.LEGACY_PARAMS))
+            key_requests.add((password, salt_bytes, kdf.LEGACY_PARAMS))
+    keys = kdf_pool.run(lambda: {req: kdf.derive(*req) for req in key_requests}) if key_requests else {}
+
+    def derived(secret: str, salt_bytes: bytes, params: kdf.KDFParams = kdf.LEGACY_PARAMS) -> bytes:
+        return keys[(secret, salt_bytes, params)]
+
+    batch_aesgcm = None
+    if key_blob is not None and batch_error is None:
+        try:
+            batch_aesgcm = AESGCM(_open_key_slot(key_blob[HEADER_SIZE:], key_blob[:HEADER_SIZE], system_keys[salt],
+                                                 lambda params: derived(password, batch_salt, params)))
+        except ValueError as e:
+            batch_error = str(e)
+
+    def open_batch_item(blob) -> bytes:
+        if batch_error is not None:
+            raise ValueError(batch_error)
+        if len(blob) < 12 + 16:
+            raise ValueError("Invalid ciphertext: item is truncated.")
+        try:
+            return batch_aesgcm.decrypt(blob[:12], blob[12:], key_blob)
         except InvalidTag:
-             raise ValueError("System Integrity Check Failed: This file was not encrypted by this Cryptaris instance or has been tampered with.")
+            raise ValueError("System Integrity Check Failed: This item does not belong to this batch or has been tampered with.")
 
-        # Layer 1: User Decryption
-        user_key = derive_key(password, salt_bytes)
+    def open_item(entry):
+        ciphertext, item_salt, blob, salt_bytes, batched = entry
         try:
-             plaintext = _decrypt_layer(layer1_cipher, user_key)
+            if blob is None:
+                raise ValueError("Missing decryption parameters")
+            if batched:
+                plaintext = open_batch_item(blob)
+            elif item_salt not in system_keys:
+                raise ValueError(f"Too many distinct salts: at most {BATCH_MAX_SALTS} are allowed per batch.")
+            elif _format_version(blob) == FORMAT_V2_ENVELOPE:
+                plaintext = _open_envelope(blob, system_keys[item_salt], lambda params: derived(password, salt_bytes, params))
+            elif _format_version(blob) == FORMAT_V1_LEGACY:
+                plaintext = _decrypt_legacy(blob, password, salt_bytes, derived)
+            else:
+                raise ValueError(f"Unsupported container version: {_format_version(blob)}")
+            return {'text': plaintext.decode('utf-8')}
+        except Exception as e:
+            return {'error': str(e)}
+
+    return list(_batch_executor.map(open_item, parsed))
+
+def _stream_nonce(prefix: bytes, counter: int, final: bool) -> bytes:
+    return prefix + struct.pack(">IB", counter, 1 if final else 0)
+
+def is_stream_container(head: bytes) -> bool:
+    """Checks whether the leading bytes of a file belong to a streaming container."""
+    return head[:len(FORMAT_MAGIC)] == FORMAT_MAGIC and len(head) >= HEADER_SIZE and \
+        head[len(FORMAT_MAGIC)] == FORMAT_V3_STREAM
+
+class ThroughputMeter:
+    """Accumulates bytes processed and wall time for streaming operations."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._seconds = 0.0
+        self._streams = 0
+        self._last_mbps = 0.0
+
+    def record(self, nbytes: int, seconds: float) -> float:
+        mbps = nbytes / (1024 * 1024) / seconds if seconds > 0 else 0.0
+        with self._lock:
+            self._bytes += nbytes
+            self._seconds += seconds
+            self._streams += 1
+            self._last_mbps = mbps
+        return mbps
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "streams": self._streams,
+                "bytes": self._bytes,
+                "avg_mbps": round(self._bytes / (1024 * 1024) / self._seconds, 2) if self._seconds else 0.0,
+                "last_mbps": round(self._last_mbps, 2),
+            }
+
+encrypt_throughput = ThroughputMeter()
+decrypt_throughput = ThroughputMeter()
+
+def _read_ahead(src, read_size: int):
+    """Yields (counter, final, block), reading one block ahead to detect the last one."""
+    counter = 0
+    block = src.read(read_size)
+    while True:
+        next_block = src.read(read_size) if len(block) == read_size else b""
+        final = not next_block
+        yield counter, final, block
+        if final:
+            return
+        block = next_block
+        counter += 1
+
+def _map_ordered(fn, jobs, workers: int):
+    """
+    Applies fn to jobs on the stream pool with a bounded in-flight window and
+    yields results in submission order.
+    """
+    if workers <= 1:
+        for job in jobs:
+            yield fn(*job)
+        return
+    window = workers * 2
+    pending = deque()
+    try:
+        for job in jobs:
+            pending.append(_stream_executor.submit(fn, *job))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+def iter_encrypt_stream(src, password: str, chunk_size: int = None, workers: int = None):
+    """
+    Encrypts a readable binary stream segment by segment.
+    Yields the container header followed by each sealed segment, so memory use
+    stays at roughly one window of chunks regardless of the input size.
+    """
+    chunk_size = chunk_size or STREAM_CHUNK_SIZE
+    if not 0 < chunk_size <= STREAM_MAX_CHUNK_SIZE:
+        raise ValueError(f"Chunk size must be between 1 and {STREAM_MAX_CHUNK_SIZE} bytes.")
+    salt = os.urandom(16)
+    header = _STREAM_HEADER.pack(FORMAT_MAGIC, FORMAT_V3_STREAM, salt, chunk_size, os.urandom(7))
+    # Derive eagerly so KDF errors surface before the caller starts a response
+    params = kdf.ACTIVE_PARAMS
+    data_key = AESGCM.generate_key(bit_length=256)
+    key_slot = _seal_key_slot(data_key, derive_key(password, salt, params), derive_system_subkey(salt), header, params)
+    return _seal_segments(src, AESGCM(data_key), header, key_slot, chunk_size, workers or STREAM_WORKERS)
+
+def _seal_segments(src, aesgcm: AESGCM, header: bytes, key_slot: bytes, chunk_size: int, workers: int = 1):
+    nonce_prefix = header[-7:]
+    yield header + key_slot
+
+    def seal(counter, final, chunk):
+        return aesgcm.encrypt(_stream_nonce(nonce_prefix, counter, final), chunk, header)
+
+    started = time.perf_counter()
+    processed = 0
+    for segment in _map_ordered(seal, _read_ahead(src, chunk_size), workers):
+        processed += len(segment) - STREAM_TAG_SIZE
+        yield segment
+    encrypt_throughput.record(processed, time.perf_counter() - started)
+
+def _read_stream_header(src, password: str):
+    """Parses a streaming container header and returns (aesgcm, aad, chunk_size, nonce_prefix)."""
+    header = src.read(STREAM_HEADER_SIZE)
+    if len(header) < STREAM_HEADER_SIZE or not is_stream_container(header):
+        raise ValueError("Invalid file format")
+    _, _, salt, chunk_size, nonce_prefix = _STREAM_HEADER.unpack(header)
+    if not 0 < chunk_size <= STREAM_MAX_CHUNK_SIZE:
+        raise ValueError("Invalid file format")
+    key_slot = src.read(KEY_SLOT_SIZE)
+    if len(key_slot) != KEY_SLOT_SIZE:
+        raise ValueError("Invalid file format")
+    data_key = _open_key_slot(key_slot, header, derive_system_subkey(salt),
+                              lambda params: derive_key(password, salt, params))
+    return AESGCM(data_key), header, chunk_size, nonce_prefix
+
+def iter_decrypt_stream(src, password: str, workers: int = None):
+    """
+    Decrypts a streaming container segment by segment.
+    Every yielded chunk has been authenticated; truncation, reordering and
+    trailing data are rejected.
+    """
+    aesgcm, header, chunk_size, nonce_prefix = _read_stream_header(src, password)
+    return _open_segments(src, aesgcm, header, chunk_size, nonce_prefix, workers or STREAM_WORKERS)
+
+def _open_segments(src, aesgcm: AESGCM, header: bytes, chunk_size: int, nonce_prefix: bytes, workers: int = 1):
+    def open_segment(counter, final, segment):
+        try:
+            return aesgcm.decrypt(_stream_nonce(nonce_prefix, counter, final), segment, header)
         except InvalidTag:
-             raise ValueError("User Authentication Failed: Incorrect password.")
+            if counter == 0:
+                raise ValueError("Decryption failed: incorrect password or the file was not encrypted by this Cryptaris instance.")
+            raise ValueError("File integrity check failed: the file is truncated or has been tampered with.")
 
-        return plaintext
-    except Exception as e:
-        raise ValueError(str(e))
+    started = time.perf_counter()
+    processed = 0
+    for chunk in _map_ordered(open_segment, _read_ahead(src, chunk_size + STREAM_TAG_SIZE), workers):
+        processed += len(chunk)
+        yield chunk
+    decrypt_throughput.record(processed, time.perf_counter() - started)
+
+def encrypt_stream(src, dst, password: str, chunk_size: int = None, workers: int = None) -> int:
+    """Encrypts src into dst using the streaming container. Returns bytes written."""
+    written = 0
+    for block in iter_encrypt_stream(src, password, chunk_size, workers):
+        dst.write(block)
+        written += len(block)
+    return written
 
+def decrypt_stream(src, dst, password: str, workers: int = None) -> int:
+    """Decrypts a streaming container from src into dst. Returns bytes written."""
+    written = 0
+    for block in iter_decrypt_stream(src, password, workers):
+        dst.write(block)
+        written += len(block)
+    return written
+
+def rewrap_stream_header(f, password: str, new_password: str = None, old_system_root_key: bytes = None):
+    """
+    Re-wraps the data key of a streaming container in place.
+    f must be opened in 'r+b' mode; only the key slot bytes are rewritten.
+    """
+    f.seek(0)
+    header = f.read(STREAM_HEADER_SIZE)
+    if len(header) < STREAM_HEADER_SIZE or not is_stream_container(header):
+        raise ValueError("Only streaming containers can be re-wrapped.")
+    _, _, salt, _, _ = _STREAM_HEADER.unpack(header)
+    key_slot = f.read(KEY_SLOT_SIZE)
+    new_slot = _rewrap_key_slot(key_slot, header, salt, password, new_password, old_system_root_key)
+    f.seek(STREAM_HEADER_SIZE)
+    f.write(new_slot)
@@ -0,0 +1,372 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+
+# Single SQLite file shared by secure links and contact messages
+DB_PATH = os.getenv('CRYPTARIS_DB_PATH', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cryptaris.db'))
+
+# Connection pool sizing. Connections are kept open and reused, so statement caches
+# and page caches survive across requests instead of being rebuilt per operation.
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 8))
+# How long a writer waits on SQLite's lock before failing with "database is locked"
+DB_BUSY_TIMEOUT_MS = int(os.getenv('DB_BUSY_TIMEOUT_MS', 5000))
+# Compiled statements cached per connection
+DB_STATEMENT_CACHE = int(os.getenv('DB_STATEMENT_CACHE', 256))
+# Group commit: queued writes are committed together once MAX_BATCH writes are waiting
+# or the oldest has waited MAX_DELAY_MS, whichever comes first.
+DB_GROUP_COMMIT_MAX_BATCH = int(os.getenv('DB_GROUP_COMMIT_MAX_BATCH', 64))
+DB_GROUP_COMMIT_MAX_DELAY_MS = float(os.getenv('DB_GROUP_COMMIT_MAX_DELAY_MS', 2))
+# The group-commit connection fsyncs every commit; the cost is shared by the whole batch
+DB_GROUP_COMMIT_SYNCHRONOUS = os.getenv('DB_GROUP_COMMIT_SYNCHRONOUS', 'FULL').upper()
+# How long a caller waits for its queued write to commit before giving up
+DB_GROUP_COMMIT_TIMEOUT_MS = int(os.getenv('DB_GROUP_COMMIT_TIMEOUT_MS', 30000))
+
+
+class DatabasePoolExhausted(Exception):
+    """Raised when no pooled connection frees up within the busy timeout."""
+    pass
+
+
+class GroupCommitTimeout(Exception):
+    """Raised when a queued write has not committed within DB_GROUP_COMMIT_TIMEOUT_MS."""
+    pass
+
+
+class GroupCommitWriter:
+    """
+    Write-behind queue with group commit.
+    Callers hand over a function that takes a connection; a single writer thread runs
+    queued functions back to back inside one transaction, each under its own savepoint,
+    and commits once for the whole batch. submit() only returns after that commit,
+    so a caller's write is durable when it gets its answer. A failing function only
+    rolls back its own savepoint; the rest of the batch still commits.
+    """
+
+    def __init__(self, database, max_batch: int, max_delay_ms: float, synchronous: str,
+                 timeout_ms: float = DB_GROUP_COMMIT_TIMEOUT_MS):
+        self.database = database
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max_delay_ms / 1000.0
+        self.synchronous = synchronous
+        self.timeout = timeout_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._writes = 0
+        self._failed_writes = 0
+        self._failed_batches = 0
+        self._batch_max = 0
+        self._commit_total = 0.0
+        self._commit_max = 0.0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    def submit(self, fn):
+        """
+        Queues fn(conn) and waits until its batch has committed. Returns fn's result.
+        Raises GroupCommitTimeout after the write timeout; the write may still commit later.
+        """
+        self._ensure_started()
+        future = Future()
+        self._queue.put((fn, future, time.perf_counter()))
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise GroupCommitTimeout("Database is busy. Please retry shortly.")
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='db-group-commit', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        conn = None
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                try:
+                    batch.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                if conn is None:
+                    conn = self.database._connect()
+                    conn.execute(f'PRAGMA synchronous={self.synchronous}')
+                self._commit(conn, batch)
+            except Exception as e:
+                # A failed connect, commit or rollback leaves the connection in an unknown
+                # state: fail the batch, drop the connection and reconnect for the next one.
+                # The thread itself never dies, so later writes are still served.
+                if isinstance(e, sqlite3.OperationalError):
+                    self.database._count_busy(e)
+                self._fail(batch, e)
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+                conn = None
+
+    def _fail(self, batch: list, error: Exception):
+        with self._lock:
+            self._failed_batches += 1
+            self._failed_writes += len(batch)
+        for _, future, _ in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    def _commit(self, conn: sqlite3.Connection, batch: list):
+        results = []
+        started = time.perf_counter()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for fn, future, _ in batch:
+                conn.execute('SAVEPOINT queued_write')
+                try:
+                    results.append((future, True, fn(conn)))
+                    conn.execute('RELEASE queued_write')
+                except Exception as e:
+                    conn.execute('ROLLBACK TO queued_write')
+                    conn.execute('RELEASE queued_write')
+                    results.append((future, False, e))
+            conn.execute('COMMIT')
+        except Exception as e:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except Exception:
+                pass  # _run drops the connection after any failed batch
+            raise e
+
+        finished = time.perf_counter()
+        commit_time = finished - started
+        with self._lock:
+            self._batches += 1
+            self._writes += len(batch)
+            self._batch_max = max(self._batch_max, len(batch))
+            self._commit_total += commit_time
+            self._commit_max = max(self._commit_max, commit_time)
+            for _, _, enqueued_at in batch:
+                latency = finished - enqueued_at
+                self._latency_total += latency
+                self._latency_max = max(self._latency_max, latency)
+            self._failed_writes += sum(1 for _, ok, _ in results if not ok)
+        for future, ok, value in results:
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def metrics(self) -> dict:
+        """Batch sizes, commit time per batch and end-to-end write latency (times in ms)."""
+        with self._lock:
+            batches = self._batches or 1
+            writes = self._writes or 1
+            return {
+                "max_batch": self.max_batch,
+                "max_delay_ms": self.max_delay * 1000,
+                "synchronous": self.synchronous,
+                "queued": self._queue.qsize(),
+                "batches": self._batches,
+                "writes": self._writes,
+                "failed_writes": self._failed_writes,
+                "failed_batches": self._failed_batches,
+                "batch_size_avg": round(self._writes / batches, 2),
+                "batch_size_max": self._batch_max,
+                "commit_ms_avg": round(self._commit_total / batches * 1000, 3),
+                "commit_ms_max": round(self._commit_max * 1000, 3),
+                "write_latency_ms_avg": round(self._latency_total / writes * 1000, 3),
+                "write_latency_ms_max": round(self._latency_max * 1000, 3),
+            }
+
+
+class Database:
+    """
+    Pooled access to the SQLite database.
+    Every connection runs in WAL mode with synchronous=NORMAL, so readers never block
+    the writer and commits only fsync at checkpoints. Writes go through transaction(),
+    which takes the write lock up front (BEGIN IMMEDIATE) and records how long it waited,
+    or through write(), which group-commits small inserts on a dedicated connection.
+    """
+
+    def __init__(self, path: str, pool_size: int, busy_timeout_ms: int, statement_cache: int):
+        self.path = path
+        self.pool_size = pool_size
+        self.busy_timeout_ms = busy_timeout_ms
+        self.statement_cache = statement_cache
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._in_use = 0
+        self._acquired = 0
+        self._pool_waits = 0
+        self._pool_wait_total = 0.0
+        self._pool_wait_max = 0.0
+        self._transactions = 0
+        self._rollbacks = 0
+        self._lock_wait_total = 0.0
+        self._lock_wait_max = 0.0
+        self._busy_errors = 0
+        self.writer = GroupCommitWriter(self, DB_GROUP_COMMIT_MAX_BATCH, DB_GROUP_COMMIT_MAX_DELAY_MS,
+                                        DB_GROUP_COMMIT_SYNCHRONOUS)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout_ms / 1000.0,
+            isolation_level=None,  # autocommit; transaction() issues BEGIN/COMMIT itself
+            check_same_thread=False,  # pooled connections are handed between request threads
+            cached_statements=self.statement_cache,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._lock:
+                if self._opened < self.pool_size:
+                    self._opened += 1
+                    create = True
+                else:
+                    create = False
+            if create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                waited_from = time.perf_counter()
+                try:
+                    conn = self._idle.get(timeout=self.busy_timeout_ms / 1000.0)
+                except queue.Empty:
+                    raise DatabasePoolExhausted("Database is busy. Please retry shortly.")
+                waited = time.perf_counter() - waited_from
+                with self._lock:
+                    self._pool_waits += 1
+                    self._pool_wait_total += waited
+                    self._pool_wait_max = max(self._pool_wait_max, waited)
+        with self._lock:
+            self._in_use += 1
+            self._acquired += 1
+        return conn
+
+    def _release(self, conn: sqlite3.Connection):
+        with self._lock:
+            self._in_use -= 1
+        if conn.in_transaction:
+            # Never hand a connection with an open transaction to the next caller
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Borrows a pooled connection for reads (autocommit, one statement at a time)."""
+        conn = self._acquire()
+        try:
+            yield conn
+        except sqlite3.OperationalError as e:
+            self._count_busy(e)
+            raise
+        finally:
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Borrows a pooled connection inside a write transaction; commits on success."""
+        with self.connection() as conn:
+            started = time.perf_counter()
+            conn.execute('BEGIN IMMEDIATE')
+            waited = time.perf_counter() - started
+            with self._lock:
+                self._transactions += 1
+                self._lock_wait_total += waited
+                self._lock_wait_max = max(self._lock_wait_max, waited)
+            try:
+                yield conn
+                conn.execute('COMMIT')
+            except BaseException:
+                with self._lock:
+                    self._rollbacks += 1
+                conn.rollback()
+                raise
+
+    def execute(self, sql: str, params: tuple = ()) -> int:
+        """Runs a single write statement in its own transaction. Returns the affected row count."""
+        with self.transaction() as conn:
+            return conn.execute(sql, params).rowcount
+
+    def write(self, fn):
+        """
+        Runs fn(conn) on the group-commit writer and returns its result once the batch
+        it joined has committed. fn must not commit or open its own transaction.
+        """
+        return self.writer.submit(fn)
+
+    def fetchone(self, sql: str, params: tuple = ()):
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchone()
+
+    def fetchall(self, sql: str, params: tuple = ()) -> list:
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def _count_busy(self, error: sqlite3.OperationalError):
+        if 'locked' in str(error) or 'busy' in str(error):
+            with self._lock:
+                self._busy_errors += 1
+
+    def close(self):
+        """Closes all idle connections (connections in use are closed when returned)."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+
+    def metrics(self) -> dict:
+        """Returns pool occupancy and lock-wait counters (times in ms)."""
+        with self._lock:
+            transactions = self._transactions or 1
+            pool_waits = self._pool_waits or 1
+            return {
+                "path": os.path.basename(self.path),
+                "pool_size": self.pool_size,
+                "open": self._opened,
+                "in_use": self._in_use,
+                "idle": self._opened - self._in_use,
+                "acquired": self._acquired,
+                "pool_waits": self._pool_waits,
+                "pool_wait_ms_avg": round(self._pool_wait_total / pool_waits * 1000, 3),
+                "pool_wait_ms_max": round(self._pool_wait_max * 1000, 3),
+                "transactions": self._transactions,
+                "rollbacks": self._rollbacks,
+                "lock_wait_ms_avg": round(self._lock_wait_total / transactions * 1000, 3),
+                "lock_wait_ms_max": round(self._lock_wait_max * 1000, 3),
+                "busy_errors": self._busy_errors,
+                "group_commit": self.writer.metrics(),
+            }
+
+
+# Global Instance
+db = Database(DB_PATH, DB_POOL_SIZE, DB_BUSY_TIMEOUT_MS, DB_STATEMENT_CACHE)
@@ -0,0 +1,189 @@
+import os
+import time
+import hashlib
+import struct
+from collections import namedtuple
+
+# Argon2id ships with cryptography >= 44; older installs can use argon2-cffi instead.
+try:
+    from cryptography.hazmat.primitives.kdf.argon2 import Argon2id as _CryptographyArgon2id
+except ImportError:
+    _CryptographyArgon2id = None
+try:
+    from argon2.low_level import hash_secret_raw as _argon2_hash_secret_raw, Type as _Argon2Type
+except ImportError:
+    _argon2_hash_secret_raw = None
+
+PBKDF2_SHA256 = 1
+SCRYPT = 2
+ARGON2ID = 3
+
+ALGORITHM_NAMES = {
+    PBKDF2_SHA256: 'pbkdf2',
+    SCRYPT: 'scrypt',
+    ARGON2ID: 'argon2id',
+}
+ALGORITHM_IDS = {name: algorithm for algorithm, name in ALGORITHM_NAMES.items()}
+
+# Parameters are stored in ciphertext headers as [ALGORITHM(1)][COST(4)][MEMORY(4)][PARALLELISM(4)]:
+#   pbkdf2:   cost = iterations,        memory = 0,           parallelism = 1
+#   scrypt:   cost = log2(N),           memory = r (block),   parallelism = p
+#   argon2id: cost = time cost (passes), memory = KiB,        parallelism = lanes
+KDFParams = namedtuple('KDFParams', ['algorithm', 'cost', 'memory', 'parallelism'])
+_DESCRIPTOR = struct.Struct(">BIII")
+DESCRIPTOR_SIZE = _DESCRIPTOR.size
+
+# The fixed parameters used by every container written before KDF descriptors existed
+LEGACY_PARAMS = KDFParams(PBKDF2_SHA256, 100000, 0, 1)
+
+# Upper bounds applied to descriptors read from untrusted headers
+MAX_PBKDF2_ITERATIONS = 10_000_000
+MAX_SCRYPT_LOG_N = 22
+MAX_MEMORY_KIB = 4 * 1024 * 1024
+
+
+def argon2_available() -> bool:
+    return _CryptographyArgon2id is not None or _argon2_hash_secret_raw is not None
+
+
+def encode_params(params: KDFParams) -> bytes:
+    return _DESCRIPTOR.pack(*params)
+
+
+def decode_params(data: bytes) -> KDFParams:
+    if len(data) < DESCRIPTOR_SIZE:
+        raise ValueError("Invalid ciphertext: KDF descriptor is truncated.")
+    params = KDFParams(*_DESCRIPTOR.unpack(data[:DESCRIPTOR_SIZE]))
+    validate_params(params)
+    return params
+
+
+def validate_params(params: KDFParams):
+    """Rejects unknown algorithms and parameters outside sane bounds."""
+    if params.algorithm == PBKDF2_SHA256:
+        ok = 1 <= params.cost <= MAX_PBKDF2_ITERATIONS
+    elif params.algorithm == SCRYPT:
+        ok = 1 <= params.cost <= MAX_SCRYPT_LOG_N and params.memory >= 1 and params.parallelism >= 1 \
+            and 128 * params.memory * (1 << params.cost) * params.parallelism <= MAX_MEMORY_KIB * 1024
+    elif params.algorithm == ARGON2ID:
+        ok = params.cost >= 1 and 1 <= params.parallelism <= 255 \
+            and 8 * params.parallelism <= params.memory <= MAX_MEMORY_KIB
+    else:
+        raise ValueError(f"Unsupported KDF algorithm: {params.algorithm}")
+    if not ok:
+        raise ValueError(f"Invalid {ALGORITHM_NAMES[params.algorithm]} parameters.")
+
+
+def describe(params: KDFParams) -> dict:
+    """Human readable form of a parameter set."""
+    name = ALGORITHM_NAMES.get(params.algorithm, str(params.algorithm))
+    if params.algorithm == PBKDF2_SHA256:
+        return {"algorithm": name, "iterations": params.cost}
+    if params.algorithm == SCRYPT:
+        return {"algorithm": name, "n": 1 << params.cost, "r": params.memory, "p": params.parallelism}
+    return {"algorithm": name, "time_cost": params.cost, "memory_kib": params.memory, "parallelism": params.parallelism}
+
+
+def derive(password: str, salt: bytes, params: KDFParams, length: int = 32) -> bytes:
+    """Derive a key from the password with the given algorithm and parameters."""
+    secret = password.encode()
+    if params.algorithm == PBKDF2_SHA256:
+        return hashlib.pbkdf2_hmac('sha256', secret, salt, params.cost, dklen=length)
+    if params.algorithm == SCRYPT:
+        n = 1 << params.cost
+        maxmem = 128 * params.memory * n * params.parallelism + 1024 * 1024
+        return hashlib.scrypt(secret, salt=salt, n=n, r=params.memory, p=params.parallelism,
+                              maxmem=maxmem, dklen=length)
+    if params.algorithm == ARGON2ID:
+        if _CryptographyArgon2id is not None:
+            kdf = _CryptographyArgon2id(salt=salt, length=length, iterations=params.cost,
+                                        lanes=params.parallelism, memory_cost=params.memory)
+            return kdf.derive(secret)
+        if _argon2_hash_secret_raw is not None:
+            return _argon2_hash_secret_raw(secret, salt, time_cost=params.cost, memory_cost=params.memory,
+                                           parallelism=params.parallelism, hash_len=length, type=_Argon2Type.ID)
+        raise ValueError("Argon2id requires cryptography>=44 or the argon2-cffi package.")
+    raise ValueError(f"Unsupported KDF algorithm: {params.algorithm}")
+
+
+def params_from_env() -> KDFParams:
+    """
+    Reads the parameters used for new ciphertexts from the environment.
+    KDF_ALGORITHM selects pbkdf2 (default), scrypt or argon2id; KDF_COST, KDF_MEMORY
+    and KDF_PARALLELISM override the algorithm defaults (see calibrate_kdf.py).
+    """
+    name = os.getenv('KDF_ALGORITHM', 'pbkdf2').lower()
+    if name not in ALGORITHM_IDS:
+        raise ValueError(f"Unknown KDF_ALGORITHM '{name}'. Expected one of: {', '.join(ALGORITHM_IDS)}")
+    # Fail at startup rather than on the first encryption
+    if ALGORITHM_IDS[name] == ARGON2ID and not argon2_available():
+        raise ValueError("KDF_ALGORITHM=argon2id requires cryptography>=44 or the argon2-cffi package.")
+    defaults = {
+        PBKDF2_SHA256: LEGACY_PARAMS,
+        SCRYPT: KDFParams(SCRYPT, 15, 8, 1),
+        ARGON2ID: KDFParams(ARGON2ID, 3, 64 * 1024, 4),
+    }[ALGORITHM_IDS[name]]
+    params = KDFParams(
+        defaults.algorithm,
+        int(os.getenv('KDF_COST', defaults.cost)),
+        int(os.getenv('KDF_MEMORY', defaults.memory)),
+        int(os.getenv('KDF_PARALLELISM', defaults.parallelism)),
+    )
+    validate_params(params)
+    return params
+
+
+def time_derive(params: KDFParams, rounds: int = 3) -> float:
+    """Median wall time in seconds of one derivation with these parameters."""
+    salt = os.urandom(16)
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        derive('calibration-password', salt, params)
+        samples.append(time.perf_counter() - started)
+    return sorted(samples)[len(samples) // 2]
+
+
+def calibrate(algorithm: int, target_ms: float, max_memory_kib: int = 256 * 1024,
+              parallelism: int = None) -> KDFParams:
+    """
+    Benchmarks this host and returns the strongest parameters whose derive time
+    stays at or below target_ms.
+    """
+    target = target_ms / 1000.0
+    if algorithm == PBKDF2_SHA256:
+        probe = KDFParams(PBKDF2_SHA256, 50000, 0, 1)
+        per_iteration = time_derive(probe) / probe.cost
+        iterations = max(10000, int(target / per_iteration))
+        return KDFParams(PBKDF2_SHA256, min(iterations, MAX_PBKDF2_ITERATIONS), 0, 1)
+
+    if algorithm == SCRYPT:
+        best = KDFParams(SCRYPT, 14, 8, 1)
+        for log_n in range(14, MAX_SCRYPT_LOG_N + 1):
+            candidate = KDFParams(SCRYPT, log_n, 8, 1)
+            if 128 * 8 * (1 << log_n) > max_memory_kib * 1024 or time_derive(candidate) > target:
+                break
+            best = candidate
+        return best
+
+    if algorithm == ARGON2ID:
+        if not argon2_available():
+            raise ValueError("Argon2id requires cryptography>=44 or the argon2-cffi package.")
+        lanes = parallelism or min(4, os.cpu_count() or 1)
+        memory = max_memory_kib
+        # Prefer memory hardness: shrink memory until a single pass fits, then add passes.
+        while memory // 2 >= 19 * 1024 and time_derive(KDFParams(ARGON2ID, 1, memory, lanes)) > target:
+            memory //= 2
+        best = KDFParams(ARGON2ID, 1, memory, lanes)
+        for passes in range(2, 11):
+            candidate = KDFParams(ARGON2ID, passes, memory, lanes)
+            if time_derive(candidate) > target:
+                break
+            best = candidate
+        return best
+
+    raise ValueError(f"Unsupported KDF algorithm: {algorithm}")
+
+
+# Parameters used for newly written ciphertexts
+ACTIVE_PARAMS = params_from_env()
@@ -0,0 +1,97 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Pool sizing. Workers bound the CPU spent on key derivation; the queue bounds how many
+# requests may wait for a worker before new ones are turned away.
+KDF_POOL_WORKERS = int(os.getenv('KDF_POOL_WORKERS', os.cpu_count() or 2))
+KDF_POOL_MAX_QUEUE = int(os.getenv('KDF_POOL_MAX_QUEUE', KDF_POOL_WORKERS * 4))
+
+
+class KDFPoolSaturated(Exception):
+    """Raised when the KDF pool has no free worker or queue slot."""
+    pass
+
+
+class KDFPool:
+    """
+    Bounded executor for password-based key derivation.
+    Keeps expensive KDF runs off the request threads' critical path and rejects
+    immediately instead of queueing without limit when the pool is saturated.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='kdf')
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._running = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._queue_wait_total = 0.0
+        self._queue_wait_max = 0.0
+        self._derive_total = 0.0
+        self._derive_max = 0.0
+
+    def run(self, fn, *args):
+        """Runs fn(*args) on the pool and waits for the result."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise KDFPoolSaturated("Server is busy deriving keys. Please retry shortly.")
+
+        enqueued_at = time.perf_counter()
+        with self._lock:
+            self._submitted += 1
+            self._in_flight += 1
+
+        def task():
+            started_at = time.perf_counter()
+            with self._lock:
+                self._running += 1
+            try:
+                return fn(*args)
+            finally:
+                self._record(started_at - enqueued_at, time.perf_counter() - started_at)
+
+        try:
+            return self._executor.submit(task).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def _record(self, queue_wait: float, derive_time: float):
+        with self._lock:
+            self._running -= 1
+            self._completed += 1
+            self._queue_wait_total += queue_wait
+            self._queue_wait_max = max(self._queue_wait_max, queue_wait)
+            self._derive_total += derive_time
+            self._derive_max = max(self._derive_max, derive_time)
+
+    def metrics(self) -> dict:
+        """Returns a snapshot of pool occupancy and timing counters (times in ms)."""
+        with self._lock:
+            completed = self._completed or 1
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._in_flight - self._running,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "queue_wait_ms_avg": round(self._queue_wait_total / completed * 1000, 3),
+                "queue_wait_ms_max": round(self._queue_wait_max * 1000, 3),
+                "derive_ms_avg": round(self._derive_total / completed * 1000, 3),
+                "derive_ms_max": round(self._derive_max * 1000, 3),
+            }
+
+
+# Global Instance
+kdf_pool = KDFPool(KDF_POOL_WORKERS, KDF_POOL_MAX_QUEUE)
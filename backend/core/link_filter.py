@@ -0,0 +1,187 @@
+import os
+import math
+import hashlib
+import threading
+import time
+
+# Expected number of live links and the false-positive rate the filter is sized for.
+# The filter grows to twice the live link count on rebuild if that is larger.
+LINK_FILTER_CAPACITY = int(os.getenv('LINK_FILTER_CAPACITY', 100000))
+LINK_FILTER_FP_RATE = float(os.getenv('LINK_FILTER_FP_RATE', 0.001))
+# Full rebuilds drop IDs that other worker processes deleted
+LINK_FILTER_REBUILD_INTERVAL = float(os.getenv('LINK_FILTER_REBUILD_INTERVAL', 3600))
+# Misses check the store's change token at most this often; links created by other
+# worker processes may be rejected for up to this long after they are committed
+LINK_FILTER_SYNC_INTERVAL_MS = float(os.getenv('LINK_FILTER_SYNC_INTERVAL_MS', 100))
+
+
+class CountingBloomFilter:
+    """
+    Bloom filter with 8-bit counters, so members can be removed again.
+    Indexes come from one keyed BLAKE2b digest (double hashing); the random key stops
+    clients from crafting IDs that collide on purpose.
+    """
+
+    def __init__(self, capacity: int, fp_rate: float):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.size = max(8, int(math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self.count = 0
+        self._counters = bytearray(self.size)
+        self._key = os.urandom(16)
+
+    def _indexes(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16, key=self._key).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item: str):
+        counters = self._counters
+        for i in self._indexes(item):
+            if counters[i] < 255:
+                counters[i] += 1
+        self.count += 1
+
+    def remove(self, item: str):
+        """Removes an item that was added before. Saturated counters are left alone."""
+        counters = self._counters
+        indexes = self._indexes(item)
+        if not all(counters[i] for i in indexes):
+            return
+        for i in indexes:
+            if counters[i] < 255:
+                counters[i] -= 1
+        self.count = max(0, self.count - 1)
+
+    def __contains__(self, item: str) -> bool:
+        counters = self._counters
+        return all(counters[i] for i in self._indexes(item))
+
+    def estimated_fp_rate(self) -> float:
+        return (1 - math.exp(-self.hash_count * self.count / self.size)) ** self.hash_count
+
+
+class LinkFilter:
+    """
+    In-memory membership filter of live link IDs, so lookups of unknown IDs never reach
+    the link store.
+
+    Every link gets a monotonically increasing `seq` when it is created. Other worker
+    processes can insert links too, so a miss may ask the store for its change token
+    (PRAGMA data_version for SQLite), at most once per sync interval and outside the
+    filter lock. Only when some other connection has committed since the last check does
+    it pull links with seq above the last one it has seen, and then it checks again. A
+    flood of unknown IDs is therefore answered from memory, without serializing on SQLite.
+    """
+
+    def __init__(self, store, capacity: int, fp_rate: float, rebuild_interval: float,
+                 sync_interval_ms: float = LINK_FILTER_SYNC_INTERVAL_MS):
+        self.store = store
+        self.min_capacity = capacity
+        self.fp_rate = fp_rate
+        self.rebuild_interval = rebuild_interval
+        self.sync_interval = sync_interval_ms / 1000.0
+        self._token_checked_at = 0.0
+        self._lock = threading.RLock()
+        self._filter = CountingBloomFilter(capacity, fp_rate)
+        self._synced_seq = 0
+        self._local_seqs = set()
+        self._data_version = None
+        self._built_at = 0.0
+        self._checks = 0
+        self._rejected = 0
+        self._false_positives = 0
+        self._syncs = 0
+        self._rebuilds = 0
+
+    def rebuild(self):
+        """Rebuilds the filter from every stored link (all IDs and the highest seq in one snapshot)."""
+        with self._lock:
+            max_seq, total, link_ids = self.store.snapshot_ids()
+            fresh = CountingBloomFilter(max(self.min_capacity, total * 2), self.fp_rate)
+            for link_id in link_ids:
+                fresh.add(link_id)
+            self._filter = fresh
+            self._synced_seq = max_seq
+            self._local_seqs.clear()
+            self._data_version = self.store.change_token()
+            self._built_at = time.time()
+            self._rebuilds += 1
+
+    def rebuild_if_due(self):
+        if self.rebuild_interval > 0 and time.time() - self._built_at >= self.rebuild_interval:
+            self.rebuild()
+
+    def sync(self):
+        """Adds links committed by other connections since the last sync."""
+        with self._lock:
+            self._data_version = self.store.change_token()
+            for seq, link_id in self.store.changes_since(self._synced_seq):
+                if seq in self._local_seqs:
+                    self._local_seqs.discard(seq)
+                else:
+                    self._filter.add(link_id)
+                self._synced_seq = seq
+            self._syncs += 1
+
+    def add(self, link_id: str, seq: int):
+        """Records a link created by this process."""
+        with self._lock:
+            if not self.store.shared:
+                self._filter.add(link_id)
+                return
+            if seq <= self._synced_seq:
+                return  # already picked up by a sync or rebuild
+            self._filter.add(link_id)
+            self._local_seqs.add(seq)
+
+    def remove(self, link_ids: list):
+        """
+        Drops deleted links. Callers must sync() while the links still exist so every ID
+        is known to be in the filter; removing unknown IDs would corrupt the counters.
+        """
+        with self._lock:
+            for link_id in link_ids:
+                self._filter.remove(link_id)
+
+    def might_contain(self, link_id: str) -> bool:
+        with self._lock:
+            self._checks += 1
+            if link_id in self._filter:
+                return True
+        now = time.monotonic()
+        if now - self._token_checked_at >= self.sync_interval:
+            self._token_checked_at = now
+            if self.store.change_token() != self._data_version:
+                self.sync()
+                with self._lock:
+                    if link_id in self._filter:
+                        return True
+        with self._lock:
+            self._rejected += 1
+        return False
+
+    def record_false_positive(self):
+        with self._lock:
+            self._false_positives += 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            f = self._filter
+            return {
+                "items": f.count,
+                "capacity": f.capacity,
+                "size_bytes": f.size,
+                "hash_count": f.hash_count,
+                "target_fp_rate": f.fp_rate,
+                "estimated_fp_rate": round(f.estimated_fp_rate(), 8),
+                "checks": self._checks,
+                "rejected": self._rejected,
+                "false_positives": self._false_positives,
+                "syncs": self._syncs,
+                "rebuilds": self._rebuilds,
+                "built_at": self._built_at,
+            }
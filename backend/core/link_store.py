@@ -0,0 +1,507 @@
+import os
+import json
+import heapq
+import sqlite3
+import struct
+import threading
+import zlib
+
+# Storage backend for secure links: sqlite (default), memory or log
+LINK_STORE = os.getenv('LINK_STORE', 'sqlite').lower()
+# Data file of the append-log store
+LINK_LOG_PATH = os.getenv('LINK_LOG_PATH', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'links.log'))
+# Append-log durability: "group" fsyncs before create/delete return (concurrent callers share
+# one fsync), "off" leaves flushing to the OS
+LINK_LOG_FSYNC = os.getenv('LINK_LOG_FSYNC', 'group').lower()
+
+# Columns every backend stores for a link. The encrypted URL and its nonce are base64 text;
+# file contents live in the blob store and only file_ref / file_size are kept here.
+LINK_FIELDS = ('id', 'ciphertext', 'nonce', 'password_hash', 'expiry', 'created_at', 'file_ref', 'file_size', 'file_name')
+
+
+class LinkStore:
+    """
+    Interface of a secure link storage backend.
+
+    Records are dicts with the keys in LINK_FIELDS. get() additionally returns
+    'has_inline_file' for rows written before files moved to the blob store.
+    Every stored link gets an increasing sequence number; the ID filter uses it
+    (with change_token) to pick up links created by other processes.
+    """
+
+    name = None
+    # Whether other processes can write to the same store
+    shared = False
+
+    def create(self, record: dict) -> int:
+        """Stores a new link durably and returns its sequence number."""
+        raise NotImplementedError
+
+    def create_many(self, records: list):
+        """Bulk insert used for imports and benchmarks."""
+        for record in records:
+            self.create(record)
+
+    def get(self, link_id: str):
+        """Returns the link's record, or None."""
+        raise NotImplementedError
+
+    def get_inline_file(self, link_id: str):
+        """Returns the legacy inline file column ("nonce:ciphertext", base64), if any."""
+        return None
+
+    def delete_expired(self, now: float, limit: int, before_delete=None) -> list:
+        """
+        Deletes up to limit links whose expiry (> 0) is before now, earliest first, and
+        returns their records. before_delete() runs once the victims are chosen but
+        while they are still visible to other readers.
+        """
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def snapshot_ids(self):
+        """Returns (max_seq, total, iterator over every stored link ID)."""
+        raise NotImplementedError
+
+    def change_token(self):
+        """A value that changes when another process writes to the store."""
+        return 0
+
+    def changes_since(self, seq: int) -> list:
+        """Returns [(seq, id)] of links created by any process after seq."""
+        return []
+
+    def metrics(self) -> dict:
+        return {"backend": self.name, "links": self.count()}
+
+    def close(self):
+        pass
+
+
+class SQLiteLinkStore(LinkStore):
+    """
+    Links in the shared SQLite database. Inserts go through the group-commit writer;
+    several worker processes can share the file.
+    """
+
+    name = 'sqlite'
+    shared = True
+
+    def __init__(self, database):
+        self.db = database
+        self._reader = None
+        self._reader_lock = threading.Lock()
+        self._init_db()
+
+    def _init_db(self):
+        with self.db.transaction() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS links (
+                    id TEXT PRIMARY KEY,
+                    ciphertext TEXT NOT NULL,
+                    nonce TEXT NOT NULL,
+                    password_hash TEXT,
+                    expiry REAL,
+                    created_at REAL
+                )
+            ''')
+            # Add new columns for file support if they don't exist
+            try:
+                conn.execute('ALTER TABLE links ADD COLUMN file_data TEXT')
+                conn.execute('ALTER TABLE links ADD COLUMN file_name TEXT')
+            except sqlite3.OperationalError:
+                # Columns likely already exist
+                pass
+            try:
+                conn.execute('ALTER TABLE links ADD COLUMN file_ref TEXT')
+                conn.execute('ALTER TABLE links ADD COLUMN file_size INTEGER')
+            except sqlite3.OperationalError:
+                pass
+            # Partial index: links that never expire (expiry = 0) are not indexed
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_links_expiry ON links (expiry) WHERE expiry > 0')
+            # Creation sequence, so ID filters in other processes can pick up new rows incrementally.
+            # Kept in its own table because rowids of deleted rows can be reused.
+            try:
+                conn.execute('ALTER TABLE links ADD COLUMN seq INTEGER')
+            except sqlite3.OperationalError:
+                pass
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_links_seq ON links (seq)')
+            conn.execute('CREATE TABLE IF NOT EXISTS link_sequence (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+            conn.execute("INSERT OR IGNORE INTO link_sequence (name, value) VALUES ('links', 0)")
+
+    def _reader_connection(self) -> sqlite3.Connection:
+        # Dedicated connection for ID-filter maintenance; PRAGMA data_version on it
+        # changes whenever any other connection commits.
+        if self._reader is None:
+            self._reader = sqlite3.connect(self.db.path, isolation_level=None, check_same_thread=False)
+        return self._reader
+
+    def create(self, record: dict) -> int:
+        values = tuple(record[f] for f in LINK_FIELDS)
+
+        def insert(conn):
+            conn.execute("UPDATE link_sequence SET value = value + 1 WHERE name = 'links'")
+            seq = conn.execute("SELECT value FROM link_sequence WHERE name = 'links'").fetchone()[0]
+            conn.execute(f'INSERT INTO links ({", ".join(LINK_FIELDS)}, seq) VALUES ({", ".join("?" * (len(LINK_FIELDS) + 1))})',
+                         values + (seq,))
+            return seq
+
+        # Group-committed with other concurrent writes; returns once durable
+        return self.db.write(insert)
+
+    def create_many(self, records: list):
+        with self.db.transaction() as conn:
+            start = conn.execute("SELECT value FROM link_sequence WHERE name = 'links'").fetchone()[0]
+            conn.executemany(f'INSERT INTO links ({", ".join(LINK_FIELDS)}, seq) VALUES ({", ".join("?" * (len(LINK_FIELDS) + 1))})',
+                             (tuple(r[f] for f in LINK_FIELDS) + (start + i + 1,) for i, r in enumerate(records)))
+            conn.execute("UPDATE link_sequence SET value = ? WHERE name = 'links'", (start + len(records),))
+
+    def get(self, link_id: str):
+        # Legacy rows keep the file inline in file_data; only a flag is selected here
+        row = self.db.fetchone(f'SELECT {", ".join(LINK_FIELDS)}, file_data IS NOT NULL AS has_inline_file '
+                               'FROM links WHERE id = ?', (link_id,))
+        return dict(row) if row else None
+
+    def get_inline_file(self, link_id: str):
+        row = self.db.fetchone('SELECT file_data FROM links WHERE id = ?', (link_id,))
+        return row['file_data'] if row else None
+
+    def delete_expired(self, now: float, limit: int, before_delete=None) -> list:
+        with self.db.transaction() as conn:
+            rows = [dict(r) for r in conn.execute(
+                f'SELECT {", ".join(LINK_FIELDS)} FROM links WHERE expiry > 0 AND expiry < ? ORDER BY expiry LIMIT ?',
+                (now, limit))]
+            if rows:
+                if before_delete:
+                    before_delete()
+                # Overwrite the deleted rows in the database file
+                conn.execute('PRAGMA secure_delete = ON')
+                try:
+                    conn.executemany('DELETE FROM links WHERE id = ?', [(r['id'],) for r in rows])
+                finally:
+                    conn.execute('PRAGMA secure_delete = OFF')
+        return rows
+
+    def count(self) -> int:
+        return self.db.fetchone('SELECT COUNT(*) FROM links')[0]
+
+    def snapshot_ids(self):
+        with self._reader_lock:
+            conn = self._reader_connection()
+            conn.execute('BEGIN')
+            try:
+                max_seq = conn.execute('SELECT COALESCE(MAX(seq), 0) FROM links').fetchone()[0]
+                total = conn.execute('SELECT COUNT(*) FROM links').fetchone()[0]
+                ids = [link_id for (link_id,) in conn.execute('SELECT id FROM links')]
+            finally:
+                conn.execute('COMMIT')
+        return max_seq, total, iter(ids)
+
+    def change_token(self):
+        with self._reader_lock:
+            return self._reader_connection().execute('PRAGMA data_version').fetchone()[0]
+
+    def metrics(self) -> dict:
+        # COUNT(*) scans the table, too slow for a metrics endpoint on a large store
+        return {"backend": self.name}
+
+    def changes_since(self, seq: int) -> list:
+        with self._reader_lock:
+            return self._reader_connection().execute('SELECT seq, id FROM links WHERE seq > ? ORDER BY seq',
+                                                     (seq,)).fetchall()
+
+    def close(self):
+        with self._reader_lock:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+
+
+class MemoryLinkStore(LinkStore):
+    """
+    Process-local store for tests and ephemeral deployments. Nothing survives a
+    restart, and links are not shared between worker processes.
+    """
+
+    name = 'memory'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._links = {}
+        self._expiries = []  # heap of (expiry, id)
+        self._seq = 0
+
+    def create(self, record: dict) -> int:
+        with self._lock:
+            if record['id'] in self._links:
+                raise ValueError("Link ID already exists.")
+            self._seq += 1
+            self._links[record['id']] = dict(record, has_inline_file=False)
+            if record['expiry'] > 0:
+                heapq.heappush(self._expiries, (record['expiry'], record['id']))
+            return self._seq
+
+    def get(self, link_id: str):
+        with self._lock:
+            record = self._links.get(link_id)
+            return dict(record) if record else None
+
+    def delete_expired(self, now: float, limit: int, before_delete=None) -> list:
+        with self._lock:
+            rows = []
+            while self._expiries and self._expiries[0][0] < now and len(rows) < limit:
+                _, link_id = heapq.heappop(self._expiries)
+                record = self._links.pop(link_id, None)
+                if record is not None:
+                    rows.append(record)
+            return rows
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._links)
+
+    def snapshot_ids(self):
+        with self._lock:
+            return self._seq, len(self._links), iter(list(self._links))
+
+
+class AppendLogLinkStore(LinkStore):
+    """
+    Embedded key-value store built on an append-only log (Bitcask style), for high
+    write rates on a single process.
+
+    Every create or delete is one sequential append of [LENGTH(4)][CRC32(4)][PAYLOAD];
+    the payload is b"P" + JSON record for a put and b"D" + id for a tombstone. An
+    in-memory index maps IDs to record offsets, so get() is one pread, and a heap
+    orders expiries. Concurrent writers share fsyncs: each waits until the log is
+    synced past its own record, and whoever syncs first covers everyone queued
+    behind it. The index is rebuilt by replaying the log at startup, a torn tail is
+    truncated, and the log is compacted once dead records outweigh live ones.
+    """
+
+    name = 'log'
+    _RECORD_HEADER = struct.Struct(">II")
+    COMPACT_MIN_BYTES = 16 * 1024 * 1024
+
+    def __init__(self, path: str, fsync: str = LINK_LOG_FSYNC):
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._index = {}  # id -> (payload offset, payload length, expiry)
+        self._expiries = []
+        self._seq = 0
+        self._live_bytes = 0
+        self._dead_bytes = 0
+        self._synced = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._replay()
+        self._file = open(self.path, 'ab')
+        self._fd = os.open(self.path, os.O_RDONLY)
+        self._end = self._synced = self._file.tell()
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        header_size = self._RECORD_HEADER.size
+        with open(self.path, 'rb') as f:
+            offset = 0
+            while True:
+                header = f.read(header_size)
+                if len(header) < header_size:
+                    break
+                length, crc = self._RECORD_HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                self._apply(payload, offset + header_size, length)
+                offset += header_size + length
+        if offset < os.path.getsize(self.path):
+            # Torn write from a crash: drop everything after the last complete record
+            with open(self.path, 'r+b') as f:
+                f.truncate(offset)
+        for link_id, (_, _, expiry) in self._index.items():
+            if expiry > 0:
+                self._expiries.append((expiry, link_id))
+        heapq.heapify(self._expiries)
+
+    def _apply(self, payload: bytes, offset: int, length: int):
+        size = self._RECORD_HEADER.size + length
+        if payload[:1] == b"P":
+            record = json.loads(payload[1:])
+            self._index[record['id']] = (offset, length, record['expiry'])
+            self._seq = max(self._seq, record.get('seq', 0))
+            self._live_bytes += size
+        else:
+            previous = self._index.pop(payload[1:].decode(), None)
+            if previous is not None:
+                moved = self._RECORD_HEADER.size + previous[1]
+                self._live_bytes -= moved
+                self._dead_bytes += moved
+            self._dead_bytes += size
+
+    def _append(self, payload: bytes) -> int:
+        """Appends one record (caller holds self._lock) and returns the payload offset."""
+        header = self._RECORD_HEADER.pack(len(payload), zlib.crc32(payload))
+        self._file.write(header + payload)
+        offset = self._end + len(header)
+        self._end += len(header) + len(payload)
+        return offset
+
+    def _sync_to(self, end: int):
+        if self.fsync == 'off':
+            with self._lock:
+                self._file.flush()
+            return
+        if self._synced >= end:
+            return
+        with self._sync_lock:
+            if self._synced >= end:
+                return  # an earlier caller's fsync already covered this record
+            with self._lock:
+                self._file.flush()
+                target = self._end
+            os.fsync(self._file.fileno())
+            self._synced = target
+
+    def create(self, record: dict) -> int:
+        with self._lock:
+            if record['id'] in self._index:
+                raise ValueError("Link ID already exists.")
+            self._seq += 1
+            seq = self._seq
+            payload = b"P" + json.dumps(dict(record, seq=seq), separators=(',', ':')).encode()
+            offset = self._append(payload)
+            self._index[record['id']] = (offset, len(payload), record['expiry'])
+            self._live_bytes += self._RECORD_HEADER.size + len(payload)
+            if record['expiry'] > 0:
+                heapq.heappush(self._expiries, (record['expiry'], record['id']))
+            end = self._end
+        self._sync_to(end)
+        return seq
+
+    def create_many(self, records: list):
+        with self._lock:
+            for record in records:
+                self._seq += 1
+                payload = b"P" + json.dumps(dict(record, seq=self._seq), separators=(',', ':')).encode()
+                offset = self._append(payload)
+                self._index[record['id']] = (offset, len(payload), record['expiry'])
+                self._live_bytes += self._RECORD_HEADER.size + len(payload)
+                if record['expiry'] > 0:
+                    self._expiries.append((record['expiry'], record['id']))
+            heapq.heapify(self._expiries)
+            end = self._end
+        self._sync_to(end)
+
+    def _read(self, link_id: str, entry):
+        """
+        Reads the record of an index entry (caller holds self._lock, so compact() cannot
+        swap the file underneath). A record for another id is rejected with None.
+        """
+        offset, length, _ = entry
+        record = json.loads(os.pread(self._fd, length, offset)[1:])
+        if record.get('id') != link_id:
+            return None
+        record.pop('seq', None)
+        record['has_inline_file'] = False
+        return record
+
+    def get(self, link_id: str):
+        with self._lock:
+            entry = self._index.get(link_id)
+            if entry is None:
+                return None
+            if entry[0] + entry[1] > self._synced:
+                self._file.flush()  # make a just-written record visible to pread
+            return self._read(link_id, entry)
+
+    def delete_expired(self, now: float, limit: int, before_delete=None) -> list:
+        with self._lock:
+            victims = []
+            while self._expiries and self._expiries[0][0] < now and len(victims) < limit:
+                _, link_id = heapq.heappop(self._expiries)
+                entry = self._index.get(link_id)
+                if entry is not None:
+                    victims.append((link_id, entry))
+            if not victims:
+                return []
+            self._file.flush()
+            rows = [row for row in (self._read(link_id, entry) for link_id, entry in victims) if row is not None]
+            for link_id, (_, length, _) in victims:
+                payload = b"D" + link_id.encode()
+                self._append(payload)
+                del self._index[link_id]
+                moved = self._RECORD_HEADER.size + length
+                self._live_bytes -= moved
+                self._dead_bytes += moved + self._RECORD_HEADER.size + len(payload)
+            end = self._end
+        self._sync_to(end)
+        if self._dead_bytes > max(self._live_bytes, self.COMPACT_MIN_BYTES):
+            self.compact()
+        return rows
+
+    def compact(self):
+        """Rewrites the log with only live records, then swaps it in atomically."""
+        with self._sync_lock, self._lock:
+            self._file.flush()
+            tmp_path = self.path + '.compact'
+            index = {}
+            offset = 0
+            with open(tmp_path, 'wb') as out:
+                for link_id, (old_offset, length, expiry) in self._index.items():
+                    payload = os.pread(self._fd, length, old_offset)
+                    header = self._RECORD_HEADER.pack(length, zlib.crc32(payload))
+                    out.write(header + payload)
+                    index[link_id] = (offset + len(header), length, expiry)
+                    offset += len(header) + length
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp_path, self.path)
+            self._file.close()
+            os.close(self._fd)
+            self._file = open(self.path, 'ab')
+            self._fd = os.open(self.path, os.O_RDONLY)
+            self._index = index
+            self._end = self._synced = offset
+            self._live_bytes = offset
+            self._dead_bytes = 0
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._index)
+
+    def snapshot_ids(self):
+        with self._lock:
+            return self._seq, len(self._index), iter(list(self._index))
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "backend": self.name,
+                "links": len(self._index),
+                "live_bytes": self._live_bytes,
+                "dead_bytes": self._dead_bytes,
+                "fsync": self.fsync,
+            }
+
+    def close(self):
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            os.close(self._fd)
+
+
+def create_link_store(backend: str = LINK_STORE) -> LinkStore:
+    """Builds the configured backend (LINK_STORE=sqlite|memory|log)."""
+    if backend == 'sqlite':
+        from core.db import db
+        return SQLiteLinkStore(db)
+    if backend == 'memory':
+        return MemoryLinkStore()
+    if backend == 'log':
+        return AppendLogLinkStore(LINK_LOG_PATH)
+    raise ValueError(f"Unknown LINK_STORE '{backend}'. Expected one of: sqlite, memory, log")
@@ -1,19 +1,27 @@
 
-import sqlite3
 import os
 import uuid
 import time
+import threading
+import logging
 import base64
 import hashlib
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from core.link_store import LinkStore, create_link_store
+from core.blob_store import BlobStore, BLOB_STORE_PATH
+from core.link_filter import LinkFilter, LINK_FILTER_CAPACITY, LINK_FILTER_FP_RATE, LINK_FILTER_REBUILD_INTERVAL
 
-# Database Path
-DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cryptaris.db')
+# Background removal of expired links. An interval of 0 disables the reaper thread.
+LINK_REAPER_INTERVAL = float(os.getenv('LINK_REAPER_INTERVAL', 60))
+LINK_REAPER_BATCH_SIZE = int(os.getenv('LINK_REAPER_BATCH_SIZE', 500))
 
 class SecureLinkManager:
-    def __init__(self):
-        # Initialize DB
-        self._init_db()
+    def __init__(self, store: LinkStore = None, blob_root: str = BLOB_STORE_PATH):
+        # Link metadata backend (LINK_STORE); SQLite unless configured otherwise
+        self.store = store if store is not None else create_link_store()
+        # Live link IDs held in memory so lookups of unknown IDs skip the store
+        self.id_filter = LinkFilter(self.store, LINK_FILTER_CAPACITY, LINK_FILTER_FP_RATE, LINK_FILTER_REBUILD_INTERVAL)
+        self.id_filter.rebuild()
         
         # Master key for encrypting the data at rest in DB
         # In a real scenario, this should be an ENV VAR or KMS key.
@@ -27,39 +35,14 @@ class SecureLinkManager:
         # Deterministic key generation from the master string
         self._master_key = hashlib.sha256(smk.encode()).digest()
         self._cipher = AESGCM(self._master_key)
+        # File payloads are kept as encrypted blobs on disk; rows only hold a reference
+        self._blobs = BlobStore(blob_root, self._master_key)
 
-    def _get_db_connection(self):
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        return conn
-
-    def _init_db(self):
-        conn = self._get_db_connection()
-        try:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS links (
-                    id TEXT PRIMARY KEY,
-                    ciphertext TEXT NOT NULL,
-                    nonce TEXT NOT NULL,
-                    password_hash TEXT,
-                    expiry REAL,
-                    created_at REAL
-                )
-            ''')
-            # Add new columns for file support if they don't exist
-            try:
-                conn.execute('ALTER TABLE links ADD COLUMN file_data TEXT')
-                conn.execute('ALTER TABLE links ADD COLUMN file_name TEXT')
-            except sqlite3.OperationalError:
-                # Columns likely already exist
-                pass
-            conn.commit()
-        finally:
-            conn.close()
-
-    def create_link(self, url: str, password: str = None, expires_seconds: int = 3600, file_data: bytes = None, file_name: str = None) -> dict:
+    def create_link(self, url: str, password: str = None, expires_seconds: int = 3600, file_data: bytes = None, file_name: str = None,
+                    file_stream=None) -> dict:
         """
-        Creates a secure, encrypted link entry in SQLite. Can Optionally contain a file.
+        Creates a secure, encrypted link entry in the link store. Can Optionally contain a file,
+        given as bytes (file_data) or a readable stream (file_stream).
         """
         link_id = uuid.uuid4().hex[:12] # ID for URL
         
@@ -72,59 +55,64 @@ class SecureLinkManager:
         nonce = os.urandom(12)
         encrypted_url = self._cipher.encrypt(nonce, url.encode() if url else b"", None)
 
-        # 2b. Encrypt File Data if present
-        encrypted_file_data = None
+        # 2b. Encrypt File Data if present, chunk by chunk into the blob store
+        file_ref = None
+        file_size = None
         if file_data:
-            # Reusing the same nonce for simplicity since we use a different payload, but ideally different nonce
-            # Wait, AES-GCM requires unique nonces for same key. We MUST use a different nonce for the file.
-            file_nonce = os.urandom(12)
-            encrypted_file_data_bytes = self._cipher.encrypt(file_nonce, file_data, None)
-            
-            # Combine nonce and ciphertext to store in a single column
-            encrypted_file_data = base64.b64encode(file_nonce).decode('utf-8') + ":" + base64.b64encode(encrypted_file_data_bytes).decode('utf-8')
+            file_ref, file_size = self._blobs.put_bytes(file_data)
+        elif file_stream is not None:
+            file_ref, file_size = self._blobs.put(file_stream)
 
         # 3. Calculate Expiry
         expiry_timestamp = 0
         if expires_seconds > 0:
             expiry_timestamp = time.time() + expires_seconds
         
-        # 4. Store in DB
-        conn = self._get_db_connection()
+        # 4. Store the record
+        record = {
+            "id": link_id,
+            "ciphertext": base64.b64encode(encrypted_url).decode('utf-8'),
+            "nonce": base64.b64encode(nonce).decode('utf-8'),
+            "password_hash": pwd_hash,
+            "expiry": expiry_timestamp,
+            "created_at": time.time(),
+            "file_ref": file_ref,
+            "file_size": file_size,
+            "file_name": file_name,
+        }
+
         try:
-            conn.execute('INSERT INTO links (id, ciphertext, nonce, password_hash, expiry, created_at, file_data, file_name) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
-                         (link_id, 
-                          base64.b64encode(encrypted_url).decode('utf-8'),
-                          base64.b64encode(nonce).decode('utf-8'),
-                          pwd_hash,
-                          expiry_timestamp,
-                          time.time(),
-                          encrypted_file_data,
-                          file_name))
-            conn.commit()
-        finally:
-            conn.close()
+            seq = self.store.create(record)
+        except Exception:
+            if file_ref:
+                self._blobs.delete(file_ref)
+            raise
+        self.id_filter.add(link_id, seq)
 
         return {"link_id": link_id, "full_url": f"https://cryptaris.io/s/{link_id}"} # Frontend handles this route usually? Or is it a display thing?
         # The user's previous code returned exactly this format.
 
     def access_link(self, link_id: str, password: str = None) -> dict:
         """
-        Retrieves and decrypts a link from SQLite if valid.
+        Retrieves and decrypts a link from the link store if valid.
+        Files are returned as 'open_file', a callable giving a lazy iterator of plaintext
+        chunks for a byte range; nothing of the file is read until expiry and password
+        checks have passed.
         """
-        conn = self._get_db_connection()
-        try:
-            row = conn.execute('SELECT * FROM links WHERE id = ?', (link_id,)).fetchone()
-        finally:
-            conn.close()
-        
+        # Unknown IDs are answered from memory (same error as a missing row)
+        if not self.id_filter.might_contain(link_id):
+            raise ValueError("Link not found or has expired.")
+
+        row = self.store.get(link_id)
+
         # 1. Check Existence
         if not row:
+            self.id_filter.record_false_positive()
             raise ValueError("Link not found or has expired.")
 
         # 2. Check Expiry
         if row['expiry'] > 0 and time.time() > row['expiry']:
-            # Lazy cleanup
-            self.cleanup() 
+            # The row itself is removed by the background reaper
             raise ValueError("Link has expired.")
 
         # 3. Check Password
@@ -145,29 +133,143 @@ class SecureLinkManager:
         except Exception:
             raise ValueError("Decryption failed. Data corruption.")
             
-        # 5. Decrypt File if present
-        file_bytes = None
+        # 5. Prepare File if present: open_file(start, end) yields plaintext for bytes [start, end)
+        open_file = None
+        file_size = row['file_size']
         file_name = row['file_name']
-        if row['file_data']:
-            try:
-                parts = row['file_data'].split(":")
-                file_nonce = base64.b64decode(parts[0])
-                file_ciphertext = base64.b64decode(parts[1])
-                file_bytes = self._cipher.decrypt(file_nonce, file_ciphertext, None)
-            except Exception:
-                raise ValueError("File decryption failed. Data corruption.")
+        file_ref = row['file_ref']
+        if file_ref:
+            def open_file(start=0, end=None):
+                try:
+                    return self._blobs.open(file_ref, start, end)
+                except FileNotFoundError:
+                    raise ValueError("File not found. It may have been removed.")
+        elif row['has_inline_file']:
+            file_bytes = self._read_inline_file(link_id)
+            file_size = len(file_bytes)
+            file_ref = hashlib.sha256(file_bytes).hexdigest()
+
+            def open_file(start=0, end=None):
+                view = memoryview(file_bytes)[start:end]
+                return iter([bytes(view)] if len(view) != len(file_bytes) else [file_bytes])
+
+        return {"url": url, "open_file": open_file, "file_size": file_size, "file_name": file_name, "file_ref": file_ref}
+
+    def blob_ref(self, link_id: str) -> str:
+        """
+        Returns the stored blob hash of a live file link (its download ETag), or None.
+        Inline legacy files have no blob hash, as their ETag is a plaintext digest.
+        """
+        if not self.id_filter.might_contain(link_id):
+            return None
+        row = self.store.get(link_id)
+        if not row or (row['expiry'] > 0 and time.time() > row['expiry']):
+            return None
+        return row['file_ref'] or None
 
-        return {"url": url, "file_data": file_bytes, "file_name": file_name}
+    def _read_inline_file(self, link_id: str) -> bytes:
+        """Decrypts a file stored in the legacy file_data column ("nonce:ciphertext", base64)."""
+        file_data = self.store.get_inline_file(link_id)
+        try:
+            parts = file_data.split(":")
+            file_nonce = base64.b64decode(parts[0])
+            file_ciphertext = base64.b64decode(parts[1])
+            return self._cipher.decrypt(file_nonce, file_ciphertext, None)
+        except Exception:
+            raise ValueError("File decryption failed. Data corruption.")
+
+    def reap_expired(self, batch_size: int = LINK_REAPER_BATCH_SIZE, now: float = None) -> tuple:
+        """
+        Deletes up to batch_size expired links, oldest expiry first (idx_links_expiry on
+        SQLite, where deleted rows are also overwritten in the database file). Their blobs
+        are shredded. Returns (rows_deleted, blobs_shredded).
+        """
+        now = time.time() if now is None else now
+        # The filter syncs before the deletes, so it has seen every link it then removes
+        rows = self.store.delete_expired(now, batch_size, before_delete=self.id_filter.sync)
+        self.id_filter.remove([r['id'] for r in rows])
+        # Blobs go only after the rows are committed, so no row ever points at a missing blob
+        shredded = sum(1 for r in rows if r['file_ref'] and self._blobs.delete(r['file_ref'], shred=True))
+        return len(rows), shredded
 
     def cleanup(self):
-        """Removes all expired links from DB."""
+        """Removes all expired links from the store, one batch at a time."""
         now = time.time()
-        conn = self._get_db_connection()
+        while self.reap_expired(LINK_REAPER_BATCH_SIZE, now)[0] == LINK_REAPER_BATCH_SIZE:
+            pass
+
+
+class LinkReaper:
+    """Daemon thread that periodically reaps expired links in bounded batches."""
+
+    def __init__(self, manager: SecureLinkManager, interval: float, batch_size: int):
+        self.manager = manager
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._runs = 0
+        self._rows_reaped = 0
+        self._blobs_shredded = 0
+        self._errors = 0
+        self._last_run_at = None
+        self._last_run_ms = 0.0
+
+    def start(self):
+        if self.interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='link-reaper', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+    def run_once(self) -> int:
+        """Reaps batches until a short one comes back, yielding the write lock between batches."""
+        started = time.perf_counter()
+        rows = blobs = 0
         try:
-            conn.execute('DELETE FROM links WHERE expiry > 0 AND expiry < ?', (now,))
-            conn.commit()
-        finally:
-            conn.close()
+            while not self._stop.is_set():
+                batch_rows, batch_blobs = self.manager.reap_expired(self.batch_size)
+                rows += batch_rows
+                blobs += batch_blobs
+                if batch_rows < self.batch_size:
+                    break
+            self.manager.id_filter.rebuild_if_due()
+        except Exception as e:
+            logging.warning(f"Link reaper failed: {e}")
+            with self._lock:
+                self._errors += 1
+        with self._lock:
+            self._runs += 1
+            self._rows_reaped += rows
+            self._blobs_shredded += blobs
+            self._last_run_at = time.time()
+            self._last_run_ms = (time.perf_counter() - started) * 1000
+        return rows
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "running": bool(self._thread and self._thread.is_alive()),
+                "interval_seconds": self.interval,
+                "batch_size": self.batch_size,
+                "runs": self._runs,
+                "rows_reaped": self._rows_reaped,
+                "blobs_shredded": self._blobs_shredded,
+                "errors": self._errors,
+                "last_run_at": self._last_run_at,
+                "last_run_ms": round(self._last_run_ms, 3),
+            }
 
 # Global Instance
 link_manager = SecureLinkManager()
+link_reaper = LinkReaper(link_manager, LINK_REAPER_INTERVAL, LINK_REAPER_BATCH_SIZE)
@@ -28,7 +28,8 @@ def shred_file(filepath: str, passes: int = 3) -> bool:
             os.remove(filepath)
             return True
             
-        with open(filepath, 'ba+', buffering=0) as f:
+        # r+b, not append mode: O_APPEND would send every write to the end of the file
+        with open(filepath, 'r+b', buffering=0) as f:
             for pass_num in range(passes):
                 f.seek(0)
                 
@@ -1,33 +1,765 @@
-from stegano import lsb
+import io
 import os
+import json
+import math
+import struct
+import zlib
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image
+from core.crypto import encrypt_bytes, decrypt_bytes, encrypt_data, decrypt_data, encrypted_size
+from core.kdf_pool import KDFPoolSaturated
 
-def hide_message_in_image(image_path: str, message: str, save_path: str) -> str:
+# Carrier layout: bits are written MSB-first into the low bits of the selected colour
+# channels of each pixel in row-major order, zero-padded to a whole pixel. The default
+# layout (1 bit of R, G and B, the stegano.lsb one) carries 3 bits per pixel. Alpha is
+# never touched.
+ENCODING = "UTF-8"
+CHANNEL_NAMES = "RGB"
+StegaLayout = namedtuple('StegaLayout', ['bits_per_channel', 'channels'])
+DEFAULT_LAYOUT = StegaLayout(1, "RGB")
+BITS_PER_PIXEL = 3  # of the default layout
+MAX_BITS_PER_CHANNEL = 4
+
+# Framed payload: [MAGIC(4)][VERSION(1)][FLAGS(1)][LAYOUT(1)][LENGTH(4)][CRC32(4)] in the
+# first 40 pixels with the default layout, then LENGTH payload bytes from pixel 40 on in
+# the layout the header names (high nibble: bits per channel - 1, low nibble: channel
+# mask R=1, G=2, B=4). Reveal rejects a non-carrier after decoding a row or two and then
+# extracts exactly LENGTH bytes. Version 1 had no LAYOUT byte; its payload follows the
+# 14-byte header in the default layout.
+STEGA_MAGIC = b"CRYS"
+STEGA_VERSION = 2
+_STEGA_HEADER = struct.Struct(">4sBBBII")
+_STEGA_HEADER_V1 = struct.Struct(">4sBBII")
+STEGA_HEADER_SIZE = _STEGA_HEADER.size
+HEADER_PIXELS = STEGA_HEADER_SIZE * 8 // BITS_PER_PIXEL
+# FLAGS bits. An encrypted payload is raw encrypt_bytes output ([SALT][CONTAINER]);
+# compression (zlib) is applied before encryption and only kept when it saves space.
+STEGA_FLAG_ENCRYPTED = 0x01
+STEGA_FLAG_COMPRESSED = 0x02
+# Part of a message split across carriers: the payload starts with a shard header
+# [SET ID(16)][INDEX(2)][COUNT(2)][TOTAL LENGTH(4)] and the other FLAGS bits describe
+# the reassembled payload, which is compressed and encrypted once as a whole.
+STEGA_FLAG_SHARDED = 0x04
+_SHARD_HEADER = struct.Struct(">16sHHI")
+# Upper bound on a decompressed message, so a small carrier cannot inflate without limit
+STEGA_MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+# Password-protected messages written by the JSON text format, still revealed
+LEGACY_ENCRYPTED_PREFIX = "ENC::"
+
+# Format written by hide: "framed", or "legacy" for the stegano.lsb layout
+# ("<byte length>:" + message) when carriers must be readable by stegano itself.
+# Reveal accepts both.
+STEGA_WRITE_FORMAT = os.getenv('STEGA_WRITE_FORMAT', 'framed').lower()
+# Default payload layout of framed carriers. More bits per channel fit a message in fewer
+# pixels at the cost of more visible noise.
+STEGA_BITS_PER_CHANNEL = int(os.getenv('STEGA_BITS_PER_CHANNEL', 1))
+STEGA_CHANNELS = os.getenv('STEGA_CHANNELS', 'RGB').upper()
+
+# zlib level for the output PNG. Encoding dominates the cost of a hide; level 1 is several
+# times faster than Pillow's default 6 for a slightly larger file.
+STEGA_PNG_COMPRESS_LEVEL = int(os.getenv('STEGA_PNG_COMPRESS_LEVEL', 1))
+
+# Embedding engine used by hide: "lsb" (pixel low bits, lossless carriers only) or "dct",
+# which survives JPEG recompression. Reveal detects either.
+STEGA_MODE = os.getenv('STEGA_MODE', 'lsb').lower()
+
+# DCT mode: one bit per selected mid-frequency coefficient of the luminance of each 8x8
+# block (the transform JPEG quantizes), held in the parity of the coefficient divided by
+# STEGA_DCT_STEP. Recompression moves a coefficient by at most half its JPEG quantizer, so
+# the parity survives while that stays under STEGA_DCT_STEP / 2; a larger step is more
+# robust and more visible. Payload bits are interleaved across the image and, with
+# STEGA_DCT_ECC (an odd repetition factor, 1 disables it), repeated and decided by a soft
+# majority vote, so saturated or damaged regions do not take out runs of neighbouring bits.
+# Carrier: [MAGIC(4)][VERSION(1)][FLAGS(1)][ECC(1)][STEP(1)][LENGTH(4)][CRC32(4)], written
+# with DCT_HEADER_STEP and DCT_HEADER_REPEAT into the leading DCT_HEADER_SLOTS slots (the
+# top block rows, so reveal rejects a non-carrier after decoding only those), then LENGTH
+# payload bytes. Survives recompression, not resizing or cropping.
+DCT_MAGIC = b"CRYD"
+DCT_VERSION = 1
+_DCT_HEADER = struct.Struct(">4sBBBBII")
+DCT_COEFFICIENTS = ((0, 2), (1, 1), (2, 0), (1, 2), (2, 1))
+DCT_HEADER_STEP = 24
+DCT_HEADER_REPEAT = 7
+DCT_HEADER_SLOTS = _DCT_HEADER.size * 8 * DCT_HEADER_REPEAT
+DCT_MAX_ECC = 15
+STEGA_DCT_STEP = int(os.getenv('STEGA_DCT_STEP', 20))
+STEGA_DCT_ECC = int(os.getenv('STEGA_DCT_ECC', 3))
+
+# Multi-carrier hide/reveal: carriers per message, and workers embedding or extracting
+# them in parallel (Pillow's PNG codecs and the NumPy bit operations release the GIL)
+STEGA_MAX_CARRIERS = int(os.getenv('STEGA_MAX_CARRIERS', 32))
+STEGA_WORKERS = int(os.getenv('STEGA_WORKERS', os.cpu_count() or 2))
+_stega_executor = ThreadPoolExecutor(max_workers=STEGA_WORKERS, thread_name_prefix='stega')
+
+
+class StegaCapacityExceeded(ValueError):
+    """The message does not fit in the carrier with the requested layout."""
+
+
+def make_layout(bits_per_channel: int = None, channels: str = None) -> StegaLayout:
+    """Validated layout; unset values come from STEGA_BITS_PER_CHANNEL and STEGA_CHANNELS."""
+    bits = int(STEGA_BITS_PER_CHANNEL if bits_per_channel is None else bits_per_channel)
+    selected = (STEGA_CHANNELS if channels is None else channels).upper()
+    if not 1 <= bits <= MAX_BITS_PER_CHANNEL:
+        raise ValueError(f"bits_per_channel must be between 1 and {MAX_BITS_PER_CHANNEL}.")
+    if not selected or any(c not in CHANNEL_NAMES for c in selected) or len(set(selected)) != len(selected):
+        raise ValueError("channels must be a combination of R, G and B.")
+    return StegaLayout(bits, "".join(c for c in CHANNEL_NAMES if c in selected))
+
+
+def _layout_byte(layout: StegaLayout) -> int:
+    mask = sum(1 << CHANNEL_NAMES.index(c) for c in layout.channels)
+    return (layout.bits_per_channel - 1) << 4 | mask
+
+
+def _parse_layout_byte(value: int) -> StegaLayout:
+    bits, mask = (value >> 4) + 1, value & 0x0F
+    if bits > MAX_BITS_PER_CHANNEL or not 0 < mask < 1 << len(CHANNEL_NAMES):
+        raise IndexError("Invalid payload layout.")
+    return StegaLayout(bits, "".join(c for i, c in enumerate(CHANNEL_NAMES) if mask >> i & 1))
+
+
+def _bits_per_pixel(layout: StegaLayout) -> int:
+    return layout.bits_per_channel * len(layout.channels)
+
+
+def payload_capacity(width: int, height: int, layout: StegaLayout = DEFAULT_LAYOUT) -> int:
+    """Payload bytes a framed carrier of this size holds after its header."""
+    return max(0, (width * height - HEADER_PIXELS) * _bits_per_pixel(layout) // 8)
+
+
+def _as_source(image):
+    """Paths and file objects pass through; bytes-like uploads are wrapped in a BytesIO."""
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return io.BytesIO(image)
+    return image
+
+
+def _open_image(image) -> Image.Image:
+    """Opens a path or file object from its start (file objects are read more than once)."""
+    if hasattr(image, 'seek'):
+        image.seek(0)
+    return Image.open(image)
+
+
+def _to_carrier_mode(img: Image.Image) -> Image.Image:
+    """Modes without RGB channels are converted to RGB."""
+    return img if img.mode in ("RGB", "RGBA") else img.convert("RGB")
+
+
+def _stega_mode(mode: str = None) -> str:
+    mode = (STEGA_MODE if mode is None else mode).lower()
+    if mode not in ('lsb', 'dct'):
+        raise ValueError("mode must be lsb or dct.")
+    return mode
+
+
+def _dct_repeat(ecc: int = None) -> int:
+    repeat = int(STEGA_DCT_ECC if ecc is None else ecc)
+    if not 1 <= repeat <= DCT_MAX_ECC or repeat % 2 == 0:
+        raise ValueError(f"ecc must be an odd repetition factor between 1 and {DCT_MAX_ECC}.")
+    return repeat
+
+
+def _dct_slots(width: int, height: int) -> int:
+    return (width // 8) * (height // 8) * len(DCT_COEFFICIENTS)
+
+
+def dct_capacity(width: int, height: int, repeat: int) -> int:
+    """Payload bytes a DCT-mode carrier of this size holds with the given repetition."""
+    return max(0, (_dct_slots(width, height) - DCT_HEADER_SLOTS) // repeat // 8)
+
+
+def _image_size(image) -> tuple:
+    """(width, height) from the image header."""
+    try:
+        with _open_image(image) as img:
+            return img.size
+    except OSError as e:
+        raise ValueError(f"Unreadable image: {str(e)}")
+
+
+def image_capacity(image, bits_per_channel: int = None, channels: str = None, mode: str = None,
+                   ecc: int = None) -> dict:
     """
-    Hides a secret message in an image using LSB steganography.
-    Converts input to RGB/RGBA to ensure compatibility.
+    Capacity of a carrier from the dimensions in its header; no pixel data is decoded.
+    max_encrypted_message_bytes leaves room for the encryption container. Both limits
+    are for incompressible text; hide compresses messages when that saves space.
+    """
+    mode = _stega_mode(mode)
+    width, height = _image_size(_as_source(image))
+    if mode == 'dct':
+        repeat = _dct_repeat(ecc)
+        capacity = dct_capacity(width, height, repeat)
+        result = {"width": width, "height": height, "mode": mode, "ecc": repeat}
+    else:
+        layout = make_layout(bits_per_channel, channels)
+        capacity = payload_capacity(width, height, layout)
+        result = {"width": width, "height": height, "mode": mode, "bits_per_channel": layout.bits_per_channel,
+                  "channels": layout.channels}
+    return {
+        **result,
+        "capacity_bytes": capacity,
+        "max_message_bytes": capacity,
+        "max_encrypted_message_bytes": max(0, capacity - encrypted_size(0)),
+    }
+
+
+def _decode_rows(image, rows: int) -> np.ndarray:
+    """
+    Pixels of the first rows of the image. Non-interlaced PNGs are stored top to bottom,
+    so only those rows are inflated; other formats are decoded in full.
+    """
+    with _open_image(image) as img:
+        if img.format == "PNG" and len(img.tile) == 1 and not img.info.get("interlace") and rows < img.height:
+            tile = img.tile[0]
+            img.tile = [(tile[0], (0, 0, img.width, rows)) + tuple(tile[2:])]
+        return np.asarray(_to_carrier_mode(img.crop((0, 0, img.width, rows))))
+
+
+def _channel_index(layout: StegaLayout):
+    """Column selector of the layout's channels: a slice (so a view) when they are adjacent."""
+    index = [CHANNEL_NAMES.index(c) for c in layout.channels]
+    if index == list(range(index[0], index[-1] + 1)):
+        return slice(index[0], index[-1] + 1)
+    return index
+
+
+def _read_lsb_bytes(image, width: int, start: int, count: int, layout: StegaLayout = DEFAULT_LAYOUT,
+                    first_pixel: int = 0) -> bytes:
+    """Unpacks count bytes at byte offset start of the bit stream that begins at first_pixel."""
+    if count <= 0:
+        return b""
+    per_pixel = _bits_per_pixel(layout)
+    first_bit = start * 8
+    last_bit = (start + count) * 8
+    lo = first_pixel + first_bit // per_pixel
+    hi = first_pixel + -(-last_bit // per_pixel)
+    top = lo // width
+    rows = _decode_rows(image, -(-hi // width))[top:]
+    values = rows.reshape(-1, rows.shape[-1])[lo - top * width:hi - top * width, _channel_index(layout)]
+    shifts = np.arange(layout.bits_per_channel - 1, -1, -1, dtype=np.uint8)
+    bits = ((values[..., None] >> shifts) & 1).reshape(-1)
+    offset = first_bit - (lo - first_pixel) * per_pixel
+    return np.packbits(bits[offset:offset + count * 8]).tobytes()
+
+
+def _payload_bits(payload: bytes, layout: StegaLayout = DEFAULT_LAYOUT) -> np.ndarray:
+    """Payload bits, MSB-first, zero-padded to a whole pixel of the layout."""
+    bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8))
+    padding = -len(bits) % _bits_per_pixel(layout)
+    if padding:
+        bits = np.concatenate([bits, np.zeros(padding, dtype=np.uint8)])
+    return bits
+
+
+def _embed_bits(pixels: np.ndarray, bits: np.ndarray, layout: StegaLayout = DEFAULT_LAYOUT, first_pixel: int = 0):
+    """Writes bits into the channel low bits in place, touching only the pixels that carry them."""
+    k = layout.bits_per_channel
+    count = len(bits) // _bits_per_pixel(layout)
+    weights = (1 << np.arange(k - 1, -1, -1)).astype(np.uint8)
+    values = (bits.reshape(count, len(layout.channels), k) * weights).sum(axis=-1, dtype=np.uint8)
+    keep = np.uint8(0xFF ^ ((1 << k) - 1))
+    flat = pixels.reshape(-1, pixels.shape[-1])
+    index = _channel_index(layout)
+    if isinstance(index, slice):
+        target = flat[first_pixel:first_pixel + count, index]
+        target &= keep
+        target |= values
+    else:
+        span = slice(first_pixel, first_pixel + count)
+        flat[span, index] = (flat[span, index] & keep) | values
+
+
+def _encode_message(message_bytes: bytes, password: str = None, capacity: int = None) -> tuple:
+    """
+    Returns (flags, payload). The payload size is known before encryption, so a message
+    over capacity raises StegaCapacityExceeded without running the key derivation.
+    """
+    flags = 0
+    payload = message_bytes
+    compressed = zlib.compress(message_bytes)
+    if len(compressed) < len(message_bytes):
+        payload = compressed
+        flags |= STEGA_FLAG_COMPRESSED
+    size = encrypted_size(len(payload)) if password else len(payload)
+    if capacity is not None and size > capacity:
+        raise StegaCapacityExceeded(f"The message you want to hide is too long: {len(message_bytes)} bytes "
+                                    f"need {size} bytes, the carrier holds {capacity}.")
+    if password:
+        payload = encrypt_bytes(payload, password)
+        flags |= STEGA_FLAG_ENCRYPTED
+    return flags, payload
+
+
+def _frame_header(flags: int, payload: bytes, layout: StegaLayout) -> bytes:
+    return _STEGA_HEADER.pack(STEGA_MAGIC, STEGA_VERSION, flags, _layout_byte(layout), len(payload),
+                              zlib.crc32(payload))
+
+
+def _frame(message_bytes: bytes, password: str = None, layout: StegaLayout = DEFAULT_LAYOUT,
+           capacity: int = None) -> tuple:
+    """Returns (header, payload) of a single-carrier message."""
+    flags, payload = _encode_message(message_bytes, password, capacity)
+    return _frame_header(flags, payload, layout), payload
+
+
+def _legacy_frame(message_bytes: bytes, password: str = None) -> bytes:
+    # The stegano layout only carries text, so a password falls back to "ENC::" + JSON
+    if password:
+        message_bytes = (LEGACY_ENCRYPTED_PREFIX + json.dumps(encrypt_data(message_bytes, password))).encode(ENCODING)
+    return f"{len(message_bytes)}:".encode("ascii") + message_bytes
+
+
+def _unframe(flags: int, payload: bytes, password: str = None) -> bytes:
+    if flags & STEGA_FLAG_ENCRYPTED:
+        if not password:
+            raise ValueError("Password required.")
+        payload = decrypt_bytes(payload, password)
+    if flags & STEGA_FLAG_COMPRESSED:
+        inflater = zlib.decompressobj()
+        payload = inflater.decompress(payload, STEGA_MAX_MESSAGE_BYTES)
+        if inflater.unconsumed_tail:
+            raise IndexError("Message is too large.")
+    return payload
+
+
+def _write_carrier(image, header: bytes, payload: bytes, layout: StegaLayout, save_path=None):
+    """
+    Embeds payload (after header, unless header is None as in the legacy format) and
+    encodes the PNG into save_path, or a BytesIO returned rewound.
+    """
+    with _open_image(image) as img:
+        pixels = np.array(_to_carrier_mode(img))
+    if header is None:
+        _embed_bits(pixels, _payload_bits(payload))
+    else:
+        _embed_bits(pixels, _payload_bits(header))
+        _embed_bits(pixels, _payload_bits(payload, layout), layout, HEADER_PIXELS)
+    return _save_png(pixels, save_path)
+
+
+def _save_png(pixels: np.ndarray, save_path=None):
+    output = io.BytesIO() if save_path is None else save_path
+    Image.fromarray(pixels).save(output, format="PNG", compress_level=STEGA_PNG_COMPRESS_LEVEL)
+    if save_path is None:
+        output.seek(0)
+    return output
+
+
+def _dct_basis() -> np.ndarray:
+    """(coefficient, 8, 8) orthonormal DCT-II basis images of DCT_COEFFICIENTS."""
+    n = np.arange(8)
+    c = np.sqrt(2 / 8) * np.cos((2 * n[None, :] + 1) * n[:, None] * np.pi / 16)
+    c[0] /= np.sqrt(2)
+    return np.stack([np.outer(c[u], c[v]) for u, v in DCT_COEFFICIENTS]).astype(np.float32)
+
+
+_DCT_BASIS = _dct_basis()
+_LUMA_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def _dct_coefficients(y: np.ndarray) -> np.ndarray:
+    """
+    (block rows, block columns, coefficient) DCT_COEFFICIENTS of every whole 8x8 block of
+    the luminance y, computed for all blocks at once. Slot i is element i of the flattening.
+    """
+    rows, cols = y.shape[0] // 8, y.shape[1] // 8
+    blocks = y[:rows * 8, :cols * 8].reshape(rows, 8, cols, 8)
+    return np.einsum('aibj,pij->abp', blocks, _DCT_BASIS, optimize=True)
+
+
+def _dct_header_order() -> np.ndarray:
+    """
+    Header slots in bit stream order: each of the DCT_HEADER_REPEAT copies of the header
+    fills its own run of the leading slots, so damage to a few blocks hits one copy.
+    """
+    copy_size = DCT_HEADER_SLOTS // DCT_HEADER_REPEAT
+    i = np.arange(DCT_HEADER_SLOTS, dtype=np.int64)
+    return i % DCT_HEADER_REPEAT * copy_size + i // DCT_HEADER_REPEAT
+
+
+_DCT_HEADER_ORDER = _dct_header_order()
+
+
+def _dct_header_rows(width: int) -> int:
+    """Pixel rows holding the leading DCT_HEADER_SLOTS slots of an image this wide."""
+    blocks = -(-DCT_HEADER_SLOTS // len(DCT_COEFFICIENTS))
+    return -(-blocks // (width // 8)) * 8
+
+
+def _slot_order(n_slots: int, count: int) -> np.ndarray:
+    """
+    The first count slots of the bit stream. Consecutive bits (and their repetitions) are
+    spread over the image by i -> i * stride mod n_slots, stride coprime to n_slots; plain
+    arithmetic, so the order does not depend on a random generator's version.
+    """
+    stride = int(n_slots * 0.6180339887) | 1
+    while math.gcd(stride, n_slots) != 1:
+        stride += 2
+    return np.arange(count, dtype=np.int64) * stride % n_slots
+
+
+def _dct_embed(pixels: np.ndarray, slots: np.ndarray, bits: np.ndarray, steps: np.ndarray):
+    """
+    Moves each slot's coefficient to the nearest multiple of its step with the bit's
+    parity and adds the luminance change to R, G and B in place (which leaves the
+    chroma unchanged).
+    """
+    rgb = pixels[..., :3]
+    coeffs = _dct_coefficients(rgb @ _LUMA_WEIGHTS)
+    flat = coeffs.reshape(-1)
+    values = flat[slots] / steps
+    k = np.round(values)
+    wrong = (k.astype(np.int64) & 1) != bits
+    k[wrong] += np.where(values[wrong] >= k[wrong], 1, -1)
+    delta = np.zeros_like(flat)
+    delta[slots] = k * steps - flat[slots]
+    rows, cols, _ = coeffs.shape
+    delta_y = np.einsum('abp,pij->aibj', delta.reshape(coeffs.shape), _DCT_BASIS, optimize=True)
+    # Pixels are integers, so rounding the change first is the same and keeps the
+    # full-image add and clip in int16 rather than float
+    region = rgb[:rows * 8, :cols * 8]
+    region[...] = np.clip(region + np.rint(delta_y).astype(np.int16).reshape(rows * 8, cols * 8, 1), 0, 255)
+
+
+def _dct_read_bytes(coeffs: np.ndarray, step: int, repeat: int) -> bytes:
+    """Soft decision: cos(pi * c / step) is +1 on even multiples and -1 on odd ones, summed over the copies."""
+    votes = np.cos(np.pi * coeffs / step).reshape(-1, repeat).sum(axis=1)
+    return np.packbits(votes < 0).tobytes()
+
+
+def _repeat_bits(data: bytes, repeat: int) -> np.ndarray:
+    return np.repeat(np.unpackbits(np.frombuffer(data, dtype=np.uint8)), repeat)
+
+
+def _write_dct_carrier(image, flags: int, payload: bytes, repeat: int, save_path=None):
+    """Embeds a DCT-mode header and payload and encodes the PNG (see _save_png)."""
+    width, height = _image_size(image)
+    header = _DCT_HEADER.pack(DCT_MAGIC, DCT_VERSION, flags, repeat, STEGA_DCT_STEP, len(payload),
+                              zlib.crc32(payload))
+    header_bits = _repeat_bits(header, DCT_HEADER_REPEAT)
+    payload_bits = _repeat_bits(payload, repeat)
+    steps = np.concatenate([np.full(len(header_bits), DCT_HEADER_STEP, dtype=np.float32),
+                            np.full(len(payload_bits), STEGA_DCT_STEP, dtype=np.float32)])
+    with _open_image(image) as img:
+        pixels = np.array(_to_carrier_mode(img))
+    payload_slots = DCT_HEADER_SLOTS + _slot_order(_dct_slots(width, height) - DCT_HEADER_SLOTS, len(payload_bits))
+    _dct_embed(pixels, np.concatenate([_DCT_HEADER_ORDER, payload_slots]),
+               np.concatenate([header_bits, payload_bits]), steps)
+    # Clipping undoes the change in blocks near black or white; refuse a carrier that
+    # would not read back even before any recompression
+    try:
+        readable = _dct_decode(pixels) == (flags, payload)
+    except IndexError:
+        readable = False
+    if not readable:
+        raise ValueError("The image is too close to black or white to carry this message in dct mode.")
+    return _save_png(pixels, save_path)
+
+
+def _read_dct(image):
+    """
+    (flags, payload) of a DCT-mode carrier, or None if the image does not hold its header.
+    Only the header rows are decoded until the magic matches.
+    """
+    width, height = _image_size(image)
+    if _dct_slots(width, height) < DCT_HEADER_SLOTS:
+        return None
+    rows = _decode_rows(image, _dct_header_rows(width))
+    if _dct_header(_dct_coefficients(rows[..., :3] @ _LUMA_WEIGHTS).reshape(-1)) is None:
+        return None
+    with _open_image(image) as img:
+        return _dct_decode(np.asarray(_to_carrier_mode(img)))
+
+
+def _dct_header(coeffs: np.ndarray):
+    """(flags, repeat, step, length, crc) from the leading coefficients, or None without the magic."""
+    header = _dct_read_bytes(coeffs[_DCT_HEADER_ORDER], DCT_HEADER_STEP, DCT_HEADER_REPEAT)
+    magic, version, flags, repeat, step, length, crc = _DCT_HEADER.unpack(header)
+    if magic != DCT_MAGIC:
+        return None
+    if version != DCT_VERSION:
+        raise IndexError(f"Unsupported payload version {version}.")
+    return flags, repeat, step, length, crc
+
+
+def _dct_decode(pixels: np.ndarray):
+    """(flags, payload) held in decoded pixels, or None without a DCT header."""
+    height, width = pixels.shape[:2]
+    coeffs = _dct_coefficients(pixels[..., :3] @ _LUMA_WEIGHTS).reshape(-1)
+    header = _dct_header(coeffs)
+    if header is None:
+        return None
+    flags, repeat, step, length, crc = header
+    if not step or not repeat or length > dct_capacity(width, height, repeat):
+        raise IndexError("Payload length exceeds the image capacity.")
+    slots = DCT_HEADER_SLOTS + _slot_order(_dct_slots(width, height) - DCT_HEADER_SLOTS, length * 8 * repeat)
+    payload = _dct_read_bytes(coeffs[slots], step, repeat)
+    if zlib.crc32(payload) != crc:
+        raise IndexError("Payload checksum mismatch. The image was modified beyond recovery.")
+    return flags, payload
+
+
+def hide_message_in_image(image_path, message: str, save_path=None, password: str = None,
+                          bits_per_channel: int = None, channels: str = None, mode: str = None, ecc: int = None):
+    """
+    Hides a secret message in an image using LSB steganography, encrypted with password
+    if one is given. bits_per_channel (1-4) and channels (e.g. "RGB" or "B") choose the
+    payload layout; the legacy format only has the default one. mode "dct" embeds in
+    DCT coefficients instead, so the carrier survives JPEG recompression, with ecc the
+    repetition factor of its error correction.
+    image_path may be a path, a seekable file object or bytes. The PNG is written to
+    save_path (a path or file object) and that is returned; without save_path it is
+    encoded into a BytesIO, returned rewound. A message that does not fit raises
+    StegaCapacityExceeded before any pixel data is decoded.
     """
     try:
-        # Check if the image path exists
-        if not os.path.exists(image_path):
-             raise ValueError("Input image file not found.")
-
-        # Ensure that the image is opened and converted effectively to a format 
-        # that supports LSB (like PNG avoids lossy compression artifacts from input if we just read pixels, 
-        # but usage of 'lsb.hide' takes a path or image object).
-        # We will let 'lsb.hide' handle it, but if it's a JPEG, lsb might fail or result be weak.
-        # Actually, stegano.lsb.hide opens the image.
-        
-        secret = lsb.hide(image_path, message)
-        secret.save(save_path)
-        return save_path
+        image_path = _as_source(image_path)
+        if isinstance(image_path, str) and not os.path.exists(image_path):
+            raise ValueError("Input image file not found.")
+        if not message:
+            raise ValueError("Message is empty.")
+        if _stega_mode(mode) == 'dct':
+            if bits_per_channel is not None or channels is not None:
+                raise ValueError("bits_per_channel and channels only apply to the lsb mode.")
+            repeat = _dct_repeat(ecc)
+            flags, payload = _encode_message(message.encode(ENCODING), password,
+                                             dct_capacity(*_image_size(image_path), repeat))
+            return _write_dct_carrier(image_path, flags, payload, repeat, save_path)
+        legacy = STEGA_WRITE_FORMAT == 'legacy'
+        layout = make_layout(bits_per_channel, channels)
+        if legacy and layout != DEFAULT_LAYOUT:
+            raise ValueError("The legacy format only supports 1 bit of R, G and B.")
+
+        message_bytes = message.encode(ENCODING)
+        width, height = _image_size(image_path)
+        if legacy:
+            header, payload = None, _legacy_frame(message_bytes, password)
+            if len(payload) * 8 > width * height * BITS_PER_PIXEL:
+                raise StegaCapacityExceeded(f"The message you want to hide is too long: {len(message_bytes)} bytes")
+        else:
+            header, payload = _frame(message_bytes, password, layout, payload_capacity(width, height, layout))
+        return _write_carrier(image_path, header, payload, layout, save_path)
+    except (KDFPoolSaturated, StegaCapacityExceeded):
+        raise
     except Exception as e:
         raise ValueError(f"Steganography encoding failed: {str(e)}")
 
-def reveal_message_from_image(image_path: str) -> str:
+
+def _reveal_legacy(image_path, width: int, capacity: int) -> bytes:
+    # The prefix is at most the digits of the largest length that fits, plus ':'
+    head = _read_lsb_bytes(image_path, width, 0, min(capacity, len(str(capacity)) + 1))
+    digits, colon, _ = head.partition(b":")
+    if not colon or not digits.isdigit():
+        raise IndexError("Impossible to detect message.")
+    length = int(digits)
+    start = len(digits) + 1
+    if start + length > capacity:
+        raise IndexError("Impossible to detect message.")
+    return _read_lsb_bytes(image_path, width, start, length)
+
+
+def _reveal_framed(image_path, header: bytes, width: int, height: int) -> tuple:
+    """(flags, payload) of a version 1 or 2 framed carrier, checked against its CRC."""
+    version = header[len(STEGA_MAGIC)]
+    if version == 1:
+        _, _, flags, length, crc = _STEGA_HEADER_V1.unpack(header[:_STEGA_HEADER_V1.size])
+        if _STEGA_HEADER_V1.size + length > width * height * BITS_PER_PIXEL // 8:
+            raise IndexError("Payload length exceeds the image capacity.")
+        payload = _read_lsb_bytes(image_path, width, _STEGA_HEADER_V1.size, length)
+    elif version == STEGA_VERSION:
+        _, _, flags, layout_byte, length, crc = _STEGA_HEADER.unpack(header)
+        layout = _parse_layout_byte(layout_byte)
+        if length > payload_capacity(width, height, layout):
+            raise IndexError("Payload length exceeds the image capacity.")
+        payload = _read_lsb_bytes(image_path, width, 0, length, layout, HEADER_PIXELS)
+    else:
+        raise IndexError(f"Unsupported payload version {version}.")
+    if zlib.crc32(payload) != crc:
+        raise IndexError("Payload checksum mismatch. The image was modified.")
+    return flags, payload
+
+
+def _read_carrier(image) -> tuple:
+    """
+    (flags, payload) of a framed LSB or a DCT carrier; a legacy one gives (0, message).
+    The DCT header is checked before the legacy prefix, since the low bits of any image
+    (a recompressed DCT carrier, say) may start with a digit.
+    """
+    with _open_image(image) as img:
+        width, height = img.size
+    capacity = width * height * BITS_PER_PIXEL // 8
+    header = _read_lsb_bytes(image, width, 0, min(capacity, STEGA_HEADER_SIZE))
+    if header[:len(STEGA_MAGIC)] == STEGA_MAGIC and len(header) == STEGA_HEADER_SIZE:
+        return _reveal_framed(image, header, width, height)
+    framed = _read_dct(image)
+    if framed is not None:
+        return framed
+    if header[:1].isdigit():
+        return 0, _reveal_legacy(image, width, capacity)
+    raise IndexError("Impossible to detect message.")
+
+
+def _decode_text(message: bytes, password: str = None) -> str:
+    try:
+        text = message.decode(ENCODING)
+    except UnicodeDecodeError:
+        raise IndexError("Impossible to detect message.")
+    if password and text.startswith(LEGACY_ENCRYPTED_PREFIX):
+        encrypted = json.loads(text[len(LEGACY_ENCRYPTED_PREFIX):])
+        text = decrypt_data(encrypted['ciphertext'], password, encrypted['salt'], encrypted['nonce']).decode(ENCODING)
+    return text
+
+
+def reveal_message_from_image(image_path, password: str = None) -> str:
+    """
+    Reveals a secret message from an LSB-encoded image (framed or legacy layout) or a
+    DCT-mode one, also after JPEG recompression. For framed LSB carriers only the pixels
+    holding the header and the message are decoded. image_path may be a
+    path, a seekable file object or bytes. Encrypted messages need the password; legacy
+    "ENC::" text is decrypted when a password is given and returned as is otherwise.
+    """
+    try:
+        flags, payload = _read_carrier(_as_source(image_path))
+        if flags & STEGA_FLAG_SHARDED:
+            _, index, count, _ = _SHARD_HEADER.unpack_from(payload)
+            raise IndexError(f"The image holds part {index + 1} of {count} of a message split across images.")
+        return _decode_text(_unframe(flags, payload, password), password)
+    except KDFPoolSaturated:
+        raise
+    except Exception as e:
+        raise ValueError(f"Steganography decoding failed (Image might not contain a message): {str(e)}")
+
+
+def _check_carrier_count(images: list):
+    if not images:
+        raise ValueError("At least one image is required.")
+    if len(images) > STEGA_MAX_CARRIERS:
+        raise ValueError(f"At most {STEGA_MAX_CARRIERS} images can carry one message.")
+
+
+def _split_payload(payload: bytes, capacities: list) -> list:
+    """Splits payload in proportion to the carriers' capacities, touching a similar share of each."""
+    total = sum(capacities)
+    sizes = [len(payload) * capacity // total for capacity in capacities]
+    remainder = len(payload) - sum(sizes)
+    for i, capacity in enumerate(capacities):
+        extra = min(remainder, capacity - sizes[i])
+        sizes[i] += extra
+        remainder -= extra
+    view = memoryview(payload)
+    shards, offset = [], 0
+    for size in sizes:
+        shards.append(bytes(view[offset:offset + size]))
+        offset += size
+    return shards
+
+
+def carriers_capacity(images: list, bits_per_channel: int = None, channels: str = None, mode: str = None,
+                      ecc: int = None) -> dict:
+    """Per-image and combined capacity of a multi-carrier message, from the image headers."""
+    _check_carrier_count(images)
+    carriers = [image_capacity(image, bits_per_channel, channels, mode, ecc) for image in images]
+    capacity = sum(max(0, c["capacity_bytes"] - _SHARD_HEADER.size) for c in carriers)
+    return {
+        "images": carriers,
+        "capacity_bytes": capacity,
+        "max_message_bytes": capacity,
+        "max_encrypted_message_bytes": max(0, capacity - encrypted_size(0)),
+    }
+
+
+def hide_message_across_images(images: list, message: str, password: str = None,
+                               bits_per_channel: int = None, channels: str = None, mode: str = None,
+                               ecc: int = None) -> list:
+    """
+    Hides a message too large for one image across several. The message is compressed
+    and encrypted once, split in proportion to each image's capacity and embedded on
+    the worker pool. Returns one rewound PNG BytesIO per image, in input order; the
+    carriers can be revealed together in any order. Always writes the framed format
+    in lsb mode.
+    """
+    try:
+        images = [_as_source(image) for image in images]
+        _check_carrier_count(images)
+        if not message:
+            raise ValueError("Message is empty.")
+        dct = _stega_mode(mode) == 'dct'
+        if dct and (bits_per_channel is not None or channels is not None):
+            raise ValueError("bits_per_channel and channels only apply to the lsb mode.")
+        repeat = _dct_repeat(ecc) if dct else None
+        layout = None if dct else make_layout(bits_per_channel, channels)
+
+        capacities = []
+        for number, image in enumerate(images, 1):
+            width, height = _image_size(image)
+            capacity = (dct_capacity(width, height, repeat) if dct else payload_capacity(width, height, layout)) \
+                - _SHARD_HEADER.size
+            if capacity <= 0:
+                raise ValueError(f"Image {number} is too small to carry part of a message.")
+            capacities.append(capacity)
+        flags, payload = _encode_message(message.encode(ENCODING), password, sum(capacities))
+
+        set_id = os.urandom(16)
+        jobs = []
+        for index, (image, chunk) in enumerate(zip(images, _split_payload(payload, capacities))):
+            shard = _SHARD_HEADER.pack(set_id, index, len(images), len(payload)) + chunk
+            if dct:
+                jobs.append(_stega_executor.submit(_write_dct_carrier, image, flags | STEGA_FLAG_SHARDED, shard, repeat))
+            else:
+                header = _frame_header(flags | STEGA_FLAG_SHARDED, shard, layout)
+                jobs.append(_stega_executor.submit(_write_carrier, image, header, shard, layout))
+        return [job.result() for job in jobs]
+    except (KDFPoolSaturated, StegaCapacityExceeded):
+        raise
+    except Exception as e:
+        raise ValueError(f"Steganography encoding failed: {str(e)}")
+
+
+def _join_shards(parts: list) -> tuple:
+    """(flags, payload) reassembled from the (flags, shard) of every carrier, in any order."""
+    first = None
+    chunks = {}
+    for flags, shard in parts:
+        if not flags & STEGA_FLAG_SHARDED or len(shard) < _SHARD_HEADER.size:
+            raise IndexError("An image does not hold part of a split message.")
+        set_id, index, count, total = _SHARD_HEADER.unpack_from(shard)
+        if first is None:
+            first = (flags, set_id, count, total)
+        elif (flags, set_id, count, total) != first:
+            raise IndexError("The images hold parts of different messages.")
+        if index in chunks:
+            raise IndexError(f"Part {index + 1} was given twice.")
+        chunks[index] = shard[_SHARD_HEADER.size:]
+    flags, _, count, total = first
+    missing = [str(index + 1) for index in range(count) if index not in chunks]
+    if missing:
+        raise IndexError(f"Missing part(s) {', '.join(missing)} of {count}.")
+    payload = b"".join(chunks[index] for index in range(count))
+    if len(payload) != total:
+        raise IndexError("Reassembled message has the wrong length.")
+    return flags & ~STEGA_FLAG_SHARDED, payload
+
+
+def reveal_message_from_images(images: list, password: str = None) -> str:
     """
-    Reveals a secret message from an LSB-encoded image.
+    Reveals a message split across images by hide_message_across_images, extracting the
+    parts on the worker pool. The images may come in any order; a single ordinary
+    carrier is revealed as by reveal_message_from_image.
     """
     try:
-        return lsb.reveal(image_path)
+        images = [_as_source(image) for image in images]
+        _check_carrier_count(images)
+        parts = [job.result() for job in [_stega_executor.submit(_read_carrier, image) for image in images]]
+        if len(parts) == 1 and not parts[0][0] & STEGA_FLAG_SHARDED:
+            flags, payload = parts[0]
+        else:
+            flags, payload = _join_shards(parts)
+        return _decode_text(_unframe(flags, payload, password), password)
+    except KDFPoolSaturated:
+        raise
     except Exception as e:
         raise ValueError(f"Steganography decoding failed (Image might not contain a message): {str(e)}")
@@ -0,0 +1,70 @@
+import base64
+import os
+import sys
+
+# Ensure backend directory is in path so we can import core modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('SYSTEM_MASTER_KEY', 'verify-batch-throwaway-key-00000000000')
+
+from core import crypto
+from core.crypto import decrypt_batch, encrypt_batch, encrypt_data
+
+PASSWORD = "batch-check-password"
+
+
+def run_tests() -> bool:
+    print("Beginning Batch Encryption Tests...")
+    results = []
+
+    def check(name: str, passed: bool):
+        results.append(passed)
+        print(f"[{'+' if passed else '-'}] {name}")
+
+    texts = ["alpha", "", "gamma " * 100, "delta"]
+    batch = encrypt_batch(texts[:2] + [42] + texts[2:], PASSWORD)
+    sealed = batch['items']
+    check("a non-string item fails alone while the rest encrypt",
+          'error' in sealed[2] and all('ciphertext' in item for i, item in enumerate(sealed) if i != 2))
+    item_bytes = len(base64.b64decode(sealed[0]['ciphertext']))
+    check(f"items are nonce + ciphertext + tag only ({item_bytes} bytes for 5 characters)", item_bytes == 12 + 5 + 16)
+
+    ciphertexts = [item['ciphertext'] for item in sealed if 'ciphertext' in item]
+    opened = decrypt_batch(ciphertexts, PASSWORD, batch['salt'], batch['key'])
+    check("batch items decrypt with the batch key", [item.get('text') for item in opened] == texts)
+
+    tampered = bytearray(base64.b64decode(ciphertexts[0]))
+    tampered[-1] ^= 0x01
+    other = encrypt_batch(["from another batch"], PASSWORD)['items'][0]['ciphertext']
+    standalone = encrypt_data(b"standalone", PASSWORD)
+    mixed = [ciphertexts[3], base64.b64encode(bytes(tampered)).decode('utf-8'), "not base64!", other,
+             {'ciphertext': standalone['ciphertext'], 'salt': standalone['salt']}]
+    opened = decrypt_batch(mixed, PASSWORD, batch['salt'], batch['key'])
+    check("a good item survives its failing neighbours", opened[0].get('text') == "delta")
+    check("a tampered item is reported on its own", 'error' in opened[1])
+    check("an undecodable item is reported on its own", 'error' in opened[2])
+    check("an item from another batch is reported on its own", 'error' in opened[3])
+    check("a standalone container in the same batch decrypts", opened[4].get('text') == "standalone")
+
+    opened = decrypt_batch(ciphertexts, "wrong-password", batch['salt'], batch['key'])
+    check("a wrong password fails every item without raising", all('error' in item for item in opened))
+
+    containers = [encrypt_data(f"item {i}".encode(), PASSWORD) for i in range(crypto.BATCH_MAX_SALTS + 2)]
+    opened = decrypt_batch([{'ciphertext': c['ciphertext'], 'salt': c['salt']} for c in containers], PASSWORD)
+    limit = crypto.BATCH_MAX_SALTS
+    check(f"only the first {limit} distinct salts are honoured",
+          all(item.get('text') == f"item {i}" for i, item in enumerate(opened[:limit]))
+          and all('Too many distinct salts' in item.get('error', '') for item in opened[limit:]))
+
+    try:
+        encrypt_batch([""] * (crypto.BATCH_MAX_ITEMS + 1), PASSWORD)
+        check("oversized batches are refused", False)
+    except ValueError:
+        check("oversized batches are refused", True)
+
+    all_passed = all(results)
+    print("\nRESULT: " + ("PASS" if all_passed else "FAIL"))
+    return all_passed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run_tests() else 1)
@@ -0,0 +1,98 @@
+import base64
+import io
+import os
+import sys
+
+# Ensure backend directory is in path so we can import core modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Legacy blobs are sealed under the system key; use a throwaway one if none is configured
+os.environ.setdefault('SYSTEM_MASTER_KEY', 'verify-crypto-compat-throwaway-key-000')
+
+from core import crypto
+from core.crypto import (FORMAT_MAGIC, HEADER_SIZE, SYSTEM_MASTER_KEY, decrypt_bytes, decrypt_data, decrypt_stream,
+                         derive_key, encrypt_bytes, encrypt_data, encrypt_stream, rewrap_data, _encrypt_layer)
+
+PASSWORD = "compat-check-password"
+PLAINTEXT = b"cryptaris compatibility check " * 50
+
+
+def b64(data: bytes) -> str:
+    return base64.b64encode(data).decode('utf-8')
+
+
+def legacy_blob(data: bytes, password: str, salt: bytes) -> bytes:
+    """A version 1 container as the original two-layer SYSTEM_BOUND code wrote it."""
+    user_layer = _encrypt_layer(data, derive_key(password, salt))
+    return _encrypt_layer(user_layer, derive_key(SYSTEM_MASTER_KEY, salt))
+
+
+def rejects(fn) -> bool:
+    try:
+        fn()
+    except ValueError:
+        return True
+    return False
+
+
+def run_tests() -> bool:
+    print("Beginning Container Compatibility Tests...")
+    results = []
+
+    def check(name: str, passed: bool):
+        results.append(passed)
+        print(f"[{'+' if passed else '-'}] {name}")
+
+    # v1: headerless legacy containers must stay decryptable
+    salt = os.urandom(16)
+    v1 = legacy_blob(PLAINTEXT, PASSWORD, salt)
+    check("v1 legacy blob decrypts via decrypt_data",
+          decrypt_data(b64(v1), PASSWORD, b64(salt), "") == PLAINTEXT)
+    check("v1 legacy blob decrypts via decrypt_bytes", decrypt_bytes(salt + v1, PASSWORD) == PLAINTEXT)
+    check("v1 legacy blob rejects a wrong password",
+          rejects(lambda: decrypt_data(b64(v1), "wrong-password", b64(salt), "")))
+
+    # v2: envelope with an authenticated KDF descriptor
+    v2 = encrypt_data(PLAINTEXT, PASSWORD)
+    blob = base64.b64decode(v2['ciphertext'])
+    check("v2 envelope carries the CRYX header", blob[:HEADER_SIZE] == FORMAT_MAGIC + bytes([crypto.FORMAT_V2_ENVELOPE]))
+    check("v2 envelope round-trips via decrypt_data",
+          decrypt_data(v2['ciphertext'], PASSWORD, v2['salt'], v2['nonce']) == PLAINTEXT)
+    check("v2 envelope round-trips via decrypt_bytes",
+          decrypt_bytes(encrypt_bytes(PLAINTEXT, PASSWORD), PASSWORD) == PLAINTEXT)
+    rewrapped = rewrap_data(v2['ciphertext'], v2['salt'], PASSWORD, "new-password")
+    check("v2 envelope re-wraps to a new password",
+          decrypt_data(rewrapped, "new-password", v2['salt'], "") == PLAINTEXT
+          and rejects(lambda: decrypt_data(rewrapped, PASSWORD, v2['salt'], "")))
+    forged = bytearray(blob)
+    forged[HEADER_SIZE] ^= 0x01  # first byte of the KDF descriptor
+    check("v2 envelope rejects a tampered KDF descriptor",
+          rejects(lambda: decrypt_data(b64(bytes(forged)), PASSWORD, v2['salt'], "")))
+    unknown = bytearray(blob)
+    unknown[len(FORMAT_MAGIC)] = 9
+    check("unknown container versions are refused",
+          rejects(lambda: decrypt_data(b64(bytes(unknown)), PASSWORD, v2['salt'], "")))
+
+    # v3: segmented stream container
+    sealed = io.BytesIO()
+    encrypt_stream(io.BytesIO(PLAINTEXT), sealed, PASSWORD, chunk_size=256)
+    stream = sealed.getvalue()
+    check("v3 stream carries the CRYX header", stream[len(FORMAT_MAGIC)] == crypto.FORMAT_V3_STREAM)
+    opened = io.BytesIO()
+    decrypt_stream(io.BytesIO(stream), opened, PASSWORD)
+    check("v3 stream round-trips", opened.getvalue() == PLAINTEXT)
+    check("v3 stream rejects a wrong password",
+          rejects(lambda: decrypt_stream(io.BytesIO(stream), io.BytesIO(), "wrong-password")))
+    check("v3 stream rejects truncation",
+          rejects(lambda: decrypt_stream(io.BytesIO(stream[:-(256 + 16)]), io.BytesIO(), PASSWORD)))
+    tampered = bytearray(stream)
+    tampered[-1] ^= 0x01
+    check("v3 stream rejects a tampered segment",
+          rejects(lambda: decrypt_stream(io.BytesIO(bytes(tampered)), io.BytesIO(), PASSWORD)))
+
+    all_passed = all(results)
+    print("\nRESULT: " + ("PASS" if all_passed else "FAIL"))
+    return all_passed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run_tests() else 1)
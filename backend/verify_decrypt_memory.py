@@ -0,0 +1,80 @@
+import os
+import sys
+import resource
+import subprocess
+import tempfile
+
+# Ensure backend directory is in path so we can import core modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Parent and child must share the system key; use a throwaway one if none is configured
+os.environ.setdefault('SYSTEM_MASTER_KEY', 'verify-decrypt-memory-throwaway-key-0000')
+
+PASSWORD = "memory-check-password"
+SIZES_MB = [1, 16, 64]
+# Interpreter noise allowed on top of input + output (allocator slack, key derivation, etc.)
+SLACK_BYTES = 4 * 1024 * 1024
+
+
+def peak_rss_bytes() -> int:
+    # VmHWM is reset on exec; ru_maxrss can carry over the forking parent's peak
+    if os.path.exists('/proc/self/status'):
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def child(path: str):
+    """Decrypts one file the way /api/decrypt/file does and prints the peak RSS growth."""
+    from core.crypto import encrypt_bytes, decrypt_bytes
+
+    # Warm up imports, the KDF pool and allocator arenas before taking the baseline
+    decrypt_bytes(encrypt_bytes(b"warm-up", PASSWORD), PASSWORD)
+    baseline = peak_rss_bytes()
+
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        buffer = bytearray(size)
+        f.readinto(buffer)
+    plaintext = decrypt_bytes(buffer, PASSWORD)
+
+    print(size, len(plaintext), peak_rss_bytes() - baseline)
+
+
+def run_tests() -> bool:
+    from core.crypto import encrypt_bytes
+
+    print("Beginning Decrypt Memory Accounting Tests...")
+    all_passed = True
+    for size_mb in SIZES_MB:
+        with tempfile.NamedTemporaryFile(suffix='.enc', delete=False) as f:
+            f.write(encrypt_bytes(os.urandom(size_mb * 1024 * 1024), PASSWORD))
+            path = f.name
+        try:
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', path],
+                                 capture_output=True, text=True)
+            if out.returncode != 0:
+                print(out.stderr)
+                return False
+            input_size, output_size, growth = map(int, out.stdout.split()[-3:])
+        finally:
+            os.remove(path)
+
+        budget = input_size + output_size + SLACK_BYTES
+        passed = growth <= budget
+        all_passed &= passed
+        print(f"[{'+' if passed else '-'}] {size_mb} MB: peak RSS grew {growth / 2**20:.1f} MB "
+              f"(budget input + output + slack = {budget / 2**20:.1f} MB)")
+
+    print("\nRESULT: " + ("PASS" if all_passed else "FAIL"))
+    return all_passed
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == '--child':
+        child(sys.argv[2])
+    else:
+        sys.exit(0 if run_tests() else 1)
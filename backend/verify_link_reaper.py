@@ -0,0 +1,87 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Ensure backend directory is in path so we can import core modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Every store lives in a throwaway directory, including the shared SQLite database
+WORK_DIR = tempfile.mkdtemp(prefix='cryptaris-verify-reaper-')
+os.environ['CRYPTARIS_DB_PATH'] = os.path.join(WORK_DIR, 'cryptaris.db')
+
+from core.db import db
+from core.link_filter import LINK_FILTER_SYNC_INTERVAL_MS
+from core.link_store import AppendLogLinkStore, MemoryLinkStore, SQLiteLinkStore
+from core.secure_links import LinkReaper, SecureLinkManager
+
+EXPIRED_LINKS = 25
+LIVE_LINKS = 5
+BATCH_SIZE = 10
+
+
+def check_store(store, check) -> None:
+    blob_root = tempfile.mkdtemp(dir=WORK_DIR)
+    manager = SecureLinkManager(store, blob_root=blob_root)
+    expired = [manager.create_link(f"https://expired/{i}", expires_seconds=1, file_data=os.urandom(1000))['link_id']
+               for i in range(EXPIRED_LINKS)]
+    live = [manager.create_link(f"https://live/{i}", expires_seconds=0)['link_id'] for i in range(LIVE_LINKS)]
+    blob_paths = [manager._blobs.path_for(store.get(link_id)['file_ref']) for link_id in expired]
+    later = time.time() + 5
+
+    rows, shredded = manager.reap_expired(BATCH_SIZE, now=later)
+    check(f"one reap removes at most one batch ({rows} rows, {shredded} blobs)",
+          rows == BATCH_SIZE and shredded == BATCH_SIZE and store.count() == EXPIRED_LINKS + LIVE_LINKS - BATCH_SIZE)
+
+    while manager.reap_expired(BATCH_SIZE, now=later)[0] == BATCH_SIZE:
+        pass
+    check("every expired row is deleted", all(store.get(link_id) is None for link_id in expired))
+    check("every expired blob is shredded", not any(os.path.exists(path) for path in blob_paths))
+    check("reaped IDs are dropped from the lookup filter",
+          not any(manager.id_filter.might_contain(link_id) for link_id in expired))
+    check("live links are kept and still open",
+          all(manager.access_link(link_id)['url'] == f"https://live/{i}" for i, link_id in enumerate(live)))
+
+    if store.shared:
+        # A second manager on the same store stands in for another worker process
+        other = SecureLinkManager(store, blob_root=blob_root)
+        late = other.create_link("https://from-another-worker", expires_seconds=0)['link_id']
+        time.sleep(LINK_FILTER_SYNC_INTERVAL_MS / 1000 + 0.05)
+        check("the filter picks up links created by another worker",
+              manager.id_filter.might_contain(late) and manager.access_link(late)['url'] == "https://from-another-worker")
+
+    past = manager.create_link("https://past", expires_seconds=1)['link_id']
+    reaper = LinkReaper(manager, interval=0, batch_size=BATCH_SIZE)
+    time.sleep(1.1)
+    reaped = reaper.run_once()
+    check("the reaper thread's run removes links as they expire",
+          reaped == 1 and store.get(past) is None and reaper.metrics()['rows_reaped'] == 1)
+
+
+def run_tests() -> bool:
+    print("Beginning Link Reaper Tests...")
+    results = []
+
+    for store in (MemoryLinkStore(), SQLiteLinkStore(db), AppendLogLinkStore(os.path.join(WORK_DIR, 'links.log'))):
+        print(f"\n[*] {store.name} store")
+
+        def check(name: str, passed: bool):
+            results.append(passed)
+            print(f"[{'+' if passed else '-'}] {name}")
+
+        try:
+            check_store(store, check)
+        finally:
+            store.close()
+
+    all_passed = all(results)
+    print("\nRESULT: " + ("PASS" if all_passed else "FAIL"))
+    return all_passed
+
+
+if __name__ == "__main__":
+    try:
+        passed = run_tests()
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,83 @@
+import io
+import os
+import shutil
+import sys
+import tempfile
+
+# Ensure backend directory is in path so we can import core modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Run the app against throwaway storage; small blob segments so ranges span several
+WORK_DIR = tempfile.mkdtemp(prefix='cryptaris-verify-range-')
+os.environ.setdefault('SYSTEM_MASTER_KEY', 'verify-range-throwaway-key-0000000000')
+os.environ['CRYPTARIS_DB_PATH'] = os.path.join(WORK_DIR, 'cryptaris.db')
+os.environ['BLOB_STORE_PATH'] = os.path.join(WORK_DIR, 'blobs')
+os.environ['BLOB_CHUNK_SIZE'] = '4096'
+os.environ['LINK_STORE'] = 'memory'
+os.environ['LINK_REAPER_INTERVAL'] = '0'
+
+from app import app, PASSWORD_HEADER
+
+PASSWORD = "range-check-password"
+FILE_DATA = os.urandom(50000)
+
+
+def run_tests() -> bool:
+    print("Beginning Secure Link Range Tests...")
+    results = []
+
+    def check(name: str, passed: bool):
+        results.append(passed)
+        print(f"[{'+' if passed else '-'}] {name}")
+
+    # The access limit is 5 per minute per client address, so each part uses its own
+    client = app.test_client()
+    client.environ_base['REMOTE_ADDR'] = '10.0.0.1'
+    created = client.post('/api/links/create', content_type='multipart/form-data',
+                          data={'password': PASSWORD, 'expires': '3600', 'file': (io.BytesIO(FILE_DATA), 'range.bin')})
+    link_id = created.get_json()['link_id']
+    url = f'/api/links/access/{link_id}'
+    auth = {PASSWORD_HEADER: PASSWORD}
+
+    full = client.get(url, headers=auth)
+    etag = full.headers.get('ETag', '')
+    check("a plain GET returns the whole file (200)",
+          full.status_code == 200 and full.data == FILE_DATA and full.headers.get('Accept-Ranges') == 'bytes')
+
+    wrong = client.get(url, headers={PASSWORD_HEADER: 'wrong-password', 'Range': 'bytes=0-9'})
+    check("a range with the wrong password is refused", wrong.status_code == 400)
+
+    part = client.get(url, headers=dict(auth, Range='bytes=4000-12999'))
+    check("a range across blob segments returns 206 with the slice",
+          part.status_code == 206 and part.data == FILE_DATA[4000:13000]
+          and part.headers.get('Content-Range') == f'bytes 4000-12999/{len(FILE_DATA)}')
+
+    suffix = client.get(url, headers=dict(auth, Range='bytes=-100'))
+    check("a suffix range returns the last bytes", suffix.status_code == 206 and suffix.data == FILE_DATA[-100:])
+
+    beyond = client.get(url, headers=dict(auth, Range=f'bytes={len(FILE_DATA)}-'))
+    check("a range past the end returns 416",
+          beyond.status_code == 416 and beyond.headers.get('Content-Range') == f'bytes */{len(FILE_DATA)}')
+
+    client = app.test_client()
+    client.environ_base['REMOTE_ADDR'] = '10.0.0.2'
+    stale = client.get(url, headers=dict(auth, Range='bytes=0-9', **{'If-Range': '"stale-etag"'}))
+    check("a stale If-Range returns the whole file (200)", stale.status_code == 200 and stale.data == FILE_DATA)
+
+    # Resumed chunks that name the ETag do not count against the limit
+    statuses = [client.get(url, headers=dict(auth, Range=f'bytes={start}-', **{'If-Range': etag})).status_code
+                for start in range(0, 50000, 5000)]
+    check(f"{len(statuses)} resumed chunks are not rate limited", statuses == [206] * len(statuses))
+    guesses = [client.get(url, headers={PASSWORD_HEADER: 'guess', 'Range': 'bytes=0-'}).status_code for _ in range(6)]
+    check("password guesses are still rate limited", 429 in guesses)
+
+    all_passed = all(results)
+    print("\nRESULT: " + ("PASS" if all_passed else "FAIL"))
+    return all_passed
+
+
+if __name__ == "__main__":
+    try:
+        passed = run_tests()
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+    sys.exit(0 if passed else 1)
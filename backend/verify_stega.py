@@ -1,6 +1,13 @@
 
 import requests
 import os
+import io
+import sys
+import zipfile
+
+# Ensure backend directory is in path so we can import core modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from core.stega import HEADER_PIXELS
 
 BASE_URL = "http://127.0.0.1:5000/api"
 
@@ -66,18 +73,27 @@ def test_steganography():
             
         print("✅ PASS - Hide Encrypted Message")
         
-        # Reveal (should return encrypted string)
+        # Reveal without the password (should be refused)
+        with open("stego_enc_output.png", "rb") as f:
+            r2 = requests.post(f"{BASE_URL}/steganography/reveal", files={'image': f})
+
+        if r2.status_code == 200:
+             print(f"❌ FAIL - Reveal Encrypted Message Without Password: {r2.text}")
+             return
+        print("✅ PASS - Reveal Encrypted Message Without Password refused")
+
+        # Reveal with the password (should return the plaintext)
         with open("stego_enc_output.png", "rb") as f:
             files_reveal = {'image': f}
-            r2 = requests.post(f"{BASE_URL}/steganography/reveal", files=files_reveal)
+            r2 = requests.post(f"{BASE_URL}/steganography/reveal", files=files_reveal, data={'password': 'spy-password'})
             
         if r2.status_code != 200:
              print(f"❌ FAIL - Reveal Encrypted Message: {r2.text}")
              return
 
         result = r2.json()
-        if "ENC::" in result.get('message', ''):
-             print(f"✅ PASS - Reveal Encrypted Message: Successfully retrieved encrypted blob starting with ENC::")
+        if result.get('message') == 'Top Secret Encrypted':
+             print(f"✅ PASS - Reveal Encrypted Message: {result['message']}")
         else:
              print(f"❌ FAIL - Reveal Encrypted Message Content Mismatch: {result}")
 
@@ -89,5 +105,149 @@ def test_steganography():
         if os.path.exists('test_stego_enc.png'): os.remove('test_stego_enc.png')
         if os.path.exists('stego_enc_output.png'): os.remove('stego_enc_output.png')
 
+def _noise_png(width, height, seed=0):
+    """A photo-like carrier: a gradient with some noise, as PNG bytes."""
+    import numpy as np
+    from PIL import Image
+    rng = np.random.default_rng(seed)
+    ramp = np.linspace(0, 200, width)[None, :, None] + np.linspace(0, 50, height)[:, None, None]
+    pixels = np.clip(ramp + rng.normal(0, 12, (height, width, 3)), 0, 255).astype(np.uint8)
+    out = io.BytesIO()
+    Image.fromarray(pixels, 'RGB').save(out, format='PNG')
+    return out.getvalue()
+
+def _pixels(data):
+    import numpy as np
+    from PIL import Image
+    return np.asarray(Image.open(io.BytesIO(data)).convert('RGB'), dtype=np.int16)
+
+def test_bits_per_channel():
+    print("\n--- Testing Bits Per Channel ---")
+    try:
+        carrier = _noise_png(64, 64)
+        capacities = {}
+        for bits in (1, 2, 4):
+            r = requests.post(f"{BASE_URL}/steganography/capacity", files={'image': carrier},
+                              data={'bits_per_channel': bits})
+            capacities[bits] = r.json().get('capacity_bytes', 0)
+        if capacities[1] < capacities[2] < capacities[4]:
+            print(f"✅ PASS - Capacity grows with bits per channel: {capacities}")
+        else:
+            print(f"❌ FAIL - Capacity by bits per channel: {capacities}")
+
+        # Random text barely compresses, so it only fits with more bits per channel
+        import random
+        message = ''.join(random.choice('abcdefghijklmnopqrstuvwxyz0123456789') for _ in range(capacities[1] * 2))
+        r = requests.post(f"{BASE_URL}/steganography/hide", files={'image': carrier},
+                          data={'message': message, 'bits_per_channel': 1})
+        if r.status_code == 413:
+            print("✅ PASS - Message over the 1-bit capacity refused with 413")
+        else:
+            print(f"❌ FAIL - Message over the 1-bit capacity: {r.status_code} {r.text[:200]}")
+
+        for bits, channels in ((4, 'RGB'), (2, 'B')):
+            r = requests.post(f"{BASE_URL}/steganography/hide", files={'image': carrier},
+                              data={'message': message if channels == 'RGB' else 'Blue only', 'bits_per_channel': bits,
+                                    'channels': channels})
+            if r.status_code != 200:
+                print(f"❌ FAIL - Hide with {bits} bits in {channels}: {r.text}")
+                continue
+            # The header pixels always use 1 bit in RGB so reveal can read the layout first
+            diff = abs(_pixels(r.content) - _pixels(carrier)).reshape(-1, 3)
+            header, body = diff[:HEADER_PIXELS], diff[HEADER_PIXELS:]
+            untouched = [i for i, name in enumerate('RGB') if name not in channels]
+            if header.max() <= 1 and body.max() < 2 ** bits and all(body[:, i].max() == 0 for i in untouched):
+                print(f"✅ PASS - Hide with {bits} bits in {channels} only changes those bits")
+            else:
+                print(f"❌ FAIL - Hide with {bits} bits in {channels} changed pixels by up to {diff.max()}")
+            r2 = requests.post(f"{BASE_URL}/steganography/reveal", files={'image': r.content})
+            expected = message if channels == 'RGB' else 'Blue only'
+            if r2.status_code == 200 and r2.json().get('message') == expected:
+                print(f"✅ PASS - Reveal with {bits} bits in {channels} (layout read from the carrier)")
+            else:
+                print(f"❌ FAIL - Reveal with {bits} bits in {channels}: {r2.text[:200]}")
+    except Exception as e:
+        print(f"❌ FAIL - Bits Per Channel Exception: {e}")
+
+def test_multi_carrier():
+    print("\n--- Testing Multi-Carrier Split ---")
+    try:
+        carriers = [_noise_png(64, 64, seed) for seed in range(3)]
+        import random
+        message = ''.join(random.choice('abcdefghijklmnopqrstuvwxyz0123456789') for _ in range(3000))
+        r = requests.post(f"{BASE_URL}/steganography/hide",
+                          files=[('images', (f"carrier{i}.png", data)) for i, data in enumerate(carriers)],
+                          data={'message': message, 'password': 'split-password'})
+        if r.status_code != 200:
+            print(f"❌ FAIL - Hide Across Images: {r.text}")
+            return
+        with zipfile.ZipFile(io.BytesIO(r.content)) as zf:
+            names = sorted(zf.namelist())
+            outputs = [zf.read(name) for name in names]
+        if len(names) == 3 and [name.split('_')[0] for name in names] == ['01', '02', '03'] \
+                and all(f"carrier{i}" in name for i, name in enumerate(names)):
+            print(f"✅ PASS - Hide Across Images returns the carriers in upload order: {names}")
+        else:
+            print(f"❌ FAIL - Hide Across Images zip contents: {names}")
+
+        for label, order in (("in order", [0, 1, 2]), ("shuffled", [2, 0, 1])):
+            r2 = requests.post(f"{BASE_URL}/steganography/reveal",
+                               files=[('images', (f"{i}.png", outputs[i])) for i in order],
+                               data={'password': 'split-password'})
+            if r2.status_code == 200 and r2.json().get('message') == message:
+                print(f"✅ PASS - Reveal From Images ({label})")
+            else:
+                print(f"❌ FAIL - Reveal From Images ({label}): {r2.text[:200]}")
+
+        r3 = requests.post(f"{BASE_URL}/steganography/reveal",
+                           files=[('images', (f"{i}.png", outputs[i])) for i in (0, 2)],
+                           data={'password': 'split-password'})
+        if r3.status_code == 400:
+            print(f"✅ PASS - Reveal with a carrier missing refused: {r3.json().get('error')}")
+        else:
+            print(f"❌ FAIL - Reveal with a carrier missing: {r3.status_code} {r3.text[:200]}")
+    except Exception as e:
+        print(f"❌ FAIL - Multi-Carrier Exception: {e}")
+
+def _as_jpeg(data, quality):
+    from PIL import Image
+    out = io.BytesIO()
+    Image.open(io.BytesIO(data)).convert('RGB').save(out, format='JPEG', quality=quality)
+    return out.getvalue()
+
+def test_dct_after_jpeg():
+    print("\n--- Testing DCT Mode After JPEG Recompression ---")
+    try:
+        carrier = _noise_png(512, 512)
+        for password in ('', 'jpeg-password'):
+            message = 'Survives the messenger' + (' (encrypted)' if password else '')
+            r = requests.post(f"{BASE_URL}/steganography/hide", files={'image': carrier},
+                              data={'message': message, 'password': password, 'mode': 'dct'})
+            if r.status_code != 200:
+                print(f"❌ FAIL - Hide In DCT Mode: {r.text}")
+                return
+            for quality in (90, 75, 60):
+                r2 = requests.post(f"{BASE_URL}/steganography/reveal", files={'image': _as_jpeg(r.content, quality)},
+                                   data={'password': password})
+                label = f"JPEG quality {quality}{', encrypted' if password else ''}"
+                if r2.status_code == 200 and r2.json().get('message') == message:
+                    print(f"✅ PASS - Reveal DCT Carrier After {label}")
+                else:
+                    print(f"❌ FAIL - Reveal DCT Carrier After {label}: {r2.text[:200]}")
+
+        # A JPEG of an image without a message is answered with 400
+        r3 = requests.post(f"{BASE_URL}/steganography/reveal", files={'image': _as_jpeg(carrier, 75)})
+        if r3.status_code == 400:
+            print(f"✅ PASS - Reveal from a plain JPEG refused: {r3.json().get('error')}")
+        else:
+            print(f"❌ FAIL - Reveal from a plain JPEG: {r3.status_code} {r3.text[:200]}")
+    except Exception as e:
+        print(f"❌ FAIL - DCT Mode Exception: {e}")
+
 if __name__ == "__main__":
+    # About 25 requests per run against the default limit of 50 per hour per client;
+    # restart the server between back-to-back runs
     test_steganography()
+    test_bits_per_channel()
+    test_multi_carrier()
+    test_dct_after_jpeg()
@@ -45,11 +45,15 @@ export async function processFile(file: File, password: string, mode: "encrypt"
     return response.blob();
 }
 
-export async function hideMessage(image: File, message: string, password?: string) {
+// "dct" carriers survive JPEG recompression (messengers, social media); "lsb" holds more
+export type StegaMode = "lsb" | "dct";
+
+export async function hideMessage(image: File, message: string, password?: string, mode?: StegaMode) {
     const formData = new FormData();
     formData.append("image", image);
     formData.append("message", message);
     if (password) formData.append("password", password);
+    if (mode) formData.append("mode", mode);
 
     const response = await fetch(`${API_URL}/steganography/hide`, {
         method: "POST",
@@ -60,9 +64,40 @@ export async function hideMessage(image: File, message: string, password?: strin
     return response.blob();
 }
 
-export async function revealMessage(image: File) {
+export async function revealMessage(image: File, password?: string) {
     const formData = new FormData();
     formData.append("image", image);
+    if (password) formData.append("password", password);
+
+    const response = await fetch(`${API_URL}/steganography/reveal`, {
+        method: "POST",
+        body: formData,
+    });
+
+    if (!response.ok) throw new Error((await response.json()).error || "Revealing message failed");
+    return response.json();
+}
+
+export async function hideMessageAcrossImages(images: File[], message: string, password?: string, mode?: StegaMode) {
+    const formData = new FormData();
+    images.forEach((image) => formData.append("images", image));
+    formData.append("message", message);
+    if (password) formData.append("password", password);
+    if (mode) formData.append("mode", mode);
+
+    const response = await fetch(`${API_URL}/steganography/hide`, {
+        method: "POST",
+        body: formData,
+    });
+
+    if (!response.ok) throw new Error((await response.json()).error || "Hiding message failed");
+    return response.blob(); // zip of the carrier PNGs
+}
+
+export async function revealMessageFromImages(images: File[], password?: string) {
+    const formData = new FormData();
+    images.forEach((image) => formData.append("images", image));
+    if (password) formData.append("password", password);
 
     const response = await fetch(`${API_URL}/steganography/reveal`, {
         method: "POST",
@@ -6,26 +6,36 @@ import SecurePasswordInput from "@/components/SecurePasswordInput";
 import { Button } from "@/components/ui/button";
 import { Textarea } from "@/components/ui/textarea";
 import { useToast } from "@/hooks/use-toast";
-import { hideMessage, revealMessage } from "@/lib/api";
+import { hideMessage, hideMessageAcrossImages, revealMessage, revealMessageFromImages, type StegaMode } from "@/lib/api";
 
 interface SteganographyFeatureProps {
     mode: "hide" | "reveal";
 }
 
 const SteganographyFeature = ({ mode }: SteganographyFeatureProps) => {
-    const [image, setImage] = useState<File | null>(null);
+    // Several images split one message across carriers (returned as a zip)
+    const [images, setImages] = useState<File[]>([]);
     const [message, setMessage] = useState("");
     const [secret, setSecret] = useState("");
+    const [stegaMode, setStegaMode] = useState<StegaMode>("lsb");
     const [isProcessing, setIsProcessing] = useState(false);
     const [processedImage, setProcessedImage] = useState<string | null>(null);
+    const [processedName, setProcessedName] = useState("stego_image.png");
     const [revealedMessage, setRevealedMessage] = useState<string | null>(null);
     const { toast } = useToast();
 
+    const image = images[0] ?? null;
+    const isMultiCarrier = images.length > 1;
+
+    const selectImages = (files: File[]) => {
+        setImages(files);
+        setProcessedImage(null);
+        setRevealedMessage(null);
+    };
+
     const handleImageChange = (e: React.ChangeEvent<HTMLInputElement>) => {
-        if (e.target.files && e.target.files[0]) {
-            setImage(e.target.files[0]);
-            setProcessedImage(null);
-            setRevealedMessage(null);
+        if (e.target.files && e.target.files.length > 0) {
+            selectImages(Array.from(e.target.files));
         }
     };
 
@@ -41,12 +51,17 @@ const SteganographyFeature = ({ mode }: SteganographyFeatureProps) => {
 
         setIsProcessing(true);
         try {
-            const resultBlob = await hideMessage(image, message, secret);
+            const resultBlob = isMultiCarrier
+                ? await hideMessageAcrossImages(images, message, secret, stegaMode)
+                : await hideMessage(image, message, secret, stegaMode);
             const url = window.URL.createObjectURL(resultBlob);
             setProcessedImage(url);
+            setProcessedName(isMultiCarrier ? "stego_images.zip" : "stego_image.png");
             toast({
                 title: "Message Hidden!",
-                description: "The message has been successfully embedded in the image.",
+                description: isMultiCarrier
+                    ? `The message has been split across ${images.length} images.`
+                    : "The message has been successfully embedded in the image.",
             });
         } catch (error: any) {
             toast({
@@ -71,7 +86,9 @@ const SteganographyFeature = ({ mode }: SteganographyFeatureProps) => {
 
         setIsProcessing(true);
         try {
-            const result = await revealMessage(image);
+            const result = isMultiCarrier
+                ? await revealMessageFromImages(images, secret)
+                : await revealMessage(image, secret);
             setRevealedMessage(result.message);
             toast({
                 title: "Message Revealed!",
@@ -114,19 +131,17 @@ const SteganographyFeature = ({ mode }: SteganographyFeatureProps) => {
                         onDragOver={(e) => e.preventDefault()}
                         onDrop={(e) => {
                             e.preventDefault();
-                            if (e.dataTransfer.files && e.dataTransfer.files[0]) {
-                                const droppedFile = e.dataTransfer.files[0];
-                                if (!droppedFile.type.startsWith("image/")) {
+                            if (e.dataTransfer.files && e.dataTransfer.files.length > 0) {
+                                const droppedFiles = Array.from(e.dataTransfer.files);
+                                if (droppedFiles.some((file) => !file.type.startsWith("image/"))) {
                                     toast({
                                         title: "Invalid File Type",
-                                        description: "Steganography requires an image file.",
+                                        description: "Steganography requires image files.",
                                         variant: "destructive"
                                     });
                                     return;
                                 }
-                                setImage(droppedFile);
-                                setProcessedImage(null);
-                                setRevealedMessage(null);
+                                selectImages(droppedFiles);
                             }
                         }}
                     >
@@ -140,9 +155,7 @@ const SteganographyFeature = ({ mode }: SteganographyFeatureProps) => {
                                 <button
                                     onClick={(e) => {
                                         e.stopPropagation();
-                                        setImage(null);
-                                        setProcessedImage(null);
-                                        setRevealedMessage(null);
+                                        selectImages([]);
                                     }}
                                     className="absolute top-4 right-4 p-2 rounded-full bg-background/80 hover:bg-destructive/10 text-muted-foreground hover:text-destructive transition-colors z-20"
                                 >
@@ -155,6 +168,7 @@ const SteganographyFeature = ({ mode }: SteganographyFeatureProps) => {
                             id="steg-upload"
                             type="file"
                             accept="image/*"
+                            multiple
                             className="hidden"
                             onChange={handleImageChange}
                         />
@@ -162,9 +176,11 @@ const SteganographyFeature = ({ mode }: SteganographyFeatureProps) => {
                         <div className="relative z-10 bg-background/80 p-4 rounded-lg backdrop-blur-sm">
                             <ImageIcon className="mx-auto text-primary mb-2" size={32} />
                             <p className="font-semibold">
-                                {image ? "Change Image" : "Select Cover Image"}
+                                {isMultiCarrier ? `${images.length} Images Selected` : image ? "Change Image" : "Select Cover Image"}
+                            </p>
+                            <p className="text-xs text-muted-foreground">
+                                PNG or JPG recommended. Select several images to split the message across them.
                             </p>
-                            <p className="text-xs text-muted-foreground">PNG or JPG recommended</p>
                         </div>
                     </div>
 
@@ -180,6 +196,20 @@ const SteganographyFeature = ({ mode }: SteganographyFeatureProps) => {
                         </div>
                     )}
 
+                    {mode === "hide" && (
+                        <div className="space-y-2">
+                            <label className="text-sm font-medium">Embedding Mode</label>
+                            <select
+                                className="flex h-10 w-full rounded-md border border-input bg-background px-3 py-2 text-sm ring-offset-background focus:outline-none focus:ring-2 focus:ring-ring focus:ring-offset-2 disabled:cursor-not-allowed disabled:opacity-50"
+                                value={stegaMode}
+                                onChange={(e) => setStegaMode(e.target.value as StegaMode)}
+                            >
+                                <option value="lsb">Maximum capacity (pixel LSB)</option>
+                                <option value="dct">Survives JPEG compression (DCT)</option>
+                            </select>
+                        </div>
+                    )}
+
                     <SecurePasswordInput
                         value={secret}
                         onChange={setSecret}
@@ -203,19 +233,23 @@ const SteganographyFeature = ({ mode }: SteganographyFeatureProps) => {
                     <div className="min-h-[400px] rounded-xl border bg-muted/30 p-6 flex flex-col items-center justify-center text-center">
                         {mode === "hide" && processedImage ? (
                             <div className="space-y-4 w-full">
-                                <img src={processedImage} alt="Steganography Result" className="rounded-lg w-full max-h-[300px] object-contain shadow-lg" />
+                                {processedName.endsWith(".zip") ? (
+                                    <ImageIcon className="mx-auto text-primary" size={48} />
+                                ) : (
+                                    <img src={processedImage} alt="Steganography Result" className="rounded-lg w-full max-h-[300px] object-contain shadow-lg" />
+                                )}
                                 <div className="flex gap-2 justify-center">
                                     <Button variant="outline" className="w-full" onClick={() => {
                                         if (processedImage) {
                                             const link = document.createElement('a');
                                             link.href = processedImage;
-                                            link.download = "stego_image.png";
+                                            link.download = processedName;
                                             document.body.appendChild(link);
                                             link.click();
                                             document.body.removeChild(link);
                                         }
                                     }}>
-                                        <Save className="mr-2 h-4 w-4" /> Download Image
+                                        <Save className="mr-2 h-4 w-4" /> {processedName.endsWith(".zip") ? "Download Images (ZIP)" : "Download Image"}
                                     </Button>
                                 </div>
                                 <p className="text-sm text-green-500 font-medium">
@@ -237,7 +271,7 @@ const SteganographyFeature = ({ mode }: SteganographyFeatureProps) => {
                                 <p>Processed result will appear here</p>
                             </div>
                         )}
-                        {mode === "hide" && processedImage && (
+                        {mode === "hide" && processedImage && stegaMode === "lsb" && (
                             <div className="mt-4 p-3 bg-yellow-500/10 border border-yellow-500/20 rounded-lg text-sm text-yellow-600 dark:text-yellow-400">
                                 <p className="font-semibold">⚠️ Important:</p>
                                 <p>When sharing via WhatsApp, Telegram, or other social media, ALWAYS send as a <strong>"Document"</strong>. Sending as a standard image will compress it and destroy the hidden message.</p>